@@ -0,0 +1,99 @@
+"""
+Latency the pre-flight gate adds to an LLM client call, measured against a local stub.
+
+    python benchmarks/gate_latency.py --iterations 20000
+
+Each mode times the bare StubClient call and the gated call; the difference of the
+percentiles is the overhead of the gate. Modes: tokens only (the default gate), tokens
+plus severity rules, with a background report queue attached, and the async wrapper.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from pathlib import Path
+from typing import Any, Callable, List
+
+from prompt_analysis import PromptAnalyzer
+from prompt_analysis.config import AnalyzerConfig
+from prompt_analysis.gate import PreflightGate, ReportQueue, StubClient
+
+CHAT = [
+    {"role": "system", "content": "You are a concise support assistant for an online store."},
+    {"role": "user", "content": "My order #4411 arrived damaged. What are my options?"},
+    {"role": "assistant", "content": "Sorry! You can request a refund or a replacement."},
+    {"role": "user", "content": "Replacement please. Reply in JSON with max 3 fields."},
+]
+CALL = {"model": "gpt-4o-mini", "messages": CHAT, "max_tokens": 200}
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def _sample(call: Callable[[], Any], iterations: int) -> List[float]:
+    for _ in range(1000):
+        call()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - started)
+    return sorted(samples)
+
+
+async def _sample_async(call: Callable[[], Any], iterations: int) -> List[float]:
+    for _ in range(1000):
+        await call()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - started)
+    return sorted(samples)
+
+
+def _print(name: str, bare: List[float], gated: List[float]) -> None:
+    p50 = (_percentile(gated, 0.50) - _percentile(bare, 0.50)) * 1e6
+    p99 = (_percentile(gated, 0.99) - _percentile(bare, 0.99)) * 1e6
+    print(f"{name:>16}: added p50={p50:6.1f} µs  p99={p99:6.1f} µs")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--config", default="promptanalysis.yml")
+    ap.add_argument("--iterations", type=int, default=20000)
+    args = ap.parse_args()
+
+    cfg_path = Path(args.config)
+    cfg = AnalyzerConfig.load(cfg_path) if cfg_path.exists() else AnalyzerConfig()
+    analyzer = PromptAnalyzer(cfg)
+    client = StubClient()
+    n = args.iterations
+
+    bare = _sample(lambda: client.create(**CALL), n)
+    for name, gate in (
+        ("tokens", PreflightGate(analyzer)),
+        ("tokens+rules", PreflightGate(analyzer, deny_severity="high")),
+    ):
+        create = gate.wrap(client.create)
+        _print(name, bare, _sample(lambda: create(**CALL), n))
+
+    reports = ReportQueue(analyzer, lambda report, decision: None, maxsize=n + 1000)
+    create = PreflightGate(analyzer, reports=reports).wrap(client.create)
+    _print("tokens+queue", bare, _sample(lambda: create(**CALL), n))
+    reports.join()
+    reports.close()
+
+    async def run_async() -> None:
+        bare = await _sample_async(lambda: client.acreate(**CALL), n)
+        acreate = PreflightGate(analyzer).wrap_async(client.acreate)
+        _print("tokens (async)", bare, await _sample_async(lambda: acreate(**CALL), n))
+
+    asyncio.run(run_async())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Closed-loop load test for `promptlint serve`.
+
+    promptlint serve --port 8080 &
+    python benchmarks/loadtest_serve.py --url http://127.0.0.1:8080 --concurrency 8
+
+Each client thread holds one keep-alive connection and issues requests back to back.
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import threading
+import time
+from typing import List
+from urllib.parse import urlparse
+
+PAYLOAD = {
+    "messages": [
+        {"role": "system", "content": "You are a support assistant for an online store."},
+        {
+            "role": "user",
+            "content": "Summarize the customer's complaint below and suggest a next step.\n"
+            "The parcel arrived two weeks late and the box was damaged.",
+        },
+    ],
+    "model": "gpt-4o-mini",
+}
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def _client(host: str, port: int, path: str, body: bytes, deadline: float, out: List[float],
+            errors: List[int]) -> None:
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    headers = {"Content-Type": "application/json"}
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            conn.request("POST", path, body=body, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                errors.append(resp.status)
+                continue
+        except (OSError, http.client.HTTPException):
+            errors.append(0)
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=10)
+            continue
+        out.append(time.perf_counter() - started)
+    conn.close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--url", default="http://127.0.0.1:8080")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--duration", type=float, default=10.0, help="Seconds to run.")
+    ap.add_argument("--batch", type=int, default=0, help="Use /analyze/batch with N items.")
+    args = ap.parse_args()
+
+    url = urlparse(args.url)
+    if args.batch:
+        path, body = "/analyze/batch", json.dumps({"items": [PAYLOAD] * args.batch})
+    else:
+        path, body = "/analyze", json.dumps(PAYLOAD)
+
+    deadline = time.perf_counter() + args.duration
+    latencies: List[List[float]] = [[] for _ in range(args.concurrency)]
+    errors: List[int] = []
+    threads = [
+        threading.Thread(
+            target=_client,
+            args=(url.hostname, url.port or 80, path, body.encode(), deadline, lat, errors),
+        )
+        for lat in latencies
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    all_lat = sorted(x for lat in latencies for x in lat)
+    print(f"requests: {len(all_lat)} ok, {len(errors)} errors in {elapsed:.1f}s")
+    print(f"throughput: {len(all_lat) / elapsed:.0f} req/s")
+    print(
+        "latency ms: "
+        f"p50={_percentile(all_lat, 0.50) * 1000:.2f} "
+        f"p90={_percentile(all_lat, 0.90) * 1000:.2f} "
+        f"p99={_percentile(all_lat, 0.99) * 1000:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
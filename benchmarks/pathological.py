@@ -0,0 +1,115 @@
+"""
+Worst-case inputs: check that tokenizing, normalizing, rules and full analysis stay linear.
+
+    python benchmarks/pathological.py            # 0.5/1/2 MB inputs
+    python benchmarks/pathological.py --scale 8  # up to 16 MB
+
+Each case runs at three sizes (n, 2n, 4n). The growth exponent between the two larger
+sizes, log2(t(4n) / t(2n)), should stay near 1; anything above --max-exponent is
+reported as superlinear and the script exits non-zero. Peak traced memory is reported
+as a multiple of the input size.
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from prompt_analysis import PromptAnalyzer
+from prompt_analysis.config import AnalyzerConfig
+from prompt_analysis.normalized import normalize_messages
+from prompt_analysis.rules.runner import run_rules
+from prompt_analysis.tokenizers import ApproxTokenizer
+
+
+def _text_inputs(n: int) -> Dict[str, str]:
+    return {
+        "whitespace": " \t\n" * (n // 3),
+        "single_word": "a" * n,
+        "nested_json": "[{" * (n // 4) + "}]" * (n // 4),
+        "punctuation": "{}[]():,;!?" * (n // 11),
+        "short_words": "a " * (n // 2),
+    }
+
+
+def _time(fn: Callable[[], object], repeat: int = 5) -> Tuple[float, int]:
+    best = math.inf
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--config", default="promptanalysis.yml")
+    ap.add_argument("--size", type=int, default=500_000, help="Smallest input size (chars).")
+    ap.add_argument("--scale", type=int, default=4, help="Largest size as a multiple of --size.")
+    ap.add_argument("--messages", type=int, default=2_500, help="Smallest empty-message count.")
+    ap.add_argument("--max-exponent", type=float, default=1.4)
+    args = ap.parse_args()
+
+    cfg_path = Path(args.config)
+    cfg = AnalyzerConfig.load(cfg_path) if cfg_path.exists() else AnalyzerConfig()
+    analyzer = PromptAnalyzer(cfg)
+    plan = analyzer.plan()
+    tok = ApproxTokenizer()
+
+    sizes = [max(args.scale // 4, 1), max(args.scale // 2, 1), args.scale]
+    cases: Dict[str, List[Tuple[int, Callable[[], object]]]] = {}
+
+    def add(name: str, n: int, fn: Callable[[], object]) -> None:
+        cases.setdefault(name, []).append((n, fn))
+
+    for mult in sizes:
+        n = args.size * mult
+        for family, text in _text_inputs(n).items():
+            msgs = [{"role": "user", "content": text}]
+            add(f"count_text/{family}", len(text), lambda t=text: tok.count_text(t))
+            add(f"normalize/{family}", len(text), lambda m=msgs: normalize_messages(m))
+            norm = normalize_messages(msgs)
+            add(
+                f"rules/{family}",
+                len(text),
+                lambda p=norm: run_rules(plan.rules, p, plan.rule_ctx),
+            )
+            add(f"analyze/{family}", len(text), lambda m=msgs: analyzer.analyze_messages(m))
+
+        count = args.messages * mult
+        empty = [{"role": "user", "content": ""}] * count
+        add("normalize/empty_messages", count, lambda m=empty: normalize_messages(m))
+        add("analyze/empty_messages", count, lambda m=empty: analyzer.analyze_messages(m))
+
+    failed = []
+    print(f"{'case':32} {'size':>10} {'ms':>9} {'peak/in':>8} {'exp':>6}")
+    for name, runs in cases.items():
+        timings = []
+        for n, fn in runs:
+            seconds, peak = _time(fn)
+            timings.append(seconds)
+            print(f"{name:32} {n:>10} {seconds * 1e3:9.2f} {peak / max(n, 1):8.2f}")
+        t2, t4 = timings[-2], timings[-1]
+        # Timings of a few milliseconds are too noisy to extrapolate from.
+        exponent = math.log2(t4 / t2) if t2 > 0 and t4 > 5e-3 else 0.0
+        flag = ""
+        if exponent > args.max_exponent:
+            failed.append(name)
+            flag = "  SUPERLINEAR"
+        print(f"{'':32} {'':>10} {'':>9} {'':>8} {exponent:6.2f}{flag}")
+
+    if failed:
+        print(f"\nSuperlinear: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
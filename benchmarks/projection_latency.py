@@ -0,0 +1,60 @@
+"""
+Per-call latency of analyze_messages for each report projection profile.
+
+    python benchmarks/projection_latency.py --iterations 20000
+
+The `gate` profile (token counts, budget verdict, issue codes) should stay well under
+100 µs per call for typical chat prompts.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+from typing import List
+
+from prompt_analysis import PromptAnalyzer
+from prompt_analysis.config import AnalyzerConfig
+
+CHAT = [
+    {"role": "system", "content": "You are a concise support assistant for an online store."},
+    {"role": "user", "content": "My order #4411 arrived damaged. What are my options?"},
+    {"role": "assistant", "content": "Sorry! You can request a refund or a replacement."},
+    {"role": "user", "content": "Replacement please. Reply in JSON with max 3 fields."},
+]
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--config", default="promptanalysis.yml")
+    ap.add_argument("--iterations", type=int, default=20000)
+    args = ap.parse_args()
+
+    cfg_path = Path(args.config)
+    cfg = AnalyzerConfig.load(cfg_path) if cfg_path.exists() else AnalyzerConfig()
+    analyzer = PromptAnalyzer(cfg)
+
+    for profile in ("full", "ci", "gate"):
+        for _ in range(1000):  # warm the plan cache and allocator
+            analyzer.analyze_messages(CHAT, fields=profile)
+
+        samples = []
+        for _ in range(args.iterations):
+            started = time.perf_counter()
+            analyzer.analyze_messages(CHAT, fields=profile)
+            samples.append(time.perf_counter() - started)
+        samples.sort()
+        print(
+            f"{profile:>5}: "
+            f"p50={_percentile(samples, 0.50) * 1e6:6.1f} µs  "
+            f"p99={_percentile(samples, 0.99) * 1e6:6.1f} µs"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Throughput of one shared PromptAnalyzer by thread count (ThreadedExecutor).
+
+    python benchmarks/threads.py --records 20000
+    python3.13t benchmarks/threads.py --records 20000   # free-threaded build
+
+Prints records/s and speedup over one thread for each thread count, and whether the
+interpreter runs with the GIL. With the GIL, expect roughly flat throughput; on a
+free-threaded build it should scale with cores. Reports are checked against a serial
+run, so the benchmark doubles as a race detector.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from prompt_analysis import PromptAnalyzer
+from prompt_analysis.config import AnalyzerConfig
+from prompt_analysis.executor import ThreadedExecutor
+
+WORDS = (
+    "summarize the following support ticket and reply in json with max 3 bullet points "
+    "context order refund shipping damaged customer please explain step by step"
+).split()
+
+
+def _records(n: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    models = ["gpt-4o-mini", "claude-3-5-sonnet", None]
+    out = []
+    for _ in range(n):
+        messages = [
+            {"role": "system", "content": "You are a concise support assistant."},
+            {"role": "user", "content": " ".join(rng.choices(WORDS, k=rng.randint(5, 400)))},
+        ]
+        chunks = [
+            {"id": f"doc-{rng.randint(0, 200)}", "text": " ".join(rng.choices(WORDS, k=80))}
+            for _ in range(rng.randint(0, 3))
+        ]
+        out.append({"messages": messages, "context_chunks": chunks, "model": rng.choice(models)})
+    return out
+
+
+def _comparable(result: Any) -> Any:
+    if isinstance(result, dict):
+        return result
+    d = result.to_dict()
+    d.pop("created_at", None)
+    return d
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--config", default="promptanalysis.yml")
+    ap.add_argument("--records", type=int, default=20000)
+    ap.add_argument("--threads", default="1,2,4,8")
+    ap.add_argument("--fields", default="ci")
+    args = ap.parse_args()
+
+    cfg_path = Path(args.config)
+    cfg = AnalyzerConfig.load(cfg_path) if cfg_path.exists() else AnalyzerConfig()
+    records = _records(args.records)
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"python {sys.version.split()[0]}  gil={'on' if gil else 'off'}  cpus={os.cpu_count()}")
+
+    expected = [_comparable(r) for r in ThreadedExecutor(
+        PromptAnalyzer(cfg), workers=1, fields=args.fields
+    ).run(records)]
+
+    base = None
+    for threads in [int(t) for t in args.threads.split(",")]:
+        analyzer = PromptAnalyzer(cfg)
+        with ThreadedExecutor(analyzer, workers=threads, fields=args.fields) as ex:
+            ex.run(records[:2000])  # warm plans and chunk cache
+            started = time.perf_counter()
+            results = ex.run(records)
+            elapsed = time.perf_counter() - started
+        if [_comparable(r) for r in results] != expected:
+            print(f"{threads:>3} threads: results differ from the serial run")
+            sys.exit(1)
+        rate = len(records) / elapsed
+        base = base or rate
+        print(f"{threads:>3} threads: {rate:9.0f} records/s  speedup {rate / base:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from cli.watch import DEFAULT_PATTERNS, find_prompt_files
+from prompt_analysis import PromptAnalyzer
+from prompt_analysis.analyzer import STAGES
+from prompt_analysis.config import AnalyzerConfig
+from prompt_analysis.executor import ThreadedExecutor
+from prompt_analysis.pipeline import ShardedPipeline
+from prompt_analysis.validation import validate_lines
+
+MODES = ("serial", "thread", "process")
+PROFILE_FORMATS = ("cprofile", "collapsed")
+
+
+def load_corpus(
+    path: Path, patterns: Iterable[str] = DEFAULT_PATTERNS
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    (records, invalid count) from a JSONL file of prompt inputs, or from a prompt file or
+    directory (each file becomes {"prompt": text}).
+    """
+    if path.is_file() and path.suffix == ".jsonl":
+        with path.open("rb") as fh:
+            result = validate_lines(fh)
+        return [record for _, record in result.valid()], len(result.errors)
+    files = sorted(find_prompt_files(path, patterns))
+    return [{"prompt": p.read_text(encoding="utf-8")} for p in files], 0
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def _peak_rss_mb(children: bool = False) -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+@dataclass
+class BenchResult:
+    corpus: str
+    mode: str
+    workers: int
+    records: int
+    invalid: int
+    repetitions: int
+    warmup: int
+    # records/s of each timed repetition
+    throughput: List[float] = field(default_factory=list)
+    # milliseconds per record over all repetitions; empty in process mode
+    latency_ms: Dict[str, float] = field(default_factory=dict)
+    peak_rss_mb: Optional[float] = None
+    peak_rss_children_mb: Optional[float] = None
+    # stage -> {"seconds", "share"} from one instrumented serial pass, or the pipeline's
+    # own stages in process mode
+    stages: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    # rule code -> {"seconds", "share", "issues"}
+    rules: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    errors: int = 0
+    profile: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class _TimedAnalyzer:
+    """Analyzer proxy handed to ThreadedExecutor; records each record's latency."""
+
+    def __init__(self, analyzer: PromptAnalyzer, latencies: List[float]):
+        self._analyzer = analyzer
+        self._latencies = latencies
+
+    def analyze_input(self, record: Dict[str, Any], fields: Any = None) -> Any:
+        started = time.perf_counter()
+        try:
+            return self._analyzer.analyze_input(record, fields=fields)
+        finally:
+            self._latencies.append(time.perf_counter() - started)
+
+
+class CorpusBench:
+    """
+    Replay a corpus through PromptAnalyzer: `warmup` records first, then `repetitions`
+    timed passes in the chosen mode. Stage and rule timings come from one extra, cold
+    serial pass with the analyzer's `timings` hook, so they add no overhead to the timed
+    passes.
+    """
+
+    def __init__(
+        self,
+        cfg: AnalyzerConfig,
+        records: List[Dict[str, Any]],
+        *,
+        mode: str = "serial",
+        workers: int = 0,
+        repetitions: int = 3,
+        warmup: int = 100,
+        fields: Any = None,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode '{mode}'. Available: {list(MODES)}")
+        self.cfg = cfg
+        self.records = records
+        self.mode = mode
+        self.workers = 1 if mode == "serial" else workers or os.cpu_count() or 1
+        self.repetitions = max(int(repetitions), 1)
+        self.warmup = max(int(warmup), 0)
+        self.fields = fields
+
+    def run(self, corpus: str = "", invalid: int = 0) -> BenchResult:
+        result = BenchResult(
+            corpus=corpus,
+            mode=self.mode,
+            workers=self.workers,
+            records=len(self.records),
+            invalid=invalid,
+            repetitions=self.repetitions,
+            warmup=0 if self.mode == "process" else min(self.warmup, len(self.records)),
+        )
+        latencies: List[float] = []
+        if self.mode == "process":
+            runs, result.stages = self._run_process()
+        else:
+            analyzer = PromptAnalyzer(self.cfg)
+            for record in self.records[: result.warmup]:
+                self._analyze(analyzer, record)
+            run = self._run_serial if self.mode == "serial" else self._run_threads
+            runs = [run(analyzer, latencies) for _ in range(self.repetitions)]
+            result.stages, result.rules = self.breakdown()
+        result.throughput = [rate for rate, _ in runs]
+        # Every pass replays the same records, so they fail the same way.
+        result.errors = runs[-1][1]
+        if latencies:
+            latencies.sort()
+            result.latency_ms = {
+                name: round(value * 1000, 4)
+                for name, value in (
+                    ("mean", sum(latencies) / len(latencies)),
+                    ("p50", _percentile(latencies, 0.50)),
+                    ("p90", _percentile(latencies, 0.90)),
+                    ("p99", _percentile(latencies, 0.99)),
+                    ("max", latencies[-1]),
+                )
+            }
+        result.peak_rss_mb = _peak_rss_mb()
+        if self.mode == "process":
+            result.peak_rss_children_mb = _peak_rss_mb(children=True)
+        return result
+
+    def _analyze(self, analyzer: PromptAnalyzer, record: Dict[str, Any]) -> bool:
+        try:
+            analyzer.analyze_input(record, fields=self.fields)
+        except (ValueError, TypeError, AttributeError):
+            return False
+        return True
+
+    def _rate(self, elapsed: float) -> float:
+        return round(len(self.records) / max(elapsed, 1e-9), 1)
+
+    def _run_serial(self, analyzer: PromptAnalyzer, latencies: List[float]) -> Tuple[float, int]:
+        clock = time.perf_counter
+        analyze = self._analyze
+        errors = 0
+        started = clock()
+        for record in self.records:
+            t0 = clock()
+            if not analyze(analyzer, record):
+                errors += 1
+            latencies.append(clock() - t0)
+        return self._rate(clock() - started), errors
+
+    def _run_threads(self, analyzer: PromptAnalyzer, latencies: List[float]) -> Tuple[float, int]:
+        timed: Any = _TimedAnalyzer(analyzer, latencies)
+        with ThreadedExecutor(timed, workers=self.workers, fields=self.fields) as ex:
+            started = time.perf_counter()
+            results = ex.run(self.records)
+            elapsed = time.perf_counter() - started
+        return self._rate(elapsed), sum(1 for r in results if isinstance(r, dict))
+
+    def _run_process(self) -> Tuple[List[Tuple[float, int]], Dict[str, Dict[str, float]]]:
+        # ShardedPipeline reads a JSONL file; normalized records are written to one.
+        with tempfile.TemporaryDirectory(prefix="promptlint-bench-") as tmp:
+            path = Path(tmp) / "corpus.jsonl"
+            with path.open("w", encoding="utf-8") as fh:
+                for record in self.records:
+                    fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+            runs = []
+            stage_seconds: Counter = Counter()
+            for _ in range(self.repetitions):
+                pipeline = ShardedPipeline(self.cfg, workers=self.workers, fields=self.fields)
+                errors = sum(1 for item in pipeline.iter_reports(path) if isinstance(item, dict))
+                runs.append((self._rate(pipeline.stats.wall), errors))
+                for name, st in pipeline.stats.stages.items():
+                    stage_seconds[name] += st.seconds
+        return runs, _shares(stage_seconds)
+
+    def breakdown(self) -> Tuple[Dict[str, Dict[str, float]], Dict[str, Dict[str, float]]]:
+        """
+        Seconds per analysis stage and per rule over one serial pass of the corpus on a
+        fresh analyzer, so plan compilation and chunk counting are timed cold.
+        """
+        analyzer = PromptAnalyzer(self.cfg)
+        timings: Dict[str, float] = {}
+        hits: Counter = Counter()
+        for record in self.records:
+            try:
+                report = analyzer.analyze_input(record, fields=self.fields, timings=timings)
+            except (ValueError, TypeError, AttributeError):
+                continue  # counted as an error by the timed passes
+            hits.update(i.code for i in report.issues or ())
+        stages = {k: v for k, v in timings.items() if k in STAGES}
+        rules = {k[len("rule:") :]: v for k, v in timings.items() if k.startswith("rule:")}
+        rule_rows = _shares(rules)
+        for code, row in rule_rows.items():
+            row["issues"] = hits[code]
+        return _shares(stages), rule_rows
+
+    def profile(self, out: Path, fmt: str = "cprofile", interval: float = 0.001) -> None:
+        """
+        Profile one serial pass: cProfile stats (for pstats / snakeviz) or collapsed
+        stacks sampled every `interval` seconds (for flamegraph.pl / speedscope).
+        """
+        if fmt not in PROFILE_FORMATS:
+            raise ValueError(f"Unknown profile format '{fmt}'. Available: {list(PROFILE_FORMATS)}")
+        analyzer = PromptAnalyzer(self.cfg)
+        for record in self.records[: self.warmup]:
+            self._analyze(analyzer, record)
+
+        def replay() -> None:
+            for record in self.records:
+                self._analyze(analyzer, record)
+
+        if fmt == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.runcall(replay)
+            profiler.dump_stats(str(out))
+            return
+        stacks = _sample_stacks(replay, interval)
+        with out.open("w", encoding="utf-8") as fh:
+            for stack, count in sorted(stacks.items()):
+                fh.write(f"{stack} {count}\n")
+
+
+def _sample_stacks(target: Callable[[], None], interval: float) -> Counter:
+    """Run `target` on this thread while another samples its stack every `interval`."""
+    stacks: Counter = Counter()
+    ident = threading.get_ident()
+    base = sys._getframe()
+    done = threading.Event()
+
+    def sample() -> None:
+        while not done.wait(interval):
+            frame = sys._current_frames().get(ident)
+            names = []
+            while frame is not None and frame is not base:
+                code = frame.f_code
+                where = f"{Path(code.co_filename).name}:{code.co_firstlineno}"
+                names.append(f"{code.co_name} ({where})")
+                frame = frame.f_back
+            # Frames outside target() (before it starts or after it returns) are skipped.
+            if frame is base and len(names) > 1 and not done.is_set():
+                stacks[";".join(reversed(names[:-1]))] += 1
+
+    # The sampler needs the GIL to run; without this it only gets it every 5 ms.
+    switch = sys.getswitchinterval()
+    sys.setswitchinterval(min(switch, interval))
+    sampler = threading.Thread(target=sample, name="promptlint-sampler", daemon=True)
+    sampler.start()
+    try:
+        target()
+    finally:
+        done.set()
+        sampler.join()
+        sys.setswitchinterval(switch)
+    return stacks
+
+
+def _shares(seconds: Dict[str, float]) -> Dict[str, Dict[str, float]]:
+    total = sum(seconds.values()) or 1.0
+    return {
+        name: {"seconds": round(s, 6), "share": round(s / total, 4)}
+        for name, s in sorted(seconds.items(), key=lambda kv: -kv[1])
+    }
+
+
+def format_result(result: BenchResult) -> List[str]:
+    lines = [
+        f"{result.corpus}: {result.records} records ({result.invalid} invalid), "
+        f"mode={result.mode} workers={result.workers} "
+        f"warmup={result.warmup} repetitions={result.repetitions}"
+    ]
+    best = max(result.throughput, default=0.0)
+    runs = ", ".join(f"{t:.0f}" for t in result.throughput)
+    lines.append(f"Throughput: {best:.0f} records/s best ({runs})")
+    if result.latency_ms:
+        lines.append(
+            "Latency (ms): "
+            + " ".join(f"{name}={value:.3f}" for name, value in result.latency_ms.items())
+        )
+    rss = f"Peak RSS: {result.peak_rss_mb} MB"
+    if result.peak_rss_children_mb is not None:
+        rss += f" (workers {result.peak_rss_children_mb} MB)"
+    lines.append(rss)
+    if result.errors:
+        lines.append(f"Errors: {result.errors}")
+    for title, rows in (("Stages", result.stages), ("Rules", result.rules)):
+        if not rows:
+            continue
+        lines.append(f"{title}:")
+        for name, row in rows.items():
+            extra = f", {row['issues']} issues" if "issues" in row else ""
+            lines.append(
+                f"  {name:<28} {row['seconds'] * 1000:10.1f} ms {row['share'] * 100:5.1f}%{extra}"
+            )
+    if result.profile:
+        lines.append(f"Profile written to {result.profile}")
+    return lines
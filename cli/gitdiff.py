@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import json
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from cli.watch import DEFAULT_PATTERNS
+from prompt_analysis import PromptAnalyzer, __version__
+from prompt_analysis.delta import DELTA_METRICS, metric_deltas, pct_change, report_metrics
+from prompt_analysis.report import PromptReport
+
+
+class GitError(RuntimeError):
+    pass
+
+
+def _git(repo: Path, *args: str) -> bytes:
+    proc = subprocess.run(
+        ["git", "-C", str(repo), *args],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    if proc.returncode != 0:
+        raise GitError(proc.stderr.decode("utf-8", errors="replace").strip())
+    return proc.stdout
+
+
+def parse_range(spec: str, repo: Path = Path(".")) -> Tuple[str, Optional[str]]:
+    """
+    "BASE..HEAD" -> (BASE, HEAD); "BASE" or "BASE.." -> (BASE, None), i.e. the
+    working tree. "BASE...HEAD" (and "BASE...") compares against the merge base of
+    BASE and HEAD instead, as `git diff BASE...HEAD` does.
+    """
+    if "..." in spec:
+        base, head = spec.split("...", 1)
+        merge_base = _git(repo, "merge-base", base or "HEAD", head or "HEAD")
+        return merge_base.decode().strip(), head or None
+    if ".." in spec:
+        base, head = spec.split("..", 1)
+        return base or "HEAD", head or None
+    return spec, None
+
+
+@dataclass
+class ChangedFile:
+    status: str
+    base_path: Optional[str]
+    head_path: Optional[str]
+
+    @property
+    def label(self) -> str:
+        if self.base_path and self.head_path and self.base_path != self.head_path:
+            return f"{self.base_path} -> {self.head_path}"
+        return self.head_path or self.base_path or ""
+
+
+class RevisionDiff:
+    """
+    Analyze only the prompt files that differ between two git revisions.
+
+    Reports are cached on disk by (blob id, SDK version, config fingerprint, model,
+    tokenizer), so the base side of a diff is normally read back from earlier runs
+    instead of being re-analyzed.
+    """
+
+    def __init__(
+        self,
+        analyzer: PromptAnalyzer,
+        *,
+        repo: Path = Path("."),
+        patterns: Iterable[str] = DEFAULT_PATTERNS,
+        cache_dir: Optional[Path] = None,
+        analyze_kwargs: Optional[Dict[str, Any]] = None,
+    ):
+        self.analyzer = analyzer
+        self.repo = Path(_git(Path(repo), "rev-parse", "--show-toplevel").decode().strip())
+        self.patterns = tuple(patterns)
+        self.cache_dir = cache_dir if cache_dir is not None else self.repo / ".promptlint-cache"
+        self.analyze_kwargs = analyze_kwargs or {}
+        # Cache keys are built per file; the config cannot change during a diff.
+        self._fingerprint = analyzer.cfg.fingerprint()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _matches(self, path: str) -> bool:
+        name = path.rsplit("/", 1)[-1]
+        return any(fnmatch.fnmatch(name, p) for p in self.patterns)
+
+    def changed_files(self, base: str, head: Optional[str]) -> List[ChangedFile]:
+        args = ["diff", "--name-status", "-z", "-M", base]
+        if head:
+            args.append(head)
+        fields = _git(self.repo, *args).decode("utf-8").split("\0")
+        out: List[ChangedFile] = []
+        i = 0
+        while i < len(fields) and fields[i]:
+            status = fields[i][0]
+            if status in "RC":
+                old, new = fields[i + 1], fields[i + 2]
+                i += 3
+            else:
+                old = new = fields[i + 1]
+                i += 2
+            if not (self._matches(old) or self._matches(new)):
+                continue
+            out.append(
+                ChangedFile(
+                    status=status,
+                    base_path=None if status == "A" else old,
+                    head_path=None if status == "D" else new,
+                )
+            )
+        return out
+
+    def _blob(self, rev: Optional[str], path: str) -> Tuple[str, bytes]:
+        if rev is None:
+            data = (self.repo / path).read_bytes()
+            return _git(self.repo, "hash-object", "--", path).decode().strip(), data
+        blob_id = _git(self.repo, "rev-parse", f"{rev}:{path}").decode().strip()
+        return blob_id, _git(self.repo, "cat-file", "blob", blob_id)
+
+    def _cache_key(self, blob_id: str) -> str:
+        parts = [
+            blob_id,
+            __version__,
+            self._fingerprint,
+            json.dumps(self.analyze_kwargs, sort_keys=True),
+        ]
+        return hashlib.sha1("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def report_for(self, rev: Optional[str], path: Optional[str]) -> Optional[PromptReport]:
+        if path is None:
+            return None
+        blob_id, data = self._blob(rev, path)
+        cache_file = self.cache_dir / f"{self._cache_key(blob_id)}.json"
+        if cache_file.exists():
+            self.cache_hits += 1
+            return PromptReport.from_dict(json.loads(cache_file.read_text(encoding="utf-8")))
+
+        self.cache_misses += 1
+        report = self.analyzer.analyze(
+            data.decode("utf-8", errors="replace"), fields="ci", **self.analyze_kwargs
+        )
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(report.to_dict(), ensure_ascii=False), encoding="utf-8")
+        tmp.replace(cache_file)
+        return report
+
+    def run(self, base: str, head: Optional[str]) -> Dict[str, Any]:
+        """
+        Per-file and total metric deltas (see prompt_analysis.delta.DELTA_METRICS).
+        """
+        files = []
+        totals_old = dict.fromkeys(DELTA_METRICS, 0)
+        totals_new = dict.fromkeys(DELTA_METRICS, 0)
+        for ch in self.changed_files(base, head):
+            old = self.report_for(base, ch.base_path)
+            new = self.report_for(head, ch.head_path)
+            for k, v in report_metrics(old).items():
+                totals_old[k] += v
+            for k, v in report_metrics(new).items():
+                totals_new[k] += v
+            files.append(
+                {
+                    "path": ch.label,
+                    "status": ch.status,
+                    "deltas": {
+                        k: {"base": a, "head": b, "delta": d}
+                        for k, (a, b, d) in metric_deltas(old, new).items()
+                    },
+                }
+            )
+
+        total = {
+            k: {
+                "base": totals_old[k],
+                "head": totals_new[k],
+                "delta": totals_new[k] - totals_old[k],
+                "pct": pct_change(totals_old[k], totals_new[k]),
+            }
+            for k in DELTA_METRICS
+            if k != "overall"
+        }
+        return {
+            "base": base,
+            "head": head or "WORKTREE",
+            "files": files,
+            "total": total,
+            "cache": {"hits": self.cache_hits, "misses": self.cache_misses},
+        }
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 import typer
 
@@ -133,4 +133,367 @@ def analyze(
         typer.echo("\nSuggested prompt:")
         typer.echo(report.suggestions.rewritten_prompt)
 
-    raise typer.Exit(code=exit_code)
\ No newline at end of file
+    raise typer.Exit(code=exit_code)
+
+
+@app.command("serve")
+def serve(
+    config: str = typer.Option("promptanalysis.yml", "--config", help="Path to YAML config."),
+    host: str = typer.Option("127.0.0.1", "--host", help="Interface to bind."),
+    port: int = typer.Option(8080, "--port", help="Port to listen on."),
+    workers: int = typer.Option(8, "--workers", help="Worker threads (max open connections)."),
+    max_body: int = typer.Option(
+        1_000_000, "--max-body", help="Reject request bodies larger than this many bytes."
+    ),
+    verbose: bool = typer.Option(False, "--verbose", help="Log every request."),
+    reload: bool = typer.Option(
+        False, "--reload", help="Watch the config file and hot-swap changes."
+    ),
+    ledger_tags: Optional[str] = typer.Option(
+        None,
+        "--ledger-tags",
+        help="Keep a cost ledger by these comma-separated tag keys (X-Promptlint-Tags).",
+    ),
+) -> None:
+    """
+    Serve POST /analyze, POST /analyze/batch and GET /metrics over HTTP.
+    """
+    from prompt_analysis.ledger import CostLedger
+    from prompt_analysis.reload import ReloadableConfig
+    from prompt_analysis.server import AnalysisServer
+
+    cfg_path = Path(config)
+    watcher = None
+    if reload and cfg_path.exists():
+        watcher = ReloadableConfig(cfg_path)
+        cfg = watcher.current
+    else:
+        cfg = AnalyzerConfig.load(cfg_path) if cfg_path.exists() else AnalyzerConfig()
+
+    ledger = None
+    if ledger_tags is not None:
+        try:
+            ledger = CostLedger(tags=[t.strip() for t in ledger_tags.split(",") if t.strip()])
+        except ValueError as e:
+            raise typer.BadParameter(str(e), param_hint="--ledger-tags")
+
+    analyzer = PromptAnalyzer(cfg)
+    if watcher is not None:
+        watcher.subscribe(analyzer.update_config)
+        watcher.start()
+
+    server = AnalysisServer(
+        (host, port),
+        analyzer,
+        workers=workers,
+        max_body_bytes=max_body,
+        quiet=not verbose,
+        ledger=ledger,
+    )
+    server.warm_up()
+    typer.echo(f"promptlint serving on http://{host}:{port} ({workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if watcher is not None:
+            watcher.stop()
+
+
+@app.command("batch")
+def batch(
+    input: Path = typer.Argument(..., help="JSONL file, one prompt-input record per line."),
+    out: Optional[Path] = typer.Option(
+        None, "--out", help="Write JSONL reports here instead of STDOUT."
+    ),
+    config: str = typer.Option("promptanalysis.yml", "--config", help="Path to YAML config."),
+    workers: Optional[int] = typer.Option(
+        None, "--workers", help="Worker processes (default: CPU count)."
+    ),
+    fields: Optional[str] = typer.Option(
+        None, "--fields", help="Report profile (full|ci|gate) or comma-separated sections."
+    ),
+    stats: bool = typer.Option(False, "--stats", help="Print per-stage throughput to STDERR."),
+) -> None:
+    """
+    Analyze a large JSONL file across processes; output order matches input order.
+    """
+    import json
+    import sys
+
+    from prompt_analysis.pipeline import ShardedPipeline
+
+    cfg_path = Path(config)
+    cfg = AnalyzerConfig.load(cfg_path) if cfg_path.exists() else AnalyzerConfig()
+    if fields and fields not in ("full", "ci", "gate"):
+        fields = [f.strip() for f in fields.split(",") if f.strip()]
+
+    pipeline = ShardedPipeline(cfg, workers=workers, fields=fields)
+    if out is not None:
+        with out.open("w", encoding="utf-8") as fh:
+            result = pipeline.run(input, fh)
+    else:
+        result = pipeline.run(input, sys.stdout)
+
+    if stats:
+        typer.echo(json.dumps(result.to_dict(), indent=2), err=True)
+    raise typer.Exit(code=1 if result.errors else 0)
+
+
+@app.command("estimate")
+def estimate(
+    file: Path = typer.Argument(..., help="File to estimate (any size; UTF-8 text)."),
+    config: str = typer.Option("promptanalysis.yml", "--config", help="Path to YAML config."),
+    confidence: float = typer.Option(0.95, "--confidence", help="Confidence level (0-1)."),
+    exact: bool = typer.Option(False, "--exact", help="Count the whole file instead."),
+    json_out: bool = typer.Option(False, "--json", help="Print machine-readable JSON output."),
+) -> None:
+    """
+    Estimate the tokens of a huge file from samples and check it against every model.
+    """
+    import json
+
+    from prompt_analysis.tokenizers import ApproxTokenizer
+
+    if not file.is_file():
+        raise typer.BadParameter(f"{file} is not a file")
+
+    cfg_path = Path(config)
+    cfg = AnalyzerConfig.load(cfg_path) if cfg_path.exists() else AnalyzerConfig()
+    # Input-token limits per model: the context window minus the default output.
+    limits = {
+        name: m.context_window_tokens - m.default_max_output_tokens
+        for name, m in cfg.models.items()
+        if m.context_window_tokens > 0
+    }
+    limits["max_input_tokens"] = cfg.defaults.max_input_tokens
+
+    options = {"min_sample_ratio": float("inf")} if exact else {}
+    result = ApproxTokenizer().count_sampled(
+        file, thresholds=limits.values(), confidence=confidence, **options
+    )
+    fits = {name: result.fits(limit) for name, limit in limits.items()}
+
+    if json_out:
+        typer.echo(json.dumps({**result.to_dict(), "limits": limits, "fits": fits}, indent=2))
+        raise typer.Exit()
+
+    if result.exact:
+        typer.echo(f"Tokens: {result.tokens} (exact)")
+    else:
+        typer.echo(
+            f"Tokens: {result.tokens} ({result.low}-{result.high} at "
+            f"{result.confidence:.0%}, sampled {result.sampled} of {result.total} bytes)"
+        )
+    for name, limit in limits.items():
+        typer.echo(f"  {name}: {'fits' if fits[name] else 'too large'} (limit {limit})")
+
+
+@app.command("bench")
+def bench(
+    corpus: Path = typer.Argument(
+        ..., help="JSONL file of prompt inputs, or a prompt file or directory."
+    ),
+    config: str = typer.Option("promptanalysis.yml", "--config", help="Path to YAML config."),
+    mode: str = typer.Option("serial", "--mode", help="Concurrency: serial|thread|process."),
+    workers: int = typer.Option(
+        0, "--workers", help="Threads or processes (default: CPU count)."
+    ),
+    repetitions: int = typer.Option(3, "--repeat", help="Timed passes over the corpus."),
+    warmup: int = typer.Option(100, "--warmup", help="Records analyzed before timing."),
+    fields: Optional[str] = typer.Option(
+        None, "--fields", help="Report profile (full|ci|gate) or comma-separated sections."
+    ),
+    pattern: Optional[List[str]] = typer.Option(
+        None, "--glob", help="Prompt file patterns (repeatable). Default: *.txt *.md *.prompt"
+    ),
+    profile: Optional[Path] = typer.Option(
+        None, "--profile", help="Profile one extra serial pass and write it here."
+    ),
+    profile_format: str = typer.Option(
+        "cprofile", "--profile-format", help="cprofile (pstats) | collapsed (flame graphs)."
+    ),
+    json_out: bool = typer.Option(False, "--json", help="Print machine-readable JSON output."),
+) -> None:
+    """
+    Replay a local corpus through the analyzer and report throughput, latency, memory
+    and where the time goes.
+    """
+    import json
+
+    from cli.bench import MODES, PROFILE_FORMATS, CorpusBench, format_result, load_corpus
+    from cli.watch import DEFAULT_PATTERNS
+
+    if not corpus.exists():
+        raise typer.BadParameter(f"{corpus} does not exist")
+    if mode not in MODES:
+        raise typer.BadParameter(f"--mode must be one of {', '.join(MODES)}")
+    if profile_format not in PROFILE_FORMATS:
+        raise typer.BadParameter(f"--profile-format must be one of {', '.join(PROFILE_FORMATS)}")
+
+    cfg_path = Path(config)
+    cfg = AnalyzerConfig.load(cfg_path) if cfg_path.exists() else AnalyzerConfig()
+    if fields and fields not in ("full", "ci", "gate"):
+        fields = [f.strip() for f in fields.split(",") if f.strip()]
+
+    records, invalid = load_corpus(corpus, pattern or DEFAULT_PATTERNS)
+    if not records:
+        typer.echo(f"No valid records in {corpus}", err=True)
+        raise typer.Exit(code=1)
+
+    runner = CorpusBench(
+        cfg,
+        records,
+        mode=mode,
+        workers=workers,
+        repetitions=repetitions,
+        warmup=warmup,
+        fields=fields,
+    )
+    result = runner.run(corpus=str(corpus), invalid=invalid)
+    if profile is not None:
+        runner.profile(profile, profile_format)
+        result.profile = str(profile)
+
+    if json_out:
+        typer.echo(json.dumps(result.to_dict(), indent=2))
+    else:
+        for line in format_result(result):
+            typer.echo(line)
+
+
+@app.command("watch")
+def watch(
+    path: Path = typer.Argument(..., help="Prompt file or directory to watch."),
+    config: str = typer.Option("promptanalysis.yml", "--config", help="Path to YAML config."),
+    model: Optional[str] = typer.Option(
+        None, "--model", help="Model name (overrides config default)."
+    ),
+    tokenizer: Optional[str] = typer.Option(None, "--tokenizer", help="Tokenizer name override."),
+    pattern: Optional[List[str]] = typer.Option(
+        None, "--glob", help="File patterns to watch (repeatable). Default: *.txt *.md *.prompt"
+    ),
+    interval: float = typer.Option(0.5, "--interval", help="Poll interval in seconds."),
+    debounce: float = typer.Option(
+        0.3, "--debounce", help="Wait this long after the last save before re-analyzing."
+    ),
+) -> None:
+    """
+    Re-analyze prompt files as they change and print score/token/cost deltas.
+    """
+    from cli.watch import DEFAULT_PATTERNS, PromptWatcher
+
+    if not path.exists():
+        raise typer.BadParameter(f"{path} does not exist")
+
+    cfg_path = Path(config)
+    cfg = AnalyzerConfig.load(cfg_path) if cfg_path.exists() else AnalyzerConfig()
+
+    watcher = PromptWatcher(
+        path,
+        PromptAnalyzer(cfg),
+        patterns=pattern or DEFAULT_PATTERNS,
+        poll_interval=interval,
+        debounce=debounce,
+        analyze_kwargs={"model": model, "tokenizer": tokenizer},
+        echo=typer.echo,
+    )
+    typer.echo(f"Watching {path} (Ctrl+C to stop)")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+
+
+@app.command("diff")
+def diff(
+    revisions: str = typer.Argument(
+        ..., help="BASE..HEAD, or BASE alone to compare against the working tree."
+    ),
+    config: str = typer.Option("promptanalysis.yml", "--config", help="Path to YAML config."),
+    model: Optional[str] = typer.Option(
+        None, "--model", help="Model name (overrides config default)."
+    ),
+    tokenizer: Optional[str] = typer.Option(None, "--tokenizer", help="Tokenizer name override."),
+    pattern: Optional[List[str]] = typer.Option(
+        None, "--glob", help="Prompt file patterns (repeatable). Default: *.txt *.md *.prompt"
+    ),
+    cache_dir: Optional[Path] = typer.Option(
+        None, "--cache-dir", help="Report cache (default: <repo>/.promptlint-cache)."
+    ),
+    json_out: bool = typer.Option(False, "--json", help="Print machine-readable JSON output."),
+    fail_on_cost_increase: Optional[float] = typer.Option(
+        None,
+        "--fail-on-cost-increase",
+        help="Exit non-zero if total estimated cost rises by more than this percentage.",
+    ),
+    fail_on_token_increase: Optional[float] = typer.Option(
+        None,
+        "--fail-on-token-increase",
+        help="Exit non-zero if total input tokens rise by more than this percentage.",
+    ),
+) -> None:
+    """
+    Analyze prompt files changed between two git revisions and print token/cost deltas.
+    """
+    import json
+
+    from cli.gitdiff import GitError, RevisionDiff, parse_range
+    from prompt_analysis.delta import format_value as fmt
+
+    cfg_path = Path(config)
+    cfg = AnalyzerConfig.load(cfg_path) if cfg_path.exists() else AnalyzerConfig()
+
+    try:
+        base, head = parse_range(revisions)
+        differ = RevisionDiff(
+            PromptAnalyzer(cfg),
+            **({"patterns": pattern} if pattern else {}),
+            cache_dir=cache_dir,
+            analyze_kwargs={"model": model, "tokenizer": tokenizer},
+        )
+        result = differ.run(base, head)
+    except GitError as e:
+        typer.echo(f"git: {e}", err=True)
+        raise typer.Exit(code=1)
+
+    exit_code = 0
+    for limit, metric in (
+        (fail_on_cost_increase, "cost_current"),
+        (fail_on_token_increase, "input_tokens"),
+    ):
+        if limit is None:
+            continue
+        total = result["total"][metric]
+        if total["pct"] is None:
+            # Base total was 0: no percentage, so any increase exceeds the limit.
+            exceeded = total["delta"] > 0
+        else:
+            exceeded = total["pct"] > limit
+        if exceeded:
+            exit_code = 2
+
+    if json_out:
+        typer.echo(json.dumps(result, indent=2))
+        raise typer.Exit(code=exit_code)
+
+    typer.echo(f"{result['base']}..{result['head']}: {len(result['files'])} prompt file(s) changed")
+    for f in result["files"]:
+        d = f["deltas"]
+        typer.echo(
+            f"[{f['status']}] {f['path']}: "
+            + " | ".join(
+                f"{m} {fmt(m, d[m]['base'])} -> {fmt(m, d[m]['head'])} "
+                f"({fmt(m, d[m]['delta'], True)})"
+                for m in ("input_tokens", "wasted_tokens_est", "cost_current")
+            )
+        )
+    typer.echo("Total:")
+    for m, t in result["total"].items():
+        pct = "n/a" if t["pct"] is None else f"{t['pct']:+.1f}%"
+        typer.echo(
+            f"  {m}: {fmt(m, t['base'])} -> {fmt(m, t['head'])} ({fmt(m, t['delta'], True)}, {pct})"
+        )
+    raise typer.Exit(code=exit_code)
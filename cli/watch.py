@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from prompt_analysis import PromptAnalyzer
+from prompt_analysis.delta import format_delta
+from prompt_analysis.report import PromptReport
+
+DEFAULT_PATTERNS = ("*.txt", "*.md", "*.prompt")
+
+
+def find_prompt_files(path: Path, patterns: Iterable[str] = DEFAULT_PATTERNS) -> List[Path]:
+    """`path` itself if it is a file, else matching files below it (hidden dirs skipped)."""
+    if path.is_file():
+        return [path]
+    patterns = tuple(patterns)
+    out = []
+    for root, dirs, files in os.walk(path):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for name in files:
+            if any(fnmatch.fnmatch(name, p) for p in patterns):
+                out.append(Path(root) / name)
+    return out
+
+
+class PromptWatcher:
+    """
+    Poll a file or directory and re-analyze prompt files whose content changed.
+
+    Changes are detected cheaply by (mtime, size) and confirmed by content hash, so
+    touching a file or saving identical content does not trigger analysis. Saves that
+    arrive within `debounce` seconds of each other are coalesced into one batch.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        analyzer: PromptAnalyzer,
+        *,
+        patterns: Iterable[str] = DEFAULT_PATTERNS,
+        poll_interval: float = 0.5,
+        debounce: float = 0.3,
+        analyze_kwargs: Optional[Dict[str, Any]] = None,
+        echo: Callable[[str], None] = print,
+    ):
+        self.path = Path(path)
+        self.analyzer = analyzer
+        self.patterns = tuple(patterns)
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.analyze_kwargs = analyze_kwargs or {}
+        self.echo = echo
+
+        self._stats: Dict[Path, Tuple[int, int]] = {}
+        self._hashes: Dict[Path, str] = {}
+        self._reports: Dict[Path, PromptReport] = {}
+
+    def _files(self) -> List[Path]:
+        return find_prompt_files(self.path, self.patterns)
+
+    def poll(self) -> Set[Path]:
+        """
+        Paths whose (mtime, size) changed, appeared or disappeared since the last poll.
+        """
+        seen: Dict[Path, Tuple[int, int]] = {}
+        for p in self._files():
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            seen[p] = (st.st_mtime_ns, st.st_size)
+        changed = {p for p, sig in seen.items() if self._stats.get(p) != sig}
+        changed |= set(self._stats) - set(seen)
+        self._stats = seen
+        return changed
+
+    def _label(self, p: Path) -> str:
+        if self.path.is_dir():
+            return str(p.relative_to(self.path))
+        return str(p)
+
+    def analyze(self, paths: Iterable[Path]) -> List[str]:
+        """
+        Re-analyze the given paths if their content changed; return one line per
+        file whose report changed.
+        """
+        lines = []
+        for p in sorted(paths):
+            try:
+                data = p.read_bytes()
+            except FileNotFoundError:
+                if self._hashes.pop(p, None) is not None:
+                    self._reports.pop(p, None)
+                    lines.append(format_delta(self._label(p), None, None))
+                continue
+
+            digest = hashlib.sha1(data).hexdigest()
+            if self._hashes.get(p) == digest:
+                continue
+            self._hashes[p] = digest
+
+            report = self.analyzer.analyze(
+                data.decode("utf-8", errors="replace"), **self.analyze_kwargs
+            )
+            previous = self._reports.get(p)
+            self._reports[p] = report
+            lines.append(format_delta(self._label(p), previous, report))
+        return lines
+
+    def run(self, *, iterations: Optional[int] = None) -> None:
+        """
+        Analyze everything once, then watch until interrupted (or for `iterations`
+        polls, which is mainly useful for scripting).
+        """
+        for line in self.analyze(self.poll()):
+            self.echo(line)
+
+        pending: Set[Path] = set()
+        last_change = 0.0
+        n = 0
+        while iterations is None or n < iterations:
+            n += 1
+            time.sleep(min(self.poll_interval, self.debounce) if pending else self.poll_interval)
+            changed = self.poll()
+            now = time.monotonic()
+            if changed:
+                pending |= changed
+                last_change = now
+                continue
+            if pending and now - last_change >= self.debounce:
+                for line in self.analyze(pending):
+                    self.echo(line)
+                pending.clear()
@@ -1,5 +1,3 @@
-let pyodideReady = false;
-let pyodide = null;
 let lastSuggestedPrompt = null;
 
 const el = (id) => document.getElementById(id);
@@ -60,184 +58,120 @@ function renderReport(r) {
   el("rawJson").textContent = JSON.stringify(r, null, 2);
 }
 
-async function initPyodide() {
-  setStatus("Loading Pyodide…");
-    pyodide = await loadPyodide();
-  setStatus("Installing Python dependencies…");
-
-  // Install dependencies needed by the SDK
-  await pyodide.loadPackage("micropip");
-  await pyodide.runPythonAsync(`
-import micropip
-await micropip.install(["pyyaml"])
-`);
-setStatus("Installing Python dependencies…");
-
-
-// Install PyYAML (required by prompt_analysis.config)
-await pyodide.loadPackage("micropip");
-await pyodide.runPythonAsync(`
-import micropip
-await micropip.install(["pyyaml"])
-`);
-
-  // Make demo/py importable
-  pyodide.FS.mkdirTree("/home/py");
-  // fetch python package files list dynamically is hard on Pages,
-  // so we rely on pre-copied `demo/py/prompt_analysis/` folder.
-  // Pyodide can import from current URL using micropip is possible, but this is simpler.
-
-  // Add current directory and /home/py to sys.path
-  await pyodide.runPythonAsync(`
-import sys
-sys.path.append('.')
-sys.path.append('/home/py')
-`);
-
-  // Load the local python package into /home/py by fetching files that exist under demo/py/.
-  // We'll fetch a known list of files that are required for MVP.
-  const files = [
-    "prompt_analysis/__init__.py",
-    "prompt_analysis/analyzer.py",
-    "prompt_analysis/config.py",
-    "prompt_analysis/normalized.py",
-    "prompt_analysis/report.py",
-    "prompt_analysis/rules/__init__.py",
-    "prompt_analysis/rules/base.py",
-    "prompt_analysis/rules/runner.py",
-    "prompt_analysis/rules/core/__init__.py",
-    "prompt_analysis/rules/core/missing_output_format.py",
-    "prompt_analysis/rules/core/no_output_limit.py",
-    "prompt_analysis/tokenizers/__init__.py",
-    "prompt_analysis/tokenizers/base.py",
-    "prompt_analysis/tokenizers/approx.py",
-  ];
+// Pyodide and the analyzer live in a Web Worker so large pastes never freeze the page.
+const worker = new Worker("./worker.js");
+const pending = new Map();
+let nextId = 1;
+let workerReady = false;
+let firstAnalysisAt = null;
+
+// Main-thread blocking: total duration of long tasks (>50 ms) since page load.
+let longTaskMs = 0;
+if (window.PerformanceObserver && PerformanceObserver.supportedEntryTypes?.includes("longtask")) {
+  new PerformanceObserver((list) => {
+    for (const entry of list.getEntries()) longTaskMs += entry.duration;
+  }).observe({ type: "longtask", buffered: true });
+}
 
-  for (const f of files) {
-    const resp = await fetch(`./py/${f}`);
-    if (!resp.ok) {
-      throw new Error(`Failed to fetch ./py/${f} (HTTP ${resp.status})`);
-    }
-    const content = await resp.text();
-    const fullPath = `/home/py/${f}`;
-    const dir = fullPath.split("/").slice(0, -1).join("/");
-    pyodide.FS.mkdirTree(dir);
-    pyodide.FS.writeFile(fullPath, content);
+function reportPerf(timings) {
+  const parts = [
+    `first analysis ${Math.round(firstAnalysisAt)} ms after load`,
+    `main-thread long tasks ${Math.round(longTaskMs)} ms`,
+  ];
+  if (timings) {
+    parts.push(
+      `pyodide+bundle ${Math.round(timings.pyodideAndBundleMs)} ms` +
+        (timings.bundleCached ? " (bundle cached)" : ""),
+      `packages ${Math.round(timings.packagesMs)} ms`,
+      `import ${Math.round(timings.importMs)} ms`,
+    );
   }
+  el("perf").textContent = parts.join(" · ");
+  console.info("[demo perf]", { firstAnalysisAt, longTaskMs, ...timings });
+}
 
-  // Warm import
-  await pyodide.runPythonAsync(`
-from prompt_analysis.config import AnalyzerConfig
-from prompt_analysis import PromptAnalyzer
-`);
+let initTimings = null;
 
-  pyodideReady = true;
-  setStatus("Ready ✅");
+worker.onmessage = (event) => {
+  const msg = event.data;
+  if (msg.type === "ready") {
+    workerReady = true;
+    initTimings = msg.timings;
+    setStatus("Ready ✅");
+    analyze();
+    return;
+  }
+  const req = pending.get(msg.id);
+  if (!req) {
+    if (msg.type === "error") setStatus(msg.message);
+    return;
+  }
+  pending.delete(msg.id);
+  if (msg.type === "result") req.resolve(msg);
+  else if (msg.type === "cancelled") req.resolve(null);
+  else req.reject(new Error(msg.message));
+};
+
+// Only the newest request matters: starting one cancels the previous one if the worker
+// has not picked it up yet, and any result that still arrives for it is ignored.
+let latestId = 0;
+
+function request(payload) {
+  const id = nextId++;
+  if (latestId && pending.has(latestId)) worker.postMessage({ id: latestId, type: "cancel" });
+  latestId = id;
+  return new Promise((resolve, reject) => {
+    pending.set(id, { resolve, reject });
+    worker.postMessage({ id, type: "analyze", payload });
+  });
 }
 
 async function analyze() {
-  if (!pyodideReady) return;
-
-  const prompt = el("prompt").value || "";
-  const model = el("model").value;
-  const expectedOutput = parseInt(el("expectedOutput").value || "300", 10);
-  const maxInput = parseInt(el("maxInput").value || "2500", 10);
+  if (!workerReady) return;
 
   setStatus("Analyzing…");
+  const sentAt = performance.now();
+  try {
+    const res = await request({
+      prompt: el("prompt").value || "",
+      model: el("model").value,
+      expectedOutput: parseInt(el("expectedOutput").value || "300", 10),
+      maxInput: parseInt(el("maxInput").value || "2500", 10),
+    });
+    if (!res || res.id !== latestId) return; // superseded while in flight
+    renderReport(JSON.parse(res.report));
+    if (firstAnalysisAt === null) {
+      firstAnalysisAt = performance.now();
+      reportPerf(initTimings);
+    }
+    const total = performance.now() - sentAt;
+    setStatus(`Ready ✅ (analysis ${res.ms.toFixed(1)} ms, update ${total.toFixed(1)} ms)`);
+  } catch (e) {
+    console.error(e);
+    setStatus("Analysis failed: " + e.message);
+  }
+}
 
-  // Keep config inline for demo; you can later load promptanalysis.yml into demo too
-  const cfgYaml = `
-defaults:
-  model: "gpt-4o-mini"
-  tokenizer: "approx"
-  expected_output_tokens: 300
-  max_input_tokens: 2500
-
-models:
-  - name: "gpt-4o-mini"
-    tokenizer: "approx"
-    default_max_output_tokens: 300
-    pricing:
-      currency: "USD"
-      input_per_1k: 0.00015
-      output_per_1k: 0.00060
-
-  - name: "claude-3-5-sonnet"
-    tokenizer: "approx"
-    default_max_output_tokens: 400
-    pricing:
-      currency: "USD"
-      input_per_1k: 0.00300
-      output_per_1k: 0.01500
-`.trim();
-
-  pyodide.globals.set("PROMPT_TEXT", prompt);
-  pyodide.globals.set("MODEL_NAME", model);
-  pyodide.globals.set("EXPECTED_OUT", expectedOutput);
-  pyodide.globals.set("MAX_IN", maxInput);
-  pyodide.globals.set("CFG_YAML", cfgYaml);
-
-  const result = await pyodide.runPythonAsync(`
-import yaml
-from prompt_analysis.config import AnalyzerConfig, AnalyzerDefaults, ModelProfile, ModelPricing
-from prompt_analysis import PromptAnalyzer
-
-data = yaml.safe_load(CFG_YAML) or {}
-
-# Build AnalyzerConfig without filesystem
-d = data.get("defaults", {}) or {}
-defaults = AnalyzerDefaults(
-    model=str(d.get("model","default")),
-    tokenizer=str(d.get("tokenizer","approx")),
-    expected_output_tokens=int(d.get("expected_output_tokens",300)),
-    max_input_tokens=int(d.get("max_input_tokens",2500)),
-)
-
-models = {}
-for m in (data.get("models") or []):
-    pr = m.get("pricing") or None
-    pricing = None
-    if pr:
-        pricing = ModelPricing(
-            input_per_1k=float(pr.get("input_per_1k",0.0)),
-            output_per_1k=float(pr.get("output_per_1k",0.0)),
-            currency=str(pr.get("currency","USD")),
-        )
-    mp = ModelProfile(
-        name=str(m["name"]),
-        context_window_tokens=int(m.get("context_window_tokens",0)),
-        default_max_output_tokens=int(m.get("default_max_output_tokens",300)),
-        tokenizer=str(m.get("tokenizer","approx")),
-        pricing=pricing,
-    )
-    models[mp.name] = mp
-
-cfg = AnalyzerConfig(defaults=defaults, models=models)
-analyzer = PromptAnalyzer(cfg)
-report = analyzer.analyze(
-    PROMPT_TEXT,
-    model=MODEL_NAME,
-    expected_output_tokens=int(EXPECTED_OUT),
-    max_input_tokens=int(MAX_IN),
-)
-
-report.to_json(indent=2)
-`);
-
-  const parsed = JSON.parse(result);
-  renderReport(parsed);
-  setStatus("Ready ✅");
+// Live analysis while typing, once input pauses for LIVE_DEBOUNCE_MS.
+const LIVE_DEBOUNCE_MS = 150;
+let liveTimer = null;
+
+function scheduleAnalyze() {
+  clearTimeout(liveTimer);
+  liveTimer = setTimeout(analyze, LIVE_DEBOUNCE_MS);
 }
 
-el("analyzeBtn").addEventListener("click", analyze);
+for (const id of ["prompt", "expectedOutput", "maxInput"]) {
+  el(id).addEventListener("input", scheduleAnalyze);
+}
+el("model").addEventListener("change", analyze);
+el("analyzeBtn").addEventListener("click", () => {
+  clearTimeout(liveTimer);
+  analyze();
+});
 el("copyBtn").addEventListener("click", async () => {
   if (!lastSuggestedPrompt) return;
   await navigator.clipboard.writeText(lastSuggestedPrompt);
   setStatus("Copied suggested prompt ✅");
   setTimeout(() => setStatus("Ready ✅"), 1200);
 });
-
-initPyodide().catch((e) => {
-  console.error(e);
-  setStatus("Failed to load demo: " + e.message);
-});
\ No newline at end of file
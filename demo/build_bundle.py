@@ -0,0 +1,56 @@
+"""
+Pack the demo's Python sources into one zip the Web Worker fetches and unpacks.
+
+    python demo/build_bundle.py
+
+Writes demo/py/bundle.zip (prompt_analysis/ plus demo_bridge.py) and demo/py/bundle.json
+with a content hash; the worker requests the zip as bundle.zip?v=<hash> and keeps it in
+the Cache API, so repeat visits skip the download until the sources change.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import json
+import zipfile
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+# Fixed timestamp so identical sources give an identical zip (and hash).
+_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+
+def build(py_dir: Path) -> bytes:
+    files = sorted(
+        p
+        for p in (py_dir / "prompt_analysis").rglob("*.py")
+        if "__pycache__" not in p.parts
+    )
+    files.append(py_dir / "demo_bridge.py")
+
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for path in files:
+            info = zipfile.ZipInfo(path.relative_to(py_dir).as_posix(), date_time=_EPOCH)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            zf.writestr(info, path.read_bytes())
+    return buf.getvalue()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--py-dir", type=Path, default=HERE / "py")
+    args = ap.parse_args()
+
+    data = build(args.py_dir)
+    version = hashlib.sha256(data).hexdigest()[:12]
+    (args.py_dir / "bundle.zip").write_bytes(data)
+    (args.py_dir / "bundle.json").write_text(
+        json.dumps({"version": version, "bytes": len(data)}) + "\n", encoding="utf-8"
+    )
+    print(f"bundle.zip: {len(data)} bytes, version {version}")
+
+
+if __name__ == "__main__":
+    main()
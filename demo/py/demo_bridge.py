@@ -0,0 +1,98 @@
+"""
+Entry points the demo Web Worker calls. Analyzers are built once per config and reused.
+"""
+from __future__ import annotations
+
+import json
+
+from prompt_analysis import PromptAnalyzer
+from prompt_analysis.config import (
+    AnalyzerConfig,
+    AnalyzerDefaults,
+    ModelPricing,
+    ModelProfile,
+)
+from prompt_analysis.incremental import IncrementalAnalyzer
+
+DEMO_CONFIG = {
+    "defaults": {
+        "model": "gpt-4o-mini",
+        "tokenizer": "approx",
+        "expected_output_tokens": 300,
+        "max_input_tokens": 2500,
+    },
+    "models": [
+        {
+            "name": "gpt-4o-mini",
+            "tokenizer": "approx",
+            "default_max_output_tokens": 300,
+            "pricing": {"currency": "USD", "input_per_1k": 0.00015, "output_per_1k": 0.00060},
+        },
+        {
+            "name": "claude-3-5-sonnet",
+            "tokenizer": "approx",
+            "default_max_output_tokens": 400,
+            "pricing": {"currency": "USD", "input_per_1k": 0.00300, "output_per_1k": 0.01500},
+        },
+    ],
+}
+
+_analyzer = None
+_incremental = None
+
+
+def _build_config(data) -> AnalyzerConfig:
+    d = data.get("defaults", {}) or {}
+    defaults = AnalyzerDefaults(
+        model=str(d.get("model", "default")),
+        tokenizer=str(d.get("tokenizer", "approx")),
+        expected_output_tokens=int(d.get("expected_output_tokens", 300)),
+        max_input_tokens=int(d.get("max_input_tokens", 2500)),
+    )
+    models = {}
+    for m in data.get("models") or []:
+        pr = m.get("pricing") or None
+        pricing = None
+        if pr:
+            pricing = ModelPricing(
+                input_per_1k=float(pr.get("input_per_1k", 0.0)),
+                output_per_1k=float(pr.get("output_per_1k", 0.0)),
+                currency=str(pr.get("currency", "USD")),
+            )
+        mp = ModelProfile(
+            name=str(m["name"]),
+            context_window_tokens=int(m.get("context_window_tokens", 0)),
+            default_max_output_tokens=int(m.get("default_max_output_tokens", 300)),
+            tokenizer=str(m.get("tokenizer", "approx")),
+            pricing=pricing,
+        )
+        models[mp.name] = mp
+    models.setdefault(
+        "default",
+        ModelProfile(
+            name="default",
+            default_max_output_tokens=defaults.expected_output_tokens,
+            tokenizer=defaults.tokenizer,
+        ),
+    )
+    return AnalyzerConfig(defaults=defaults, models=models)
+
+
+def analyzer() -> PromptAnalyzer:
+    global _analyzer, _incremental
+    if _analyzer is None:
+        _analyzer = PromptAnalyzer(_build_config(DEMO_CONFIG))
+        _incremental = IncrementalAnalyzer(_analyzer)
+    return _analyzer
+
+
+def analyze(prompt, model, expected_output_tokens, max_input_tokens) -> str:
+    # Live typing re-sends the whole textarea; unchanged paragraphs come from cache.
+    analyzer()
+    report = _incremental.analyze(
+        prompt,
+        model=model,
+        expected_output_tokens=int(expected_output_tokens),
+        max_input_tokens=int(max_input_tokens),
+    )
+    return json.dumps(report.to_dict(), ensure_ascii=False)
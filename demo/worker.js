@@ -0,0 +1,115 @@
+// Runs Pyodide and the analyzer off the main thread.
+//
+// Messages in:  { id, type: "analyze", payload: { prompt, model, expectedOutput, maxInput } }
+//               { id, type: "cancel" }
+// Messages out: { type: "ready", timings }
+//               { id, type: "result", report, ms }
+//               { id, type: "cancelled" }
+//               { id, type: "error", message }
+//
+// Only the newest analyze request is run: requests that queue up behind a running one
+// (fast typing) are answered with "cancelled" instead of being analyzed in turn.
+
+const PYODIDE_URL = "https://cdn.jsdelivr.net/pyodide/v0.25.1/full/";
+const BUNDLE_CACHE = "promptlint-demo-bundle";
+
+importScripts(`${PYODIDE_URL}pyodide.js`);
+
+let pyodide = null;
+let bridge = null;
+
+async function fetchBundle() {
+  // bundle.json is tiny and always revalidated; the zip itself is immutable per version.
+  const meta = await (await fetch("./py/bundle.json", { cache: "no-cache" })).json();
+  const url = new URL(`./py/bundle.zip?v=${meta.version}`, self.location).href;
+
+  let cache = null;
+  if (self.caches) {
+    cache = await caches.open(BUNDLE_CACHE);
+    const hit = await cache.match(url);
+    if (hit) return { buffer: await hit.arrayBuffer(), cached: true };
+  }
+
+  const resp = await fetch(url);
+  if (!resp.ok) throw new Error(`Failed to fetch ${url} (HTTP ${resp.status})`);
+  if (cache) {
+    // Drop bundles of older versions, then keep this one.
+    for (const req of await cache.keys()) await cache.delete(req);
+    await cache.put(url, resp.clone());
+  }
+  return { buffer: await resp.arrayBuffer(), cached: false };
+}
+
+async function init() {
+  const timings = {};
+  let t = performance.now();
+
+  // Pyodide and the bundle download in parallel.
+  const [py, bundle] = await Promise.all([loadPyodide(), fetchBundle()]);
+  pyodide = py;
+  timings.pyodideAndBundleMs = performance.now() - t;
+  timings.bundleCached = bundle.cached;
+
+  t = performance.now();
+  // Shipped with the Pyodide distribution, so no micropip round trip is needed.
+  await pyodide.loadPackage("pyyaml");
+  timings.packagesMs = performance.now() - t;
+
+  t = performance.now();
+  pyodide.unpackArchive(bundle.buffer, "zip", { extractDir: "/home/py" });
+  pyodide.runPython("import sys; sys.path.insert(0, '/home/py')");
+  bridge = pyodide.pyimport("demo_bridge");
+  bridge.analyzer(); // build config, tokenizers and plan cache now, not on first click
+  timings.importMs = performance.now() - t;
+
+  self.postMessage({ type: "ready", timings });
+}
+
+function analyze(payload) {
+  const { prompt, model, expectedOutput, maxInput } = payload;
+  return bridge.analyze(prompt, model, expectedOutput, maxInput);
+}
+
+const ready = init().catch((e) => {
+  self.postMessage({ type: "error", message: `Failed to load demo: ${e.message}` });
+  throw e;
+});
+
+let pending = null; // newest analyze request not yet started
+let scheduled = false;
+
+function supersede(request) {
+  if (pending) self.postMessage({ id: pending.id, type: "cancelled" });
+  pending = request;
+}
+
+async function drain() {
+  await ready;
+  // Yield once so messages already queued behind this task are seen first.
+  await new Promise((resolve) => setTimeout(resolve, 0));
+  scheduled = false;
+  const request = pending;
+  pending = null;
+  if (!request) return;
+  try {
+    const t = performance.now();
+    const report = analyze(request.payload);
+    self.postMessage({ id: request.id, type: "result", report, ms: performance.now() - t });
+  } catch (e) {
+    self.postMessage({ id: request.id, type: "error", message: e.message });
+  }
+}
+
+self.onmessage = (event) => {
+  const { id, type, payload } = event.data;
+  if (type === "cancel") {
+    if (pending && pending.id === id) supersede(null);
+    return;
+  }
+  if (type !== "analyze") return;
+  supersede({ id, payload });
+  if (!scheduled) {
+    scheduled = true;
+    drain();
+  }
+};
@@ -1,5 +1,16 @@
 __version__ = "0.1.0"
 
 from .analyzer import PromptAnalyzer
+from .gate import GateDecision, GateDenied, PreflightGate
+from .ledger import CostLedger
+from .session import ConversationSession
 
-__all__ = ["PromptAnalyzer", "__version__"]
\ No newline at end of file
+__all__ = [
+    "ConversationSession",
+    "CostLedger",
+    "GateDecision",
+    "GateDenied",
+    "PreflightGate",
+    "PromptAnalyzer",
+    "__version__",
+]
\ No newline at end of file
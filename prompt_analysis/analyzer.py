@@ -1,22 +1,39 @@
 from __future__ import annotations
 
+import hashlib
+import threading
+import time
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import AbstractSet, Any, Dict, Iterable, List, Optional, Tuple, Union
 
+from prompt_analysis.cache import LRUCache
 from prompt_analysis.config import AnalyzerConfig
-from prompt_analysis.normalized import normalize_messages
+from prompt_analysis.normalized import CONTEXT_SEPARATOR, cap_input, normalize_messages
+from prompt_analysis.plan import AnalysisPlan, compile_plan
+from prompt_analysis.prefix_cache import PrefixIndex
 from prompt_analysis.report import (
+    REPORT_FIELDS,
     CostEstimate,
     Issue,
     PromptReport,
-    Scores,
     Suggestions,
     TokenEstimates,
+    resolve_fields,
 )
-from prompt_analysis.rules import DEFAULT_RULES
-from prompt_analysis.rules.base import RuleContext
+from prompt_analysis.rules import configured_rules
+from prompt_analysis.rules.base import NormalizedPrompt
 from prompt_analysis.rules.runner import run_rules
-from prompt_analysis.tokenizers import TOKENIZERS
+from prompt_analysis.tokenizers import TOKENIZERS, TieredTokenizer, build_tokenizer
+from prompt_analysis.tokenizers.base import Tokenizer
+
+# Stages reported through the `timings` argument of analyze_messages() / run_plan().
+STAGES = ("plan", "normalize", "tokens", "rules", "report")
+
+
+def _lap(timings: Dict[str, float], stage: str, since: float) -> float:
+    now = time.perf_counter()
+    timings[stage] = timings.get(stage, 0.0) + now - since
+    return now
 
 
 @dataclass
@@ -27,9 +44,135 @@ class AnalyzerOptions:
     tokenizer: str = "approx"
 
 
+@dataclass(frozen=True)
+class _ConfigState:
+    """
+    A config and the registry of tokenizers built from it, published together by one
+    assignment. The registry only ever gains tokenizers built from `cfg`.
+    """
+
+    cfg: AnalyzerConfig
+    tokenizers: Dict[str, Tokenizer]
+
+
 class PromptAnalyzer:
-    def __init__(self, config: Optional[AnalyzerConfig] = None):
-        self.cfg = config or AnalyzerConfig()
+    """
+    Thread-safe: one analyzer can serve any number of threads. Analyses read an
+    immutable plan and take no locks; building tokenizers and update_config() serialize
+    on an internal lock, and the caches are LRUCache (see cache.py).
+    """
+
+    def __init__(
+        self,
+        config: Optional[AnalyzerConfig] = None,
+        chunk_cache_size: int = 4096,
+        plan_cache_size: int = 256,
+    ):
+        self._state = _ConfigState(config or AnalyzerConfig(), dict(TOKENIZERS))
+        # (tokenizer name, chunk id or content hash) -> token count
+        self.chunk_cache: LRUCache[Tuple[str, str], int] = LRUCache(chunk_cache_size)
+        # (model, tokenizer, expected_output_tokens, max_input_tokens) as passed by the caller
+        self._plans: LRUCache[tuple, AnalysisPlan] = LRUCache(plan_cache_size)
+        self._lock = threading.RLock()
+
+    @property
+    def cfg(self) -> AnalyzerConfig:
+        return self._state.cfg
+
+    def get_tokenizer(self, name: str) -> Tokenizer:
+        return self._resolve_tokenizer(name, self._state)
+
+    def _resolve_tokenizer(self, name: str, state: _ConfigState) -> Tokenizer:
+        registry = state.tokenizers
+        tok = registry.get(name)
+        if tok is not None:
+            return tok
+        with self._lock:
+            # Another thread may have built it while this one waited.
+            tok = registry.get(name)
+            if tok is not None:
+                return tok
+            cfg = state.cfg
+            spec = cfg.tokenizers.get(name)
+            if spec is None:
+                available = sorted(set(registry) | set(cfg.tokenizers))
+                raise ValueError(f"Unknown tokenizer '{name}'. Available: {available}")
+            tok = build_tokenizer(spec, lambda n: self._resolve_tokenizer(n, state))
+            registry[name] = tok
+            return tok
+
+    def update_config(self, cfg: AnalyzerConfig) -> None:
+        """
+        Swap in a new config. Analyses already running keep the snapshot they started
+        with. Only tokenizers whose spec changed (and tokenizers composed over them) are
+        rebuilt, eagerly and before the swap, and only their cached chunk counts dropped.
+        """
+        with self._lock:
+            current = self._state
+            old = current.cfg
+            stale = {
+                name
+                for name in set(old.tokenizers) | set(cfg.tokenizers)
+                if old.tokenizers.get(name) != cfg.tokenizers.get(name)
+            }
+            changed = True
+            while changed:
+                changed = False
+                for name, tok in current.tokenizers.items():
+                    if name in stale or not isinstance(tok, TieredTokenizer):
+                        continue
+                    if tok.fast.name in stale or tok.precise.name in stale:
+                        stale.add(name)
+                        changed = True
+
+            state = _ConfigState(
+                cfg, {k: v for k, v in current.tokenizers.items() if k not in stale}
+            )
+            for name in sorted(stale & set(cfg.tokenizers)):
+                self._resolve_tokenizer(name, state)
+
+            defaults_changed = old.defaults != cfg.defaults
+            rules_changed = old.rules != cfg.rules
+
+            def plan_is_stale(key: tuple, plan: AnalysisPlan) -> bool:
+                return (
+                    defaults_changed
+                    or rules_changed
+                    or plan.tokenizer_name in stale
+                    or old.get_model(plan.model) != cfg.get_model(plan.model)
+                )
+
+            self._state = state
+            self._plans.discard_where(plan_is_stale)
+            if stale:
+                self.chunk_cache.discard_where(lambda key, _: key[0] in stale)
+
+    def plan(
+        self,
+        *,
+        model: Optional[str] = None,
+        tokenizer: Optional[str] = None,
+        expected_output_tokens: Optional[int] = None,
+        max_input_tokens: Optional[int] = None,
+    ) -> AnalysisPlan:
+        key = (model, tokenizer, expected_output_tokens, max_input_tokens)
+        plan = self._plans.get(key)
+        if plan is None:
+            state = self._state
+            plan = compile_plan(
+                state.cfg,
+                lambda name: self._resolve_tokenizer(name, state),
+                configured_rules(state.cfg),
+                model=model,
+                tokenizer=tokenizer,
+                expected_output_tokens=expected_output_tokens,
+                max_input_tokens=max_input_tokens,
+            )
+            with self._lock:
+                # Not cached if update_config swapped the config while compiling.
+                if state is self._state:
+                    self._plans.put(key, plan)
+        return plan
 
     def analyze(
         self,
@@ -39,22 +182,15 @@ class PromptAnalyzer:
         expected_output_tokens: Optional[int] = None,
         max_input_tokens: Optional[int] = None,
         tokenizer: Optional[str] = None,
+        fields: Union[str, Iterable[str], None] = None,
     ) -> PromptReport:
-        model = model or self.cfg.defaults.model
-        expected_output_tokens = self.cfg.resolve_expected_output_tokens(
-            model, expected_output_tokens
-        )
-        max_input_tokens = self.cfg.resolve_max_input_tokens(max_input_tokens)
-        tokenizer = self.cfg.resolve_tokenizer(model, tokenizer)
-
-        messages = [{"role": "user", "content": prompt or ""}]
-        return self.analyze_messages(
-            messages,
+        plan = self.plan(
             model=model,
+            tokenizer=tokenizer,
             expected_output_tokens=expected_output_tokens,
             max_input_tokens=max_input_tokens,
-            tokenizer=tokenizer,
         )
+        return self.run_plan(plan, [{"role": "user", "content": prompt or ""}], fields=fields)
 
     def analyze_messages(
         self,
@@ -65,121 +201,325 @@ class PromptAnalyzer:
         max_input_tokens: Optional[int] = None,
         tokenizer: Optional[str] = None,
         context_chunks: Optional[List[Dict[str, Any]]] = None,
+        prefix_index: Optional[PrefixIndex] = None,
+        fields: Union[str, Iterable[str], None] = None,
+        timings: Optional[Dict[str, float]] = None,
     ) -> PromptReport:
-        model = model or self.cfg.defaults.model
-        expected_output_tokens = self.cfg.resolve_expected_output_tokens(
-            model, expected_output_tokens
+        """
+        `fields` projects the report onto a profile ("full", "gate", "ci") or a set of
+        top-level sections (see report.REPORT_FIELDS); stages whose output is not
+        requested are skipped and their sections left as None.
+        `timings`, when given, accumulates seconds per STAGES entry and per rule
+        ("rule:<code>"); pass one dict across calls to profile a corpus.
+        """
+        started = time.perf_counter() if timings is not None else 0.0
+        plan = self.plan(
+            model=model,
+            tokenizer=tokenizer,
+            expected_output_tokens=expected_output_tokens,
+            max_input_tokens=max_input_tokens,
+        )
+        if timings is not None:
+            _lap(timings, "plan", started)
+        return self.run_plan(
+            plan,
+            messages,
+            context_chunks=context_chunks,
+            prefix_index=prefix_index,
+            fields=fields,
+            timings=timings,
         )
-        max_input_tokens = self.cfg.resolve_max_input_tokens(max_input_tokens)
-        tokenizer = self.cfg.resolve_tokenizer(model, tokenizer)
-
-        tok = TOKENIZERS.get(tokenizer)
-        if tok is None:
-            available = list(TOKENIZERS.keys())
-            raise ValueError(f"Unknown tokenizer '{tokenizer}'. Available: {available}")
 
+    def run_plan(
+        self,
+        plan: AnalysisPlan,
+        messages: List[Dict[str, str]],
+        *,
+        context_chunks: Optional[List[Dict[str, Any]]] = None,
+        prefix_index: Optional[PrefixIndex] = None,
+        fields: Union[str, Iterable[str], None] = None,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> PromptReport:
+        t = time.perf_counter() if timings is not None else 0.0
+        messages, context_chunks, capped = cap_input(
+            messages, context_chunks, plan.max_input_chars, plan.max_messages
+        )
         normalized = normalize_messages(messages, context_chunks=context_chunks)
+        if timings is not None:
+            t = _lap(timings, "normalize", t)
 
-        input_tokens = tok.count_messages(normalized.messages) + tok.count_text(
-            normalized.context_text
+        flags: Dict[str, Any] = {"mvp": True}
+        counting, input_tokens, context_tokens, chunk_tokens = self._count_input(
+            plan, normalized, capped, flags
         )
-        output_tokens_est = max(int(expected_output_tokens or 0), 0)
 
-        ctx = RuleContext(
-            model=model,
-            tokenizer=tokenizer,
-            budgets={"max_input_tokens": max_input_tokens},
+        cached_input_tokens = 0
+        if prefix_index is not None:
+            cached_input_tokens = prefix_index.observe(normalized.messages, counting)
+        if timings is not None:
+            t = _lap(timings, "tokens", t)
+
+        issues: List[Issue] = run_rules(plan.rules, normalized, plan.rule_ctx, timings)
+        if timings is not None:
+            t = _lap(timings, "rules", t)
+
+        report = self._build_report(
+            plan,
+            base_text=normalized.user_text or normalized.joined_text,
+            issues=issues,
+            input_tokens=input_tokens,
+            context_tokens=context_tokens,
+            chunk_tokens=chunk_tokens,
+            flags=flags,
+            cached_input_tokens=cached_input_tokens,
+            fields=resolve_fields(fields),
         )
-        issues: List[Issue] = run_rules(DEFAULT_RULES, normalized, ctx)
+        if timings is not None:
+            _lap(timings, "report", t)
+        return report
 
-        missing: List[str] = []
-        code_to_missing = {
-            "MISSING_OUTPUT_FORMAT": "Output format (e.g., JSON schema / bullets / table)",
-            "NO_OUTPUT_LIMIT": "Output length limit (max words/tokens/bullets)",
-        }
-        for iss in issues:
-            item = code_to_missing.get(iss.code)
-            if item and item not in missing:
-                missing.append(item)
-
-        output_risk = 0
-        if any(i.code == "MISSING_OUTPUT_FORMAT" for i in issues):
-            output_risk += 40
-        if any(i.code == "NO_OUTPUT_LIMIT" for i in issues):
-            output_risk += 30
-
-        wasted_tokens_est = min(int(input_tokens * 0.20) + output_risk, int(input_tokens * 0.6))
-        wasted_tokens_est = max(wasted_tokens_est, 0)
-
-        efficiency = max(0, 100 - int((wasted_tokens_est / max(input_tokens, 1)) * 120))
-        completeness = 100 - (20 if missing else 0)
-        structure = 85 if not any(i.code == "MISSING_OUTPUT_FORMAT" for i in issues) else 70
-        clarity = 80
-        overall = int(round((clarity + completeness + structure + efficiency) / 4))
-
-        base_text = normalized.user_text or normalized.joined_text
-        rewritten = self._rewrite_suggestion(base_text, expected_output_tokens)
-
-        pricing = self.cfg.get_pricing(model)
-        cost_estimate = None
-        if pricing:
-            current = (
-                (input_tokens / 1000.0) * pricing.input_per_1k
-                + (output_tokens_est / 1000.0) * pricing.output_per_1k
+    def _count_input(
+        self,
+        plan: AnalysisPlan,
+        normalized: NormalizedPrompt,
+        capped: Optional[Dict[str, int]],
+        flags: Dict[str, Any],
+    ) -> Tuple[Tokenizer, int, int, List[Dict[str, Any]]]:
+        """
+        Input and context token counts of a (possibly capped) prompt, plus the tokenizer
+        that produced them. Records the tokenizer tier and input cap in `flags`.
+        """
+        tok = plan.tokenizer
+        if isinstance(tok, TieredTokenizer):
+            counting = tok.fast
+            context_tokens, chunk_tokens = self._count_context(counting, normalized)
+            input_tokens = counting.count_messages(normalized.messages) + context_tokens
+            if tok.is_ambiguous(input_tokens, plan.thresholds):
+                counting = tok.precise
+                context_tokens, chunk_tokens = self._count_context(counting, normalized)
+                input_tokens = counting.count_messages(normalized.messages) + context_tokens
+                flags["tokenizer_tier"] = "precise"
+            else:
+                flags["tokenizer_tier"] = "fast"
+        else:
+            counting = tok
+            context_tokens, chunk_tokens = self._count_context(tok, normalized)
+            input_tokens = tok.count_messages(normalized.messages) + context_tokens
+
+        if capped is not None:
+            input_tokens, context_tokens = self._extrapolate(
+                counting, input_tokens, context_tokens, capped, flags
             )
+        return counting, input_tokens, context_tokens, chunk_tokens
 
-            input_savings = sum(max(0, i.savings_tokens_est) for i in issues)
-            optimized_input = max(input_tokens - input_savings, 0)
+    def _extrapolate(
+        self,
+        counting: Tokenizer,
+        input_tokens: int,
+        context_tokens: int,
+        capped: Dict[str, int],
+        flags: Dict[str, Any],
+    ) -> Tuple[int, int]:
+        """Scale counts of the analyzed part of a capped input to the full input."""
+        scale = capped["chars"] / capped["kept_chars"] if capped["kept_chars"] else 1.0
+        dropped = capped["messages"] - capped["kept_messages"]
+        overhead = counting.count_messages([{"role": "user", "content": ""}])
+        flags["input_capped"] = capped
+        return (
+            int(round(input_tokens * scale)) + dropped * overhead,
+            int(round(context_tokens * scale)),
+        )
 
-            needs_output_controls = any(
-                i.code in ("MISSING_OUTPUT_FORMAT", "NO_OUTPUT_LIMIT") for i in issues
-            )
-            output_reduction_factor = 0.8 if needs_output_controls else 1.0
-            optimized_output = max(int(output_tokens_est * output_reduction_factor), 0)
+    def analyze_input(
+        self,
+        record: Dict[str, Any],
+        fields: Union[str, Iterable[str], None] = None,
+        timings: Optional[Dict[str, float]] = None,
+    ) -> PromptReport:
+        """
+        Analyze one record shaped like docs/prompt-input.schema.json.
+        """
+        if not isinstance(record, dict):
+            raise ValueError("Input must be a JSON object")
+        messages = record.get("messages")
+        if messages is None:
+            prompt = record.get("prompt")
+            if prompt is None:
+                raise ValueError("Input requires 'prompt' or 'messages'")
+            messages = [{"role": "user", "content": prompt}]
+        return self.analyze_messages(
+            messages,
+            model=record.get("model"),
+            expected_output_tokens=record.get("expected_output_tokens"),
+            max_input_tokens=record.get("max_input_tokens"),
+            tokenizer=record.get("tokenizer"),
+            context_chunks=record.get("context_chunks"),
+            fields=fields,
+            timings=timings,
+        )
 
-            optimized = (
-                (optimized_input / 1000.0) * pricing.input_per_1k
-                + (optimized_output / 1000.0) * pricing.output_per_1k
-            )
-            savings = max(current - optimized, 0.0)
-            savings_pct = (savings / current * 100.0) if current > 0 else 0.0
-
-            cost_estimate = CostEstimate(
-                currency=pricing.currency,
-                current=float(round(current, 8)),
-                optimized=float(round(optimized, 8)),
-                savings=float(round(savings, 8)),
-                savings_pct=float(round(savings_pct, 2)),
-                input_per_1k=pricing.input_per_1k,
-                output_per_1k=pricing.output_per_1k,
+    def _build_report(
+        self,
+        plan: AnalysisPlan,
+        *,
+        base_text: str,
+        issues: List[Issue],
+        input_tokens: int,
+        context_tokens: int,
+        chunk_tokens: List[Dict[str, Any]],
+        flags: Dict[str, Any],
+        cached_input_tokens: int = 0,
+        fields: AbstractSet[str] = REPORT_FIELDS,
+    ) -> PromptReport:
+        scoring = plan.scoring
+        codes = {i.code for i in issues}
+        output_risk = scoring.output_risk(codes)
+        wasted_tokens_est = scoring.wasted_tokens(input_tokens, output_risk)
+
+        budgets: Dict[str, Any] = {
+            "max_input_tokens": plan.max_input_tokens,
+            "within_budget": input_tokens <= plan.max_input_tokens,
+        }
+        if plan.context_window_tokens > 0:
+            budgets["context_window_tokens"] = plan.context_window_tokens
+            budgets["fits_context_window"] = (
+                input_tokens + plan.output_tokens_est <= plan.context_window_tokens
             )
 
-        return PromptReport(
-            model=model,
-            scores=Scores(
-                overall=overall,
-                clarity=clarity,
-                completeness=completeness,
-                structure=structure,
-                efficiency=efficiency,
-            ),
-            token_estimates=TokenEstimates(
+        report: Dict[str, Any] = {}
+        if fields is not REPORT_FIELDS:
+            flags["fields"] = sorted(fields)
+            if "created_at" not in fields:
+                report["created_at"] = None
+
+        missing: List[str] = []
+        if "scores" in fields or "suggestions" in fields:
+            missing = scoring.missing(i.code for i in issues)
+        report["scores"] = (
+            scoring.scores(input_tokens, wasted_tokens_est, missing, codes)
+            if "scores" in fields
+            else None
+        )
+        report["token_estimates"] = (
+            TokenEstimates(
                 input_tokens=input_tokens,
-                output_tokens_est=output_tokens_est,
+                output_tokens_est=plan.output_tokens_est,
                 wasted_tokens_est=wasted_tokens_est,
                 output_risk_tokens_est=output_risk,
-            ),
-            cost_estimate=cost_estimate,
-            issues=issues,
-            suggestions=Suggestions(
+                context_tokens=context_tokens,
+                cached_input_tokens=cached_input_tokens,
+                context_chunk_tokens=chunk_tokens,
+            )
+            if "token_estimates" in fields
+            else None
+        )
+        if "cost_estimate" in fields:
+            report["cost_estimate"] = self._cost_estimate(
+                plan, issues, codes, input_tokens, cached_input_tokens
+            )
+        report["issues"] = issues if "issues" in fields else None
+        report["suggestions"] = (
+            Suggestions(
                 missing=missing,
-                rewritten_prompt=rewritten,
+                rewritten_prompt=self._rewrite_suggestion(base_text, plan.expected_output_tokens),
                 notes=[],
-            ),
-            budgets={"max_input_tokens": max_input_tokens},
-            flags={"mvp": True},
+            )
+            if "suggestions" in fields
+            else None
+        )
+
+        return PromptReport(model=plan.model, budgets=budgets, flags=flags, **report)
+
+    def _cost_estimate(
+        self,
+        plan: AnalysisPlan,
+        issues: List[Issue],
+        codes: AbstractSet[str],
+        input_tokens: int,
+        cached_input_tokens: int,
+    ) -> Optional[CostEstimate]:
+        pricing = plan.pricing
+        if not pricing:
+            return None
+
+        scoring = plan.scoring
+        output_tokens_est = plan.output_tokens_est
+        cached_rate = pricing.cached_input_per_1k
+        if cached_rate is None:
+            cached_rate = pricing.input_per_1k
+        cached = min(cached_input_tokens, input_tokens)
+        current = (
+            ((input_tokens - cached) / 1000.0) * pricing.input_per_1k
+            + (cached / 1000.0) * cached_rate
+            + (output_tokens_est / 1000.0) * pricing.output_per_1k
         )
 
+        input_savings = sum(max(0, i.savings_tokens_est) for i in issues)
+        optimized_input = max(input_tokens - input_savings, 0)
+
+        output_reduction_factor = (
+            scoring.output_reduction_factor if scoring.needs_output_controls(codes) else 1.0
+        )
+        optimized_output = max(int(output_tokens_est * output_reduction_factor), 0)
+
+        optimized_cached = min(cached, optimized_input)
+        optimized = (
+            ((optimized_input - optimized_cached) / 1000.0) * pricing.input_per_1k
+            + (optimized_cached / 1000.0) * cached_rate
+            + (optimized_output / 1000.0) * pricing.output_per_1k
+        )
+        savings = max(current - optimized, 0.0)
+        savings_pct = (savings / current * 100.0) if current > 0 else 0.0
+
+        return CostEstimate(
+            currency=pricing.currency,
+            current=float(round(current, 8)),
+            optimized=float(round(optimized, 8)),
+            savings=float(round(savings, 8)),
+            savings_pct=float(round(savings_pct, 2)),
+            input_per_1k=pricing.input_per_1k,
+            output_per_1k=pricing.output_per_1k,
+            cached_input_per_1k=pricing.cached_input_per_1k,
+        )
+
+    def _count_context(
+        self, tok: Tokenizer, normalized: NormalizedPrompt
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        chunks = normalized.context_chunks
+        if not chunks:
+            return 0, []
+
+        keys: List[str] = []
+        counts: List[Optional[int]] = []
+        missing: List[int] = []
+        for c in chunks:
+            text = c["text"] or ""
+            key = c["id"] or "sha1:" + hashlib.sha1(text.encode("utf-8")).hexdigest()
+            n = self.chunk_cache.get((tok.name, key))
+            if n is None:
+                missing.append(len(keys))
+            keys.append(key)
+            counts.append(n)
+        # Uncached chunks are counted in one batch.
+        if missing:
+            texts = [chunks[i]["text"] or "" for i in missing]
+            # count_many is optional for custom tokenizers registered at runtime.
+            count_many = getattr(tok, "count_many", None)
+            fresh = count_many(texts) if count_many else [tok.count_text(t) for t in texts]
+            for i, n in zip(missing, fresh):
+                counts[i] = n
+            with self._lock:
+                # Skip if update_config replaced this tokenizer while counting.
+                if self._state.tokenizers.get(tok.name) is tok:
+                    for i in missing:
+                        self.chunk_cache.put((tok.name, keys[i]), counts[i])
+
+        per_chunk = [{"id": k, "tokens": n} for k, n in zip(keys, counts)]
+        total = sum(counts)
+
+        total += (len(chunks) - 1) * tok.count_text(CONTEXT_SEPARATOR)
+        return total, per_chunk
+
     def _rewrite_suggestion(self, user_text: str, expected_output_tokens: int) -> str:
         user_text = (user_text or "").strip() or "(No user prompt provided)"
         return (
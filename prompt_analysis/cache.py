@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Small bounded mapping with least-recently-used eviction. Safe to share between
+    threads: writers serialize on a lock, reads take no lock and refresh recency only
+    when the lock is free, so under contention eviction order is approximately LRU.
+    `hits` and `misses` are statistics and may undercount under concurrency.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be > 0")
+        self.maxsize = int(maxsize)
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[K, V]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.hits += 1
+        lock = self._lock
+        if lock.acquire(blocking=False):
+            try:
+                self._data.move_to_end(key)
+            except KeyError:  # evicted since the read
+                pass
+            finally:
+                lock.release()
+        return value
+
+    def put(self, key: K, value: V) -> None:
+        with self._lock:
+            data = self._data
+            data[key] = value
+            data.move_to_end(key)
+            if len(data) > self.maxsize:
+                data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def discard_where(self, predicate: Callable[[K, V], bool]) -> int:
+        """Drop every entry for which `predicate(key, value)` holds; returns the count."""
+        with self._lock:
+            doomed = [k for k, v in self._data.items() if predicate(k, v)]
+            for k in doomed:
+                del self._data[k]
+        return len(doomed)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
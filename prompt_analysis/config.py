@@ -1,17 +1,22 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, Iterable, Optional
 
 import yaml
 
+from prompt_analysis.rules.matcher import PatternSet
+
 
 @dataclass(frozen=True)
 class ModelPricing:
     input_per_1k: float
     output_per_1k: float
     currency: str = "USD"
+    cached_input_per_1k: Optional[float] = None
 
 
 @dataclass(frozen=True)
@@ -23,18 +28,42 @@ class ModelProfile:
     pricing: Optional[ModelPricing] = None
 
 
+@dataclass(frozen=True)
+class TokenizerSpec:
+    name: str
+    type: str
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class RuleSpec:
+    """
+    Per-rule vocabulary from the `rules:` section. With `extend` the patterns are
+    added to the rule's built-in ones, otherwise they replace them.
+    """
+    code: str
+    patterns: PatternSet = field(default_factory=PatternSet)
+    extend: bool = True
+
+
 @dataclass
 class AnalyzerDefaults:
     model: str = "default"
     tokenizer: str = "approx"
     expected_output_tokens: int = 300
     max_input_tokens: int = 2500
+    # Hard caps on what is analyzed in full; larger inputs are truncated and their
+    # token counts extrapolated (flagged as `input_capped`). 0 disables a cap.
+    max_input_chars: int = 2_000_000
+    max_messages: int = 10_000
 
 
 @dataclass
 class AnalyzerConfig:
     defaults: AnalyzerDefaults = field(default_factory=AnalyzerDefaults)
     models: Dict[str, ModelProfile] = field(default_factory=dict)
+    tokenizers: Dict[str, TokenizerSpec] = field(default_factory=dict)
+    rules: Dict[str, RuleSpec] = field(default_factory=dict)
 
     @staticmethod
     def load(path: str | Path) -> "AnalyzerConfig":
@@ -47,6 +76,8 @@ class AnalyzerConfig:
             tokenizer=str(d.get("tokenizer", "approx")),
             expected_output_tokens=int(d.get("expected_output_tokens", 300)),
             max_input_tokens=int(d.get("max_input_tokens", 2500)),
+            max_input_chars=int(d.get("max_input_chars", 2_000_000)),
+            max_messages=int(d.get("max_messages", 10_000)),
         )
 
         models: Dict[str, ModelProfile] = {}
@@ -59,6 +90,11 @@ class AnalyzerConfig:
                     input_per_1k=float(pr.get("input_per_1k", 0.0)),
                     output_per_1k=float(pr.get("output_per_1k", 0.0)),
                     currency=str(pr.get("currency", "USD")),
+                    cached_input_per_1k=(
+                        float(pr["cached_input_per_1k"])
+                        if pr.get("cached_input_per_1k") is not None
+                        else None
+                    ),
                 )
 
             default_max_out = int(
@@ -73,6 +109,20 @@ class AnalyzerConfig:
                 pricing=pricing,
             )
 
+        tokenizers: Dict[str, TokenizerSpec] = {}
+        for t in (data.get("tokenizers") or []):
+            name = str(t["name"])
+            options = {k: v for k, v in t.items() if k not in ("name", "type")}
+            for k, v in options.items():
+                # File options are relative to the config file, not the CWD.
+                if k.endswith("_file") and v and not Path(v).is_absolute():
+                    options[k] = str(p.parent / v)
+            tokenizers[name] = TokenizerSpec(
+                name=name,
+                type=str(t.get("type", name)),
+                options=options,
+            )
+
         if "default" not in models:
             models["default"] = ModelProfile(
                 name="default",
@@ -82,7 +132,46 @@ class AnalyzerConfig:
                 pricing=None,
             )
 
-        return AnalyzerConfig(defaults=defaults, models=models)
+        rules: Dict[str, RuleSpec] = {}
+        for code, r in (data.get("rules") or {}).items():
+            r = r or {}
+            rules[str(code)] = RuleSpec(
+                code=str(code),
+                patterns=PatternSet(
+                    keywords=tuple(str(k) for k in r.get("keywords") or ()),
+                    words=tuple(str(w) for w in r.get("words") or ()),
+                    regexes=tuple(str(x) for x in r.get("regexes") or ()),
+                ),
+                extend=bool(r.get("extend", True)),
+            )
+
+        cfg = AnalyzerConfig(
+            defaults=defaults, models=models, tokenizers=tokenizers, rules=rules
+        )
+        # Compile rule matchers now: bad regexes fail at load, and analyzers sharing
+        # this config find them in the fingerprint-keyed cache.
+        from prompt_analysis.rules import configured_rules
+
+        configured_rules(cfg)
+        return cfg
+
+    def fingerprint(self) -> str:
+        blob = json.dumps(asdict(self), sort_keys=True, default=str)
+        return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+    def validate(self, builtin_tokenizers: Iterable[str] = ()) -> None:
+        """
+        Raise ValueError if the config references tokenizers that are not defined.
+        """
+        known = set(builtin_tokenizers) | set(self.tokenizers)
+        referenced = {self.defaults.tokenizer} | {m.tokenizer for m in self.models.values()}
+        for spec in self.tokenizers.values():
+            referenced.update(
+                str(spec.options[k]) for k in ("fast", "precise") if k in spec.options
+            )
+        missing = sorted(referenced - known)
+        if missing:
+            raise ValueError(f"Config references undefined tokenizers: {missing}")
 
     def get_model(self, model: Optional[str]) -> ModelProfile:
         name = model or self.defaults.model
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple
+
+from prompt_analysis.report import PromptReport
+
+# Metrics compared between two versions of a prompt, in display order.
+DELTA_METRICS = ("overall", "input_tokens", "wasted_tokens_est", "cost_current", "cost_optimized")
+
+
+def report_metrics(report: Optional[PromptReport]) -> Dict[str, float]:
+    """
+    Flatten the comparable numbers of a report; a missing report counts as zero.
+    """
+    out = dict.fromkeys(DELTA_METRICS, 0)
+    if report is None:
+        return out
+    if report.scores is not None:
+        out["overall"] = report.scores.overall
+    if report.token_estimates is not None:
+        out["input_tokens"] = report.token_estimates.input_tokens
+        out["wasted_tokens_est"] = report.token_estimates.wasted_tokens_est
+    if report.cost_estimate is not None:
+        out["cost_current"] = report.cost_estimate.current
+        out["cost_optimized"] = report.cost_estimate.optimized
+    return out
+
+
+def metric_deltas(
+    old: Optional[PromptReport], new: Optional[PromptReport]
+) -> Dict[str, Tuple[float, float, float]]:
+    """
+    {metric: (old, new, new - old)} for every metric in DELTA_METRICS.
+    """
+    a, b = report_metrics(old), report_metrics(new)
+    return {k: (a[k], b[k], b[k] - a[k]) for k in DELTA_METRICS}
+
+
+def pct_change(old: float, new: float) -> Optional[float]:
+    """
+    Relative change in percent; None when there is no baseline to compare against.
+    """
+    if old == 0:
+        return None
+    return (new - old) / old * 100.0
+
+
+def format_value(metric: str, value: float, signed: bool = False) -> str:
+    """A metric value as printed by format_delta and `promptlint diff`."""
+    if metric.startswith("cost_"):
+        return f"{value:+.6f}" if signed else f"{value:.6f}"
+    return f"{int(value):+d}" if signed else f"{int(value)}"
+
+
+def format_delta(label: str, old: Optional[PromptReport], new: Optional[PromptReport]) -> str:
+    """
+    One human-readable line, e.g.
+    `a.txt: overall 78 -> 83 (+5) | input_tokens 120 -> 95 (-25) | ...`
+    """
+    if new is None:
+        return f"{label}: removed"
+    parts = []
+    for metric, (a, b, d) in metric_deltas(old, new).items():
+        if old is None or d == 0:
+            parts.append(f"{metric} {format_value(metric, b)}")
+        else:
+            before, after = format_value(metric, a), format_value(metric, b)
+            change = format_value(metric, d, signed=True)
+            parts.append(f"{metric} {before} -> {after} ({change})")
+    prefix = f"{label} (new)" if old is None else label
+    return f"{prefix}: " + " | ".join(parts)
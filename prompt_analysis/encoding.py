@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import json
+import math
+import struct
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from prompt_analysis.report import (
+    CostEstimate,
+    Issue,
+    PromptReport,
+    Scores,
+    Suggestions,
+    TokenEstimates,
+)
+
+# Fixed-width record header. Everything a trend query needs lives here, so readers
+# can `unpack_from` a memory-mapped segment without touching the variable tail.
+HEADER = struct.Struct("<IdIIIBBBBBBIIIIIIIIIddddddd")
+HEADER_FIELDS = (
+    "record_len",
+    "created_at",
+    "model_id",
+    "schema_version_id",
+    "sdk_version_id",
+    "sections",
+    "overall",
+    "clarity",
+    "completeness",
+    "structure",
+    "efficiency",
+    "input_tokens",
+    "output_tokens_est",
+    "wasted_tokens_est",
+    "redundant_tokens_est",
+    "boilerplate_tokens_est",
+    "output_risk_tokens_est",
+    "context_tokens",
+    "cached_input_tokens",
+    "currency_id",
+    "cost_current",
+    "cost_optimized",
+    "cost_savings",
+    "cost_savings_pct",
+    "input_per_1k",
+    "output_per_1k",
+    "cached_input_per_1k",
+)
+FIELD_INDEX = {name: i for i, name in enumerate(HEADER_FIELDS)}
+
+# (code id, severity id, message id, fix id, savings_tokens_est)
+ISSUE = struct.Struct("<IIIIi")
+_U32 = struct.Struct("<I")
+
+# Bits of the `sections` header byte: which optional sections are present.
+HAS_SCORES = 1
+HAS_TOKENS = 2
+HAS_COST = 4
+HAS_ISSUES = 8
+HAS_SUGGESTIONS = 16
+HAS_CREATED_AT = 32
+
+# Section bit a header field belongs to; the field holds a placeholder (0 or NaN)
+# when that bit is unset. Fields not listed are always present.
+FIELD_SECTION = {
+    "created_at": HAS_CREATED_AT,
+    **{f: HAS_SCORES for f in HEADER_FIELDS[6:11]},
+    **{f: HAS_TOKENS for f in HEADER_FIELDS[11:19]},
+    **{f: HAS_COST for f in HEADER_FIELDS[19:]},
+}
+
+_NAN = float("nan")
+
+
+class StringTable:
+    """
+    Append-only string dictionary shared by every record of a log: model names,
+    issue codes, severities and messages are stored once and referenced by id.
+    """
+
+    def __init__(self, strings: Iterable[str] = ()):
+        self.strings: List[str] = []
+        self._ids: Dict[str, int] = {}
+        for s in strings:
+            self.intern(s)
+
+    def intern(self, s: str) -> int:
+        sid = self._ids.get(s)
+        if sid is None:
+            sid = self._ids[s] = len(self.strings)
+            self.strings.append(s)
+        return sid
+
+    def lookup(self, sid: int) -> str:
+        return self.strings[sid]
+
+    def id_of(self, s: str) -> Optional[int]:
+        return self._ids.get(s)
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+
+def _opt(x: Optional[float]) -> float:
+    return _NAN if x is None else float(x)
+
+
+def _unopt(x: float) -> Optional[float]:
+    return None if math.isnan(x) else x
+
+
+def _timestamp(created_at: Optional[str]) -> float:
+    if not created_at:
+        return _NAN
+    return datetime.fromisoformat(created_at).timestamp()
+
+
+def encode_report(report: PromptReport, strings: StringTable) -> bytes:
+    intern = strings.intern
+    sections = 0
+
+    sc = report.scores
+    if sc is not None:
+        sections |= HAS_SCORES
+        scores = (sc.overall, sc.clarity, sc.completeness, sc.structure, sc.efficiency)
+    else:
+        scores = (0, 0, 0, 0, 0)
+
+    te = report.token_estimates
+    if te is not None:
+        sections |= HAS_TOKENS
+        tokens = (
+            te.input_tokens,
+            te.output_tokens_est,
+            te.wasted_tokens_est,
+            te.redundant_tokens_est,
+            te.boilerplate_tokens_est,
+            te.output_risk_tokens_est,
+            te.context_tokens,
+            te.cached_input_tokens,
+        )
+    else:
+        tokens = (0,) * 8
+
+    ce = report.cost_estimate
+    if ce is not None:
+        sections |= HAS_COST
+        cost = (
+            intern(ce.currency),
+            ce.current,
+            ce.optimized,
+            ce.savings,
+            ce.savings_pct,
+            _opt(ce.input_per_1k),
+            _opt(ce.output_per_1k),
+            _opt(ce.cached_input_per_1k),
+        )
+    else:
+        cost = (0, _NAN, _NAN, _NAN, _NAN, _NAN, _NAN, _NAN)
+
+    if report.created_at:
+        sections |= HAS_CREATED_AT
+
+    body = bytearray()
+    if report.issues is not None:
+        sections |= HAS_ISSUES
+        body += _U32.pack(len(report.issues))
+        for i in report.issues:
+            body += ISSUE.pack(
+                intern(i.code),
+                intern(str(i.severity)),
+                intern(i.message),
+                intern(i.fix),
+                int(i.savings_tokens_est),
+            )
+
+    # Rarely queried, variable-shape parts ride along as one compact JSON blob.
+    extra: Dict[str, Any] = {}
+    if te is not None and te.context_chunk_tokens:
+        extra["context_chunk_tokens"] = te.context_chunk_tokens
+    if report.issues and any(i.evidence for i in report.issues):
+        extra["evidence"] = [i.evidence for i in report.issues]
+    if report.suggestions is not None:
+        sections |= HAS_SUGGESTIONS
+        extra["suggestions"] = {
+            "missing": [intern(m) for m in report.suggestions.missing],
+            "rewritten_prompt": report.suggestions.rewritten_prompt,
+            "notes": report.suggestions.notes,
+        }
+    if report.budgets is not None:
+        extra["budgets"] = report.budgets
+    if report.flags is not None:
+        extra["flags"] = report.flags
+    blob = json.dumps(extra, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    body += _U32.pack(len(blob)) + blob
+
+    head = HEADER.pack(
+        HEADER.size + len(body),
+        _timestamp(report.created_at),
+        intern(report.model),
+        intern(report.schema_version),
+        intern(report.sdk_version),
+        sections,
+        *(max(0, min(255, int(x))) for x in scores),
+        *tokens,
+        *cost,
+    )
+    return head + bytes(body)
+
+
+def decode_header(buf, offset: int = 0) -> tuple:
+    return HEADER.unpack_from(buf, offset)
+
+
+def decode_report(buf, strings: StringTable, offset: int = 0) -> PromptReport:
+    h = HEADER.unpack_from(buf, offset)
+    lookup = strings.lookup
+    sections = h[FIELD_INDEX["sections"]]
+    pos = offset + HEADER.size
+
+    issues: Optional[List[Issue]] = None
+    if sections & HAS_ISSUES:
+        (n,) = _U32.unpack_from(buf, pos)
+        pos += _U32.size
+        issues = []
+        for _ in range(n):
+            code, sev, msg, fix, savings = ISSUE.unpack_from(buf, pos)
+            pos += ISSUE.size
+            issues.append(
+                Issue(
+                    code=lookup(code),
+                    severity=lookup(sev),
+                    message=lookup(msg),
+                    fix=lookup(fix),
+                    savings_tokens_est=savings,
+                )
+            )
+    (blob_len,) = _U32.unpack_from(buf, pos)
+    pos += _U32.size
+    extra = json.loads(bytes(buf[pos : pos + blob_len]).decode("utf-8"))
+    if issues and "evidence" in extra:
+        for issue, evidence in zip(issues, extra["evidence"]):
+            issue.evidence = evidence
+
+    scores = None
+    if sections & HAS_SCORES:
+        scores = Scores(*h[6:11])
+    token_estimates = None
+    if sections & HAS_TOKENS:
+        token_estimates = TokenEstimates(
+            input_tokens=h[11],
+            output_tokens_est=h[12],
+            wasted_tokens_est=h[13],
+            redundant_tokens_est=h[14],
+            boilerplate_tokens_est=h[15],
+            output_risk_tokens_est=h[16],
+            context_tokens=h[17],
+            cached_input_tokens=h[18],
+            context_chunk_tokens=extra.get("context_chunk_tokens", []),
+        )
+    cost = None
+    if sections & HAS_COST:
+        cost = CostEstimate(
+            currency=lookup(h[19]),
+            current=h[20],
+            optimized=h[21],
+            savings=h[22],
+            savings_pct=h[23],
+            input_per_1k=_unopt(h[24]),
+            output_per_1k=_unopt(h[25]),
+            cached_input_per_1k=_unopt(h[26]),
+        )
+    suggestions = None
+    if sections & HAS_SUGGESTIONS:
+        sg = extra["suggestions"]
+        suggestions = Suggestions(
+            missing=[lookup(m) for m in sg["missing"]],
+            rewritten_prompt=sg["rewritten_prompt"],
+            notes=sg["notes"],
+        )
+    created_at = None
+    if sections & HAS_CREATED_AT:
+        created_at = datetime.fromtimestamp(h[1], timezone.utc).isoformat()
+
+    return PromptReport(
+        schema_version=lookup(h[3]),
+        sdk_version=lookup(h[4]),
+        model=lookup(h[2]),
+        created_at=created_at,
+        scores=scores,
+        token_estimates=token_estimates,
+        cost_estimate=cost,
+        issues=issues,
+        suggestions=suggestions,
+        budgets=extra.get("budgets"),
+        flags=extra.get("flags"),
+    )
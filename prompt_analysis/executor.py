@@ -0,0 +1,121 @@
+"""
+Thread-pool batch analysis over one shared PromptAnalyzer.
+
+Unlike ShardedPipeline (processes), nothing is pickled or copied: threads share the
+analyzer, its plans and caches. With the GIL this mostly helps when callers overlap
+analysis with I/O; on free-threaded CPython (3.13t+) the threads run in parallel.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Union
+
+from prompt_analysis.analyzer import PromptAnalyzer
+from prompt_analysis.report import PromptReport
+
+Result = Union[PromptReport, Dict[str, Any]]
+
+
+class _Scratch:
+    """Per-thread counters, written without locks and summed by stats()."""
+
+    __slots__ = ("records", "errors", "busy")
+
+    def __init__(self):
+        self.records = 0
+        self.errors = 0
+        self.busy = 0.0
+
+
+class ThreadedExecutor:
+    """
+    Analyze input records (docs/prompt-input.schema.json) on `workers` threads, in
+    chunks of `chunk_size`. Results come back in input order: a PromptReport, or
+    {"error", "index"} for a record that failed. At most `workers * 4` chunks are in
+    flight, so arbitrarily long iterables stream in bounded memory.
+    """
+
+    def __init__(
+        self,
+        analyzer: PromptAnalyzer,
+        workers: int = 0,
+        chunk_size: int = 32,
+        fields: Union[str, Iterable[str], None] = None,
+    ):
+        self.analyzer = analyzer
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(int(chunk_size), 1)
+        self.fields = fields
+        self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="promptlint")
+        self._local = threading.local()
+        self._scratch: List[_Scratch] = []
+        self._scratch_lock = threading.Lock()
+
+    def _thread_scratch(self) -> _Scratch:
+        scratch = getattr(self._local, "scratch", None)
+        if scratch is None:
+            scratch = self._local.scratch = _Scratch()
+            with self._scratch_lock:
+                self._scratch.append(scratch)
+        return scratch
+
+    def _run_chunk(self, start: int, records: List[Any]) -> List[Result]:
+        scratch = self._thread_scratch()
+        started = time.perf_counter()
+        analyze = self.analyzer.analyze_input
+        fields = self.fields
+        out: List[Result] = []
+        for offset, record in enumerate(records):
+            try:
+                out.append(analyze(record, fields=fields))
+            except (ValueError, TypeError, AttributeError) as e:
+                out.append({"error": str(e), "index": start + offset})
+                scratch.errors += 1
+        scratch.records += len(records)
+        scratch.busy += time.perf_counter() - started
+        return out
+
+    def map(self, records: Iterable[Any]) -> Iterator[Result]:
+        pending: Deque[Future] = deque()
+        window = self.workers * 4
+        chunk: List[Any] = []
+        start = 0
+        for record in records:
+            chunk.append(record)
+            if len(chunk) == self.chunk_size:
+                pending.append(self._pool.submit(self._run_chunk, start, chunk))
+                start += len(chunk)
+                chunk = []
+                if len(pending) >= window:
+                    yield from pending.popleft().result()
+        if chunk:
+            pending.append(self._pool.submit(self._run_chunk, start, chunk))
+        while pending:
+            yield from pending.popleft().result()
+
+    def run(self, records: Iterable[Any]) -> List[Result]:
+        return list(self.map(records))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._scratch_lock:
+            scratch = list(self._scratch)
+        return {
+            "workers": self.workers,
+            "records": sum(s.records for s in scratch),
+            "errors": sum(s.errors for s in scratch),
+            "busy_s": round(sum(s.busy for s in scratch), 4),
+            "threads_used": len(scratch),
+        }
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> "ThreadedExecutor":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
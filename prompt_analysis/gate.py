@@ -0,0 +1,356 @@
+"""
+Pre-flight gate for outgoing LLM calls: allow or deny a request on input budget, context
+window and (optionally) issue severity, and tag it with its token and cost estimate.
+
+    gate = PreflightGate(PromptAnalyzer(cfg), deny_severity="high")
+    create = gate.wrap(client.chat.completions.create)   # or gate.wrap_async(...)
+    create(model="gpt-4o-mini", messages=[...], max_tokens=200)  # raises GateDenied
+
+A check counts tokens and prices them, nothing else; rules only run when a severity
+threshold is set. Full reports can be produced off the call path by a ReportQueue.
+"""
+from __future__ import annotations
+
+import functools
+import queue
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from prompt_analysis.analyzer import PromptAnalyzer
+from prompt_analysis.normalized import cap_input, normalize_messages
+from prompt_analysis.report import PromptReport, Severity
+from prompt_analysis.rules.runner import run_rules
+
+SEVERITY_RANK = {Severity.low: 0, Severity.medium: 1, Severity.high: 2}
+# Content-block types whose text is counted; images, tool calls etc. are skipped.
+TEXT_BLOCK_TYPES = ("text", "input_text")
+
+
+@dataclass
+class GateDecision:
+    allowed: bool
+    model: str
+    input_tokens: int
+    output_tokens_est: int
+    max_input_tokens: int
+    context_window_tokens: int = 0
+    # None when the model has no pricing.
+    cost_est: Optional[float] = None
+    currency: Optional[str] = None
+    # "input_budget" | "context_window" | "severity:<code>" | "invalid_request"
+    reasons: List[str] = field(default_factory=list)
+    issues: List[str] = field(default_factory=list)
+    flags: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class GateDenied(Exception):
+    def __init__(self, decision: GateDecision):
+        super().__init__(f"Request denied by pre-flight gate: {', '.join(decision.reasons)}")
+        self.decision = decision
+
+
+class ReportQueue:
+    """
+    Produces full reports on a background thread and hands them to `sink`. The queue
+    is bounded and never blocks the caller: when it is full the request is dropped
+    and counted in `dropped`. The worker shares the GIL with the calling threads and
+    yields it after every report, which bounds the stall a caller sees to about one
+    report build.
+    """
+
+    def __init__(
+        self,
+        analyzer: PromptAnalyzer,
+        sink: Callable[[PromptReport, GateDecision], None],
+        maxsize: int = 1024,
+    ):
+        self.analyzer = analyzer
+        self.sink = sink
+        self.dropped = 0
+        self.errors = 0
+        self._queue: queue.Queue = queue.Queue(maxsize)
+        self._thread = threading.Thread(target=self._run, name="promptlint-reports", daemon=True)
+        self._thread.start()
+
+    def submit(self, decision: GateDecision, kwargs: Dict[str, Any]) -> bool:
+        try:
+            self._queue.put_nowait((decision, kwargs))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                decision, kwargs = item
+                self.sink(self.analyzer.analyze_messages(**kwargs), decision)
+            except Exception:
+                self.errors += 1
+            finally:
+                self._queue.task_done()
+            # Hand the GIL back between reports; otherwise a caller waiting on it can
+            # stall for a whole switch interval (5 ms) while reports are built.
+            time.sleep(0)
+
+    def join(self) -> None:
+        """Wait until every submitted report has been handed to the sink."""
+        self._queue.join()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+
+class PreflightGate:
+    """
+    `deny_severity` ("low" | "medium" | "high") denies requests with an issue of at
+    least that severity; None (the default) skips rules entirely. Budget and context
+    window checks can be turned off with `enforce_budget` / `enforce_context_window`.
+    `on_decision` observes every decision; its exceptions are counted in
+    `observer_errors` and do not affect the call.
+    """
+
+    def __init__(
+        self,
+        analyzer: PromptAnalyzer,
+        *,
+        deny_severity: Optional[str] = None,
+        enforce_budget: bool = True,
+        enforce_context_window: bool = True,
+        reports: Optional[ReportQueue] = None,
+        on_decision: Optional[Callable[[GateDecision], None]] = None,
+    ):
+        if deny_severity is not None and deny_severity not in SEVERITY_RANK:
+            raise ValueError(
+                f"Unknown severity '{deny_severity}'. Available: {list(SEVERITY_RANK)}"
+            )
+        self.analyzer = analyzer
+        self.deny_severity = deny_severity
+        self.enforce_budget = enforce_budget
+        self.enforce_context_window = enforce_context_window
+        self.reports = reports
+        self.on_decision = on_decision
+        # Exceptions raised by on_decision; they are swallowed, never turned into denials.
+        self.observer_errors = 0
+
+    def check(
+        self,
+        messages: List[Dict[str, str]],
+        *,
+        model: Optional[str] = None,
+        expected_output_tokens: Optional[int] = None,
+        max_input_tokens: Optional[int] = None,
+        tokenizer: Optional[str] = None,
+        context_chunks: Optional[List[Dict[str, Any]]] = None,
+    ) -> GateDecision:
+        inputs = {
+            "messages": messages,
+            "model": model,
+            "expected_output_tokens": expected_output_tokens,
+            "max_input_tokens": max_input_tokens,
+            "tokenizer": tokenizer,
+            "context_chunks": context_chunks,
+        }
+        decision = self._decide(**inputs)
+        self._publish(decision, inputs)
+        return decision
+
+    def _decide(
+        self,
+        messages: List[Dict[str, str]],
+        *,
+        model: Optional[str],
+        expected_output_tokens: Optional[int],
+        max_input_tokens: Optional[int],
+        tokenizer: Optional[str],
+        context_chunks: Optional[List[Dict[str, Any]]],
+    ) -> GateDecision:
+        analyzer = self.analyzer
+        plan = analyzer.plan(
+            model=model,
+            tokenizer=tokenizer,
+            expected_output_tokens=expected_output_tokens,
+            max_input_tokens=max_input_tokens,
+        )
+        capped_messages, capped_chunks, capped = cap_input(
+            messages, context_chunks, plan.max_input_chars, plan.max_messages
+        )
+        normalized = normalize_messages(capped_messages, context_chunks=capped_chunks)
+        flags: Dict[str, Any] = {}
+        _, input_tokens, _, _ = analyzer._count_input(plan, normalized, capped, flags)
+
+        reasons: List[str] = []
+        if self.enforce_budget and input_tokens > plan.max_input_tokens:
+            reasons.append("input_budget")
+        window = plan.context_window_tokens
+        if (
+            self.enforce_context_window
+            and window > 0
+            and input_tokens + plan.output_tokens_est > window
+        ):
+            reasons.append("context_window")
+
+        issues: List[str] = []
+        if self.deny_severity is not None:
+            threshold = SEVERITY_RANK[self.deny_severity]
+            for issue in run_rules(plan.rules, normalized, plan.rule_ctx):
+                issues.append(issue.code)
+                if SEVERITY_RANK.get(issue.severity, 0) >= threshold:
+                    reasons.append(f"severity:{issue.code}")
+
+        pricing = plan.pricing
+        cost_est = None
+        if pricing:
+            cost_est = float(
+                round(
+                    (input_tokens / 1000.0) * pricing.input_per_1k
+                    + (plan.output_tokens_est / 1000.0) * pricing.output_per_1k,
+                    8,
+                )
+            )
+
+        return GateDecision(
+            allowed=not reasons,
+            model=plan.model,
+            input_tokens=input_tokens,
+            output_tokens_est=plan.output_tokens_est,
+            max_input_tokens=plan.max_input_tokens,
+            context_window_tokens=window,
+            cost_est=cost_est,
+            currency=pricing.currency if pricing else None,
+            reasons=reasons,
+            issues=issues,
+            flags=flags,
+        )
+
+    def _publish(self, decision: GateDecision, inputs: Optional[Dict[str, Any]]) -> None:
+        if self.on_decision is not None:
+            try:
+                self.on_decision(decision)
+            except Exception:
+                # A failing observer must neither block nor deny traffic.
+                self.observer_errors += 1
+        if self.reports is not None and inputs is not None:
+            self.reports.submit(decision, inputs)
+
+    def _check_call(self, kwargs: Dict[str, Any]) -> GateDecision:
+        # Chat-completion style keyword arguments (OpenAI, Anthropic, most wrappers).
+        inputs: Optional[Dict[str, Any]] = None
+        try:
+            inputs = {
+                "messages": call_messages(kwargs),
+                "model": kwargs.get("model"),
+                "expected_output_tokens": kwargs.get("max_tokens")
+                or kwargs.get("max_completion_tokens"),
+                "max_input_tokens": None,
+                "tokenizer": None,
+                "context_chunks": None,
+            }
+            decision = self._decide(**inputs)
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            inputs = None
+            decision = GateDecision(
+                allowed=False,
+                model=str(kwargs.get("model") or ""),
+                input_tokens=0,
+                output_tokens_est=0,
+                max_input_tokens=0,
+                reasons=["invalid_request"],
+                flags={"error": str(e)},
+            )
+        self._publish(decision, inputs)
+        if not decision.allowed:
+            raise GateDenied(decision)
+        return decision
+
+    def wrap(self, create: Callable[..., Any]) -> Callable[..., Any]:
+        """
+        Gate a client call that takes `model=`, `messages=` and optionally `system=`
+        and `max_tokens=` / `max_completion_tokens=` keyword arguments. Denied requests
+        raise GateDenied and never reach the client; so do requests the gate cannot
+        read (reason "invalid_request").
+        """
+
+        @functools.wraps(create)
+        def gated(*args: Any, **kwargs: Any) -> Any:
+            self._check_call(kwargs)
+            return create(*args, **kwargs)
+
+        return gated
+
+    def wrap_async(self, create: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        """
+        Async variant of wrap(). The check runs inline: it is CPU-only and shorter
+        than a thread hand-off.
+        """
+
+        @functools.wraps(create)
+        async def gated(*args: Any, **kwargs: Any) -> Any:
+            self._check_call(kwargs)
+            return await create(*args, **kwargs)
+
+        return gated
+
+
+def _block_text(content: Any) -> str:
+    """Text of a message content: a str, or a list of content blocks."""
+    if content is None or isinstance(content, str):
+        return content or ""
+    if not isinstance(content, (list, tuple)):
+        raise TypeError(f"Unsupported message content of type {type(content).__name__}")
+    parts = []
+    for block in content:
+        if isinstance(block, str):
+            parts.append(block)
+        elif block.get("type") in TEXT_BLOCK_TYPES:
+            parts.append(block.get("text") or "")
+    return "\n".join(parts)
+
+
+def call_messages(kwargs: Dict[str, Any]) -> List[Dict[str, str]]:
+    """
+    Plain {"role", "content"} messages of a client call: content-block lists are
+    flattened to their text, and an Anthropic-style `system=` becomes a leading
+    system message.
+    """
+    messages = [
+        {"role": m.get("role") or "user", "content": _block_text(m.get("content"))}
+        for m in kwargs.get("messages") or []
+    ]
+    system = _block_text(kwargs.get("system"))
+    if system:
+        messages.insert(0, {"role": "system", "content": system})
+    return messages
+
+
+class StubClient:
+    """
+    Local stand-in for an LLM client, for tests and benchmarks: `create` records the
+    call and returns a canned chat-completion-shaped response.
+    """
+
+    def __init__(self, reply: str = "ok"):
+        self.reply = reply
+        self.calls: List[Dict[str, Any]] = []
+
+    def _response(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        self.calls.append(kwargs)
+        return {
+            "model": kwargs.get("model"),
+            "choices": [{"message": {"role": "assistant", "content": self.reply}}],
+        }
+
+    def create(self, **kwargs: Any) -> Dict[str, Any]:
+        return self._response(kwargs)
+
+    async def acreate(self, **kwargs: Any) -> Dict[str, Any]:
+        return self._response(kwargs)
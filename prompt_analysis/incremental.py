@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from typing import FrozenSet, Iterable, List, Optional, Tuple, Union
+
+from prompt_analysis.analyzer import PromptAnalyzer
+from prompt_analysis.cache import LRUCache
+from prompt_analysis.report import Issue, PromptReport, resolve_fields
+from prompt_analysis.rules.base import KeywordRule
+from prompt_analysis.rules.matcher import may_span
+from prompt_analysis.tokenizers.approx import ApproxTokenizer
+
+PARAGRAPH_SEPARATOR = "\n\n"
+
+
+class IncrementalAnalyzer:
+    """
+    Re-analyze a single prompt while it is being edited (editor integrations, the
+    browser demo). Word/punctuation counts and keyword-rule hits are cached per
+    paragraph, so after a small edit only the changed paragraphs are re-tokenized and
+    re-scanned before the report is rebuilt. Reports equal PromptAnalyzer.analyze().
+
+    Falls back to a full analysis when the tokenizer has no additive stats (anything
+    but ApproxTokenizer), a rule is not a KeywordRule, or the input exceeds the caps.
+    """
+
+    def __init__(self, analyzer: PromptAnalyzer, cache_size: int = 4096):
+        self.analyzer = analyzer
+        # (rules, paragraph) -> (words, punctuation, codes of rules that matched)
+        self._paragraphs: LRUCache[tuple, Tuple[int, int, FrozenSet[str]]] = LRUCache(
+            cache_size
+        )
+        self.scanned = 0
+        self.reused = 0
+
+    def analyze(
+        self,
+        prompt: str,
+        *,
+        model: Optional[str] = None,
+        tokenizer: Optional[str] = None,
+        expected_output_tokens: Optional[int] = None,
+        max_input_tokens: Optional[int] = None,
+        fields: Union[str, Iterable[str], None] = None,
+    ) -> PromptReport:
+        analyzer = self.analyzer
+        plan = analyzer.plan(
+            model=model,
+            tokenizer=tokenizer,
+            expected_output_tokens=expected_output_tokens,
+            max_input_tokens=max_input_tokens,
+        )
+        tok = plan.tokenizer
+        rules = plan.rules
+        text = (prompt or "").strip()
+        if (
+            not isinstance(tok, ApproxTokenizer)
+            or not all(isinstance(r, KeywordRule) for r in rules)
+            or (plan.max_input_chars and len(text) > plan.max_input_chars)
+        ):
+            messages = [{"role": "user", "content": prompt or ""}]
+            return analyzer.run_plan(plan, messages, fields=fields)
+
+        cache = self._paragraphs
+        words = punctuation = 0
+        matched: set = set()
+        for para in text.split(PARAGRAPH_SEPARATOR):
+            key = (rules, para)
+            stats = cache.get(key)
+            if stats is None:
+                w, p = tok.text_stats(para)
+                stats = (w, p, frozenset(r.code for r in rules if r.matches(para)))
+                cache.put(key, stats)
+                self.scanned += 1
+            else:
+                self.reused += 1
+            words += stats[0]
+            punctuation += stats[1]
+            matched |= stats[2]
+
+        issues: List[Issue] = []
+        for rule in rules:
+            if rule.code in matched:
+                continue
+            if may_span(rule, PARAGRAPH_SEPARATOR) and rule.matches(text):
+                continue
+            issues.append(rule.issue())
+
+        overhead = tok.count_messages([{"role": "user", "content": ""}])
+        return analyzer._build_report(
+            plan,
+            base_text=text,
+            issues=issues,
+            input_tokens=tok.estimate(words, punctuation) + overhead,
+            context_tokens=0,
+            chunk_tokens=[],
+            flags={"mvp": True},
+            fields=resolve_fields(fields),
+        )
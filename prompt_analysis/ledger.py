@@ -0,0 +1,343 @@
+"""
+Estimated spend by tag (team, feature, ...) and model over rolling time windows.
+
+    ledger = CostLedger(tags=("team", "feature"))
+    report = analyzer.analyze_input(record)
+    ledger.record(report, {"team": "search", "feature": "autocomplete"})
+    ledger.query("hour", by=("team",))          # last 60 minutes, per team
+    ledger.render_prometheus()                  # or ledger.to_json()
+
+Every series (model, one value per tag key, and currency) keeps, per window, a ring
+of fixed sub-buckets for the sliding view and two running totals for the tumbling view
+(the current aligned period and the previous one). Recording touches one bucket and
+one total per window, so it is O(1) whatever the traffic; memory is bounded by
+`max_series`, beyond which new tag combinations are folded into an overflow series
+per currency.
+"""
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from prompt_analysis.gate import GateDecision
+from prompt_analysis.report import PromptReport
+
+# name -> (span seconds, sub-buckets). Sliding resolution is span / sub-buckets.
+WINDOWS: Dict[str, Tuple[int, int]] = {
+    "minute": (60, 60),
+    "hour": (3600, 60),
+    "day": (86400, 24),
+}
+MODES = ("sliding", "tumbling", "previous")
+METRICS = ("requests", "input_tokens", "output_tokens", "cost")
+OVERFLOW = "__other__"
+# Tag keys become Prometheus label names next to these.
+RESERVED_LABELS = ("model", "window", "mode", "currency")
+_LABEL_NAME = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*")
+
+_WIDTH = len(METRICS)
+
+
+class _Window:
+    """Sliding ring and tumbling totals of one series over one window."""
+
+    __slots__ = ("span", "slots", "resolution", "epochs", "values", "period", "current", "previous")
+
+    def __init__(self, span: int, slots: int):
+        self.span = span
+        self.slots = slots
+        self.resolution = span / slots
+        # Plain lists: element updates are cheaper than on array("d").
+        self.epochs = [-1] * slots
+        self.values = [0.0] * (slots * _WIDTH)
+        self.period = -1
+        self.current = [0.0] * _WIDTH
+        self.previous = [0.0] * _WIDTH
+
+    def add(self, at: float, requests: float, inp: float, out: float, cost: float) -> None:
+        idx = int(at // self.resolution)
+        slot = idx % self.slots
+        epoch = self.epochs[slot]
+        if epoch <= idx:
+            base = slot * _WIDTH
+            values = self.values
+            if epoch < idx:
+                self.epochs[slot] = idx
+                values[base : base + _WIDTH] = (requests, inp, out, cost)
+            else:
+                values[base] += requests
+                values[base + 1] += inp
+                values[base + 2] += out
+                values[base + 3] += cost
+        # else: older than the ring reaches; only the tumbling totals may still take it.
+
+        period = int(at // self.span)
+        if period == self.period:
+            target = self.current
+        elif period > self.period:
+            self.previous = self.current if period == self.period + 1 else [0.0] * _WIDTH
+            target = self.current = [0.0] * _WIDTH
+            self.period = period
+        elif period == self.period - 1:
+            target = self.previous
+        else:
+            return
+        target[0] += requests
+        target[1] += inp
+        target[2] += out
+        target[3] += cost
+
+    def totals(self, mode: str, now: float) -> List[float]:
+        if mode == "sliding":
+            newest = int(now // self.resolution)
+            oldest = newest - self.slots
+            out = [0.0] * _WIDTH
+            for slot, epoch in enumerate(self.epochs):
+                if oldest < epoch <= newest:
+                    base = slot * _WIDTH
+                    for i in range(_WIDTH):
+                        out[i] += self.values[base + i]
+            return out
+        period = int(now // self.span)
+        if mode == "tumbling":
+            return list(self.current) if period == self.period else [0.0] * _WIDTH
+        if period == self.period:
+            return list(self.previous)
+        if period == self.period + 1:
+            return list(self.current)
+        return [0.0] * _WIDTH
+
+
+class _Series:
+    __slots__ = ("labels", "currency", "lifetime", "windows")
+
+    def __init__(self, labels: Tuple[str, ...], currency: str):
+        self.labels = labels
+        self.currency = currency
+        self.lifetime = [0.0] * _WIDTH
+        # In WINDOWS order.
+        self.windows = tuple(_Window(span, slots) for span, slots in WINDOWS.values())
+
+
+class CostLedger:
+    """
+    `tags` are the tag keys kept as labels next to the model; other keys in the tags
+    passed to record() are ignored, which keeps the number of series predictable.
+    Keys must be valid Prometheus label names other than RESERVED_LABELS.
+    Thread-safe: recording takes a short lock. Queries read without it, so one racing
+    a record() may or may not include that request.
+    """
+
+    def __init__(
+        self,
+        tags: Sequence[str] = ("team", "feature"),
+        max_series: int = 1000,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.tag_keys = tuple(tags)
+        for key in self.tag_keys:
+            if not isinstance(key, str) or not _LABEL_NAME.fullmatch(key):
+                raise ValueError(f"Invalid tag key {key!r}: must match {_LABEL_NAME.pattern}")
+            if key in RESERVED_LABELS:
+                raise ValueError(f"Tag key '{key}' is reserved. Reserved: {list(RESERVED_LABELS)}")
+        if len(set(self.tag_keys)) != len(self.tag_keys):
+            raise ValueError(f"Duplicate tag keys in {list(self.tag_keys)}")
+        self.labels = ("model",) + self.tag_keys
+        self.max_series = max(int(max_series), 1)
+        self.clock = clock
+        self.overflowed = 0
+        self._series: Dict[Tuple[str, ...], _Series] = {}
+        self._lock = threading.Lock()
+
+    def record_usage(
+        self,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        cost: Optional[float],
+        currency: Optional[str] = None,
+        tags: Optional[Mapping[str, Any]] = None,
+        at: Optional[float] = None,
+    ) -> None:
+        """Add one request; `at` (unix seconds) defaults to now and may be in the past."""
+        tags = tags or {}
+        currency = currency or ""
+        key = (model,) + tuple(str(tags.get(k, "")) for k in self.tag_keys) + (currency,)
+        inp, out, cost = float(input_tokens), float(output_tokens), float(cost or 0.0)
+        at = self.clock() if at is None else at
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                if len(self._series) >= self.max_series:
+                    self.overflowed += 1
+                    # Costs in different currencies never share a series.
+                    key = (OVERFLOW,) * len(self.labels) + (currency,)
+                    series = self._series.get(key)
+                if series is None:
+                    series = self._series[key] = _Series(key[:-1], currency)
+            lifetime = series.lifetime
+            lifetime[0] += 1.0
+            lifetime[1] += inp
+            lifetime[2] += out
+            lifetime[3] += cost
+            for window in series.windows:
+                window.add(at, 1.0, inp, out, cost)
+
+    def record(
+        self,
+        report: PromptReport,
+        tags: Optional[Mapping[str, Any]] = None,
+        at: Optional[float] = None,
+    ) -> None:
+        tokens = report.token_estimates
+        cost = report.cost_estimate
+        self.record_usage(
+            report.model,
+            tokens.input_tokens if tokens else 0,
+            tokens.output_tokens_est if tokens else 0,
+            cost.current if cost else None,
+            cost.currency if cost else None,
+            tags,
+            at,
+        )
+
+    def record_decision(
+        self,
+        decision: GateDecision,
+        tags: Optional[Mapping[str, Any]] = None,
+        at: Optional[float] = None,
+    ) -> None:
+        """Record an allowed PreflightGate decision (denied requests cost nothing)."""
+        if decision.allowed:
+            self.record_usage(
+                decision.model,
+                decision.input_tokens,
+                decision.output_tokens_est,
+                decision.cost_est,
+                decision.currency,
+                tags,
+                at,
+            )
+
+    def _rows(
+        self, totals: Callable[[_Series], Sequence[float]], by: Sequence[str], where: Mapping
+    ) -> List[Dict[str, Any]]:
+        unknown = [k for k in list(by) + list(where) if k not in self.labels]
+        if unknown:
+            raise ValueError(f"Unknown label(s) {unknown}. Available: {list(self.labels)}")
+        positions = [self.labels.index(k) for k in by]
+        filters = [(self.labels.index(k), str(v)) for k, v in where.items()]
+        with self._lock:
+            series = list(self._series.values())
+        groups: Dict[Tuple[str, ...], List[float]] = {}
+        for s in series:
+            if any(s.labels[i] != v for i, v in filters):
+                continue
+            values = totals(s)
+            if not values[0]:
+                continue
+            group = tuple(s.labels[i] for i in positions) + (s.currency,)
+            acc = groups.setdefault(group, [0.0] * _WIDTH)
+            for i, v in enumerate(values):
+                acc[i] += v
+        rows = []
+        for group, values in sorted(groups.items()):
+            row: Dict[str, Any] = dict(zip(by, group))
+            row["currency"] = group[-1]
+            row.update(
+                requests=int(values[0]),
+                input_tokens=int(values[1]),
+                output_tokens=int(values[2]),
+                cost=round(values[3], 8),
+            )
+            rows.append(row)
+        return rows
+
+    def query(
+        self,
+        window: str = "hour",
+        mode: str = "sliding",
+        by: Sequence[str] = ("model",),
+        now: Optional[float] = None,
+        **where: Any,
+    ) -> List[Dict[str, Any]]:
+        """
+        Totals per group of `by` labels (and currency). `mode` is "sliding" (the last
+        window span, at sub-bucket resolution), "tumbling" (the current aligned period
+        so far) or "previous" (the last complete aligned period). Keyword arguments
+        filter on labels, e.g. query("day", by=("feature",), team="search").
+        """
+        if window not in WINDOWS:
+            raise ValueError(f"Unknown window '{window}'. Available: {list(WINDOWS)}")
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode '{mode}'. Available: {list(MODES)}")
+        now = self.clock() if now is None else now
+        i = list(WINDOWS).index(window)
+        return self._rows(lambda s: s.windows[i].totals(mode, now), by, where)
+
+    def lifetime(self, by: Sequence[str] = ("model",), **where: Any) -> List[Dict[str, Any]]:
+        """Totals since the ledger was created."""
+        return self._rows(lambda s: s.lifetime, by, where)
+
+    def to_dict(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = self.clock() if now is None else now
+        return {
+            "at": now,
+            "labels": list(self.labels),
+            "windows": {
+                window: {mode: self.query(window, mode, self.labels, now) for mode in MODES}
+                for window in WINDOWS
+            },
+            "lifetime": self.lifetime(self.labels),
+            "overflowed": self.overflowed,
+        }
+
+    def to_json(self, now: Optional[float] = None, indent: Optional[int] = None) -> str:
+        return json.dumps(self.to_dict(now), indent=indent, ensure_ascii=False)
+
+    def render_prometheus(self, now: Optional[float] = None) -> str:
+        """
+        Window totals as gauges (promptlint_ledger_<metric>{window, mode, ...}) and
+        lifetime totals as counters (promptlint_ledger_<metric>_total).
+        """
+        now = self.clock() if now is None else now
+        labels = self.labels
+        windows = [
+            (window, mode, self.query(window, mode, labels, now))
+            for window in WINDOWS
+            for mode in ("sliding", "tumbling")
+        ]
+        lifetime = self.lifetime(labels)
+        lines: List[str] = []
+        for metric in METRICS:
+            lines.append(f"# TYPE promptlint_ledger_{metric} gauge")
+            for window, mode, rows in windows:
+                for row in rows:
+                    extra = {"window": window, "mode": mode}
+                    lines.append(
+                        f"promptlint_ledger_{metric}{_labels(row, labels, extra)} {row[metric]}"
+                    )
+            lines.append(f"# TYPE promptlint_ledger_{metric}_total counter")
+            for row in lifetime:
+                lines.append(
+                    f"promptlint_ledger_{metric}_total{_labels(row, labels)} {row[metric]}"
+                )
+        lines.append("# TYPE promptlint_ledger_overflowed_total counter")
+        lines.append(f"promptlint_ledger_overflowed_total {self.overflowed}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(
+    row: Mapping[str, Any], names: Iterable[str], extra: Optional[Mapping[str, str]] = None
+) -> str:
+    pairs = dict(extra or {})
+    pairs.update((n, row[n]) for n in names)
+    pairs["currency"] = row["currency"]
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs.items()) + "}"
@@ -1,27 +1,83 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from .rules.base import NormalizedPrompt
 
+CONTEXT_SEPARATOR = "\n\n"
+
+
+def normalize_message(m: Dict[str, str]) -> Dict[str, str]:
+    role = (m.get("role") or "").strip().lower() or "user"
+    content = (m.get("content") or "").strip()
+    return {"role": role, "content": content}
+
+
+def cap_input(
+    messages: List[Dict[str, str]],
+    context_chunks: Optional[List[Dict[str, Any]]],
+    max_chars: int,
+    max_messages: int,
+) -> Tuple[List[Dict[str, str]], Optional[List[Dict[str, Any]]], Optional[Dict[str, int]]]:
+    """
+    Keep at most `max_messages` messages and `max_chars` characters of content
+    (messages first, then context chunks); 0 disables a cap. The third value is None
+    when nothing was cut, else the original and kept sizes.
+    """
+    messages = messages or []
+    chunks = context_chunks or []
+    total = sum(len(m.get("content") or "") for m in messages)
+    total += sum(len(c.get("text") or "") for c in chunks)
+    over_messages = max_messages and len(messages) > max_messages
+    if not over_messages and (not max_chars or total <= max_chars):
+        return messages, context_chunks, None
+
+    kept_messages = messages[:max_messages] if over_messages else messages
+    budget = max_chars or total
+    out_messages = []
+    for m in kept_messages:
+        if max_chars and budget <= 0:
+            break
+        content = m.get("content") or ""
+        if len(content) > budget:
+            m = {**m, "content": content[:budget]}
+            content = m["content"]
+        out_messages.append(m)
+        budget -= len(content)
+    out_chunks = []
+    for c in chunks:
+        if max_chars and budget <= 0:
+            break
+        text = c.get("text") or ""
+        if len(text) > budget:
+            c = {**c, "text": text[:budget]}
+            text = c["text"]
+        out_chunks.append(c)
+        budget -= len(text)
+
+    kept_chars = sum(len(m.get("content") or "") for m in out_messages)
+    kept_chars += sum(len(c.get("text") or "") for c in out_chunks)
+    return out_messages, out_chunks, {
+        "messages": len(messages),
+        "kept_messages": len(out_messages),
+        "chars": total,
+        "kept_chars": kept_chars,
+    }
+
 
 def normalize_messages(
     messages: List[Dict[str, str]],
     context_chunks: Optional[List[Dict[str, Any]]] = None,
 ) -> NormalizedPrompt:
-    msgs = []
-    for m in messages or []:
-        role = (m.get("role") or "user").strip().lower()
-        content = (m.get("content") or "").strip()
-        msgs.append({"role": role, "content": content})
-
-    context_text = ""
-    if context_chunks:
-        context_text = "\n\n".join(
-            (c.get("text") or "").strip()
-            for c in context_chunks
-            if (c.get("text") or "").strip()
-        ).strip()
+    msgs = [normalize_message(m) for m in messages or []]
+
+    chunks = []
+    for c in context_chunks or []:
+        text = (c.get("text") or "").strip()
+        if text:
+            chunk_id = c.get("id")
+            chunks.append({"id": str(chunk_id) if chunk_id else None, "text": text})
+    context_text = CONTEXT_SEPARATOR.join(c["text"] for c in chunks)
 
     system_text = "\n".join(m["content"] for m in msgs if m["role"] == "system").strip()
     user_text = "\n".join(m["content"] for m in msgs if m["role"] == "user").strip()
@@ -33,4 +89,5 @@ def normalize_messages(
         user_text=user_text,
         system_text=system_text,
         context_text=context_text,
+        context_chunks=chunks,
     )
\ No newline at end of file
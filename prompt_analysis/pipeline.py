@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple, Union
+
+from pydantic import ValidationError
+
+from prompt_analysis.config import AnalyzerConfig
+from prompt_analysis.encoding import HEADER, StringTable, decode_report, encode_report
+from prompt_analysis.report import PromptReport
+from prompt_analysis.validation import RecordError, validate_line
+
+
+@dataclass
+class StageStats:
+    records: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def records_per_s(self) -> float:
+        return self.records / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.bytes / 1e6 / self.seconds if self.seconds > 0 else 0.0
+
+
+@dataclass
+class PipelineStats:
+    """
+    Per-stage counters. Worker stages (parse, analyze, encode) sum CPU-side time
+    across processes; `wall` is end-to-end elapsed time.
+    """
+    shards: int = 0
+    errors: int = 0
+    stages: Dict[str, StageStats] = field(default_factory=dict)
+    wall: float = 0.0
+
+    def stage(self, name: str) -> StageStats:
+        st = self.stages.get(name)
+        if st is None:
+            st = self.stages[name] = StageStats()
+        return st
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "shards": self.shards,
+            "errors": self.errors,
+            "wall_s": round(self.wall, 4),
+            "stages": {
+                name: {
+                    "records": st.records,
+                    "bytes": st.bytes,
+                    "seconds": round(st.seconds, 4),
+                    "records_per_s": round(st.records_per_s, 1),
+                    "mb_per_s": round(st.mb_per_s, 2),
+                }
+                for name, st in self.stages.items()
+            },
+        }
+
+
+@dataclass
+class _ShardResult:
+    index: int
+    shm_name: Optional[str]
+    nbytes: int
+    records: int
+    strings: List[str]
+    # (position in the shard's output sequence, byte offset in the input, message)
+    errors: List[Tuple[int, int, str]]
+    timings: Dict[str, float]
+    input_bytes: int
+
+
+def shard_ranges(path: Union[str, Path], shards: int) -> List[Tuple[int, int]]:
+    """
+    Split a file into at most `shards` byte ranges whose boundaries fall just after
+    a newline, so every line belongs to exactly one range.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    shards = max(1, min(int(shards), size))
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        bounds = [0]
+        for i in range(1, shards):
+            target = max(size * i // shards, bounds[-1])
+            nl = mm.find(b"\n", target)
+            cut = size if nl < 0 else nl + 1
+            if cut >= size:
+                break
+            if cut > bounds[-1]:
+                bounds.append(cut)
+        bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+_worker_analyzer = None
+_worker_fields = None
+
+
+def _init_worker(cfg: AnalyzerConfig, fields) -> None:
+    global _worker_analyzer, _worker_fields
+    from prompt_analysis.analyzer import PromptAnalyzer
+
+    _worker_analyzer = PromptAnalyzer(cfg)
+    _worker_fields = fields
+
+
+def _run_shard(path: str, index: int, start: int, end: int) -> _ShardResult:
+    analyzer = _worker_analyzer
+    strings = StringTable()
+    out = bytearray()
+    errors: List[Tuple[int, int, str]] = []
+    t_parse = t_analyze = t_encode = 0.0
+    records = 0
+
+    clock = time.perf_counter
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = start
+        while pos < end:
+            nl = mm.find(b"\n", pos, end)
+            stop = end if nl < 0 else nl
+            line_at = pos
+            line = mm[pos:stop]
+            pos = stop + 1
+            if not line.strip():
+                continue
+
+            t0 = clock()
+            try:
+                # Parse, schema-check and normalize in one pass.
+                record = validate_line(line)
+            except ValidationError as e:
+                t_parse += clock() - t0
+                message = RecordError.from_exception(records + len(errors), e).message
+                errors.append((records + len(errors), line_at, message))
+                continue
+            t1 = clock()
+            t_parse += t1 - t0
+            try:
+                report = analyzer.analyze_input(record, fields=_worker_fields)
+            except (ValueError, TypeError, AttributeError) as e:
+                t_analyze += clock() - t1
+                errors.append((records + len(errors), line_at, str(e)))
+                continue
+            t2 = clock()
+            t_analyze += t2 - t1
+            out += encode_report(report, strings)
+            t_encode += clock() - t2
+            records += 1
+
+    shm_name = None
+    if out:
+        shm = shared_memory.SharedMemory(create=True, size=len(out))
+        shm.buf[: len(out)] = out
+        shm_name = shm.name
+        shm.close()
+        # Ownership passes to the parent, which unlinks the block after merging it.
+        resource_tracker.unregister(shm._name, "shared_memory")
+
+    return _ShardResult(
+        index=index,
+        shm_name=shm_name,
+        nbytes=len(out),
+        records=records,
+        strings=strings.strings,
+        errors=errors,
+        timings={"parse": t_parse, "analyze": t_analyze, "encode": t_encode},
+        input_bytes=end - start,
+    )
+
+
+def _iter_shard(result: _ShardResult) -> Iterator[Union[PromptReport, Dict[str, Any]]]:
+    """
+    Decode one shard's shared-memory buffer, interleaving errors in input order.
+    """
+    strings = StringTable(result.strings)
+    errors = iter(result.errors)
+    next_err = next(errors, None)
+    emitted = 0
+
+    def drain():
+        nonlocal next_err, emitted
+        while next_err is not None and next_err[0] == emitted:
+            yield {"error": next_err[2], "offset": next_err[1]}
+            emitted += 1
+            next_err = next(errors, None)
+
+    if result.shm_name is None:
+        yield from drain()
+        return
+
+    shm = shared_memory.SharedMemory(name=result.shm_name)
+    try:
+        buf = shm.buf
+        pos = 0
+        while pos < result.nbytes:
+            yield from drain()
+            record_len = HEADER.unpack_from(buf, pos)[0]
+            yield decode_report(buf, strings, pos)
+            emitted += 1
+            pos += record_len
+        yield from drain()
+        del buf
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+class ShardedPipeline:
+    """
+    Analyze a large JSONL file (one docs/prompt-input.schema.json record per line)
+    across processes.
+
+    The file is split into newline-aligned byte ranges; each worker memory-maps the
+    input and parses only its own range, so prompts are never pickled. Workers write
+    binary-encoded reports (see prompt_analysis.encoding) into a shared-memory block
+    and return just its name plus a small string table. The parent merges shards in
+    order, so output is identical to a serial run.
+    """
+
+    def __init__(
+        self,
+        config: Optional[AnalyzerConfig] = None,
+        *,
+        workers: Optional[int] = None,
+        shards_per_worker: int = 4,
+        fields=None,
+    ):
+        self.config = config or AnalyzerConfig()
+        self.workers = workers or os.cpu_count() or 1
+        self.shards_per_worker = max(1, int(shards_per_worker))
+        self.fields = fields
+        self.stats = PipelineStats()
+
+    def iter_reports(
+        self, path: Union[str, Path]
+    ) -> Iterator[Union[PromptReport, Dict[str, Any]]]:
+        """
+        Yield a PromptReport per input line (or {"error", "offset"} for lines that
+        fail), in input order. `self.stats` is filled in as the run progresses.
+        """
+        path = str(path)
+        stats = self.stats = PipelineStats()
+        started = time.perf_counter()
+
+        t0 = time.perf_counter()
+        ranges = shard_ranges(path, self.workers * self.shards_per_worker)
+        split = stats.stage("split")
+        split.seconds = time.perf_counter() - t0
+        split.bytes = ranges[-1][1] if ranges else 0
+        stats.shards = len(ranges)
+
+        if not ranges:
+            stats.wall = time.perf_counter() - started
+            return
+
+        merge = stats.stage("merge")
+        with ProcessPoolExecutor(
+            max_workers=min(self.workers, len(ranges)),
+            initializer=_init_worker,
+            initargs=(self.config, self.fields),
+        ) as pool:
+            futures = [
+                pool.submit(_run_shard, path, i, start, end)
+                for i, (start, end) in enumerate(ranges)
+            ]
+            try:
+                for fut in futures:
+                    result = fut.result()
+                    for stage in ("parse", "analyze", "encode"):
+                        st = stats.stage(stage)
+                        st.seconds += result.timings[stage]
+                        st.records += result.records
+                    stats.stage("parse").bytes += result.input_bytes
+                    stats.stage("encode").bytes += result.nbytes
+                    stats.errors += len(result.errors)
+
+                    t1 = time.perf_counter()
+                    for item in _iter_shard(result):
+                        merge.seconds += time.perf_counter() - t1
+                        if isinstance(item, PromptReport):
+                            merge.records += 1
+                        yield item
+                        t1 = time.perf_counter()
+                    merge.seconds += time.perf_counter() - t1
+                    merge.bytes += result.nbytes
+            finally:
+                # Free buffers of shards the consumer never reached.
+                for fut in futures:
+                    if fut.cancel():
+                        continue
+                    try:
+                        name = fut.result().shm_name
+                    except Exception:
+                        continue
+                    if name is None:
+                        continue
+                    try:
+                        shm = shared_memory.SharedMemory(name=name)
+                    except FileNotFoundError:
+                        continue
+                    shm.close()
+                    shm.unlink()
+        stats.wall = time.perf_counter() - started
+
+    def run(self, path: Union[str, Path], out: TextIO) -> PipelineStats:
+        """
+        Write one JSON report (or error object) per input line to `out`.
+        """
+        for item in self.iter_reports(path):
+            obj = item.to_dict() if isinstance(item, PromptReport) else item
+            out.write(json.dumps(obj, ensure_ascii=False, separators=(",", ":")))
+            out.write("\n")
+        return self.stats
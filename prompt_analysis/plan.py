@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence, Tuple
+
+from prompt_analysis.config import AnalyzerConfig, ModelPricing
+from prompt_analysis.rules.base import PromptRule, RuleContext
+from prompt_analysis.scoring import DEFAULT_SCORING, ScoringModel
+from prompt_analysis.tokenizers.base import Tokenizer
+
+
+@dataclass(frozen=True)
+class AnalysisPlan:
+    """
+    Everything resolved from config for one (model, tokenizer, budgets) combination.
+    Compiled once and reused, so a request only runs the plan against its messages.
+    """
+    model: str
+    tokenizer_name: str
+    tokenizer: Tokenizer
+    expected_output_tokens: int
+    output_tokens_est: int
+    max_input_tokens: int
+    context_window_tokens: int
+    # Input-token counts at which the budget / context-window verdict flips.
+    thresholds: Tuple[int, ...]
+    pricing: Optional[ModelPricing]
+    rules: Tuple[PromptRule, ...]
+    rule_ctx: RuleContext
+    max_input_chars: int = 0
+    max_messages: int = 0
+    scoring: ScoringModel = DEFAULT_SCORING
+
+
+def compile_plan(
+    cfg: AnalyzerConfig,
+    resolve_tokenizer: Callable[[str], Tokenizer],
+    rules: Sequence[PromptRule],
+    *,
+    model: Optional[str] = None,
+    tokenizer: Optional[str] = None,
+    expected_output_tokens: Optional[int] = None,
+    max_input_tokens: Optional[int] = None,
+) -> AnalysisPlan:
+    model = model or cfg.defaults.model
+    profile = cfg.get_model(model)
+    expected = cfg.resolve_expected_output_tokens(model, expected_output_tokens)
+    max_input = cfg.resolve_max_input_tokens(max_input_tokens)
+    tokenizer_name = cfg.resolve_tokenizer(model, tokenizer)
+    output_tokens_est = max(int(expected or 0), 0)
+
+    thresholds = [max_input]
+    if profile.context_window_tokens > 0:
+        thresholds.append(profile.context_window_tokens - output_tokens_est)
+
+    return AnalysisPlan(
+        model=model,
+        tokenizer_name=tokenizer_name,
+        tokenizer=resolve_tokenizer(tokenizer_name),
+        expected_output_tokens=expected,
+        output_tokens_est=output_tokens_est,
+        max_input_tokens=max_input,
+        context_window_tokens=profile.context_window_tokens,
+        thresholds=tuple(thresholds),
+        pricing=profile.pricing,
+        rules=tuple(rules),
+        rule_ctx=RuleContext(
+            model=model,
+            tokenizer=tokenizer_name,
+            budgets={"max_input_tokens": max_input},
+        ),
+        max_input_chars=cfg.defaults.max_input_chars,
+        max_messages=cfg.defaults.max_messages,
+    )
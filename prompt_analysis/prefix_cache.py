@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import heapq
+import os
+import threading
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+from prompt_analysis.tokenizers.base import Tokenizer
+
+_Key = Tuple[str, str]
+
+
+class _Node:
+    __slots__ = ("key", "parent", "children", "tokens", "count", "last_used")
+
+    def __init__(self, key: Optional[_Key], parent: Optional["_Node"], tokens: int):
+        self.key = key
+        self.parent = parent
+        self.children: Dict[_Key, _Node] = {}
+        self.tokens = tokens
+        self.count = 0
+        self.last_used = 0
+
+
+class PrefixIndex:
+    """
+    Trie over normalized message sequences, used to estimate how much of a request's
+    input a provider-side prompt cache would serve.
+
+    Each edge is one message (role, content). A request's cacheable prefix is the run
+    of leading messages already indexed, plus the shared leading text of the first
+    message that diverges (counted with the request's tokenizer). There is one trie per
+    tokenizer. Memory is bounded by `max_nodes`; the least recently used leaves are
+    pruned first. Safe to share between threads (one lock per index).
+    """
+
+    def __init__(
+        self,
+        max_nodes: int = 100_000,
+        min_prefix_tokens: int = 0,
+        max_siblings_scanned: int = 8,
+    ):
+        if max_nodes <= 0:
+            raise ValueError("max_nodes must be > 0")
+        self.max_nodes = int(max_nodes)
+        self.min_prefix_tokens = int(min_prefix_tokens)
+        self.max_siblings_scanned = int(max_siblings_scanned)
+        self._roots: Dict[str, _Node] = {}
+        self._nodes = 0
+        self._tick = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return self._nodes
+
+    def _root(self, tok: Tokenizer) -> _Node:
+        root = self._roots.get(tok.name)
+        if root is None:
+            root = self._roots[tok.name] = _Node(None, None, 0)
+        return root
+
+    def lookup(
+        self,
+        messages: List[Dict[str, str]],
+        tok: Tokenizer,
+        min_count: int = 1,
+    ) -> int:
+        """
+        Input tokens of `messages` covered by a prefix indexed at least `min_count` times.
+        Use min_count=2 after inserting a whole batch to find prefixes shared within it.
+        """
+        with self._lock:
+            self._tick += 1
+            node = self._root(tok)
+            cached = 0
+            for m in messages:
+                key = (m["role"], m["content"])
+                child = node.children.get(key)
+                if child is not None and child.count >= min_count:
+                    child.last_used = self._tick
+                    cached += child.tokens
+                    node = child
+                    continue
+
+                # Token-level: shared leading text with a recently added sibling.
+                best = ""
+                siblings = islice(reversed(node.children.values()), self.max_siblings_scanned)
+                for sib in siblings:
+                    if sib.key[0] != key[0] or sib.count < min_count:
+                        continue
+                    shared = os.path.commonprefix([sib.key[1], key[1]])
+                    if len(shared) > len(best):
+                        best = shared
+                if best:
+                    cached += tok.count_text(best)
+                break
+
+            return cached if cached >= self.min_prefix_tokens else 0
+
+    def insert(self, messages: List[Dict[str, str]], tok: Tokenizer) -> None:
+        with self._lock:
+            self._tick += 1
+            node = self._root(tok)
+            for m in messages:
+                key = (m["role"], m["content"])
+                child = node.children.get(key)
+                if child is None:
+                    child = _Node(key, node, tok.count_messages([m]))
+                    node.children[key] = child
+                    self._nodes += 1
+                child.count += 1
+                child.last_used = self._tick
+                node = child
+
+            if self._nodes > self.max_nodes:
+                self.prune(int(self.max_nodes * 0.9))
+
+    def observe(self, messages: List[Dict[str, str]], tok: Tokenizer) -> int:
+        """Stream mode: tokens served from earlier requests' prefixes, then index this one."""
+        with self._lock:
+            cached = self.lookup(messages, tok)
+            self.insert(messages, tok)
+            return cached
+
+    def prune(self, target_nodes: int) -> None:
+        """Drop least recently used leaves until at most `target_nodes` remain."""
+        with self._lock:
+            heap: List[Tuple[int, int, _Node]] = []
+            stack = list(self._roots.values())
+            while stack:
+                n = stack.pop()
+                if n.children:
+                    stack.extend(n.children.values())
+                elif n.parent is not None:
+                    heap.append((n.last_used, id(n), n))
+            heapq.heapify(heap)
+
+            while self._nodes > target_nodes and heap:
+                _, _, leaf = heapq.heappop(heap)
+                parent = leaf.parent
+                del parent.children[leaf.key]
+                self._nodes -= 1
+                if not parent.children and parent.parent is not None:
+                    heapq.heappush(heap, (parent.last_used, id(parent), parent))
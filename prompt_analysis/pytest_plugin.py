@@ -0,0 +1,368 @@
+"""
+pytest plugin: prompt regression checks analyzed in one batch per session.
+
+Registered through the `pytest11` entry point, so installing the SDK enables it.
+
+Tests declare their input with a marker and receive the precomputed report:
+
+    @pytest.mark.prompt_analysis("Summarize this ticket in 3 bullets", model="gpt-4o-mini")
+    def test_summary(prompt_report, prompt_baseline):
+        assert prompt_report.scores.overall >= 70
+        prompt_baseline.check()            # tokens / cost vs the stored baseline
+
+Prompt files are collected as tests of their own only when `prompt_analysis_patterns`
+is set (e.g. `*.prompt`), so installing the SDK does not turn stray prompt files in
+other projects into tests. Each checks: within budget, overall >=
+`prompt_analysis_min_overall`, and the baseline if one exists.
+
+Inputs of the selected tests are registered once collection (and -k / -m deselection)
+is done; identical inputs share one report. They are then analyzed in one batch on a
+ThreadedExecutor, with one analyzer and config for the session, and reports are kept
+in pytest's cache (keyed by input and config fingerprint) so unchanged prompts are not
+re-analyzed on the next run. An input that fails to analyze fails only its own tests.
+`--prompt-update-baselines` writes baselines instead of comparing.
+
+Baselines live in one JSON file per test (`__prompt_baselines__/` next to the test
+file, named after the test's node id). Under pytest-xdist every worker collects all
+tests but runs only some, so workers skip the batch and analyze each input when the
+first test that needs it runs.
+"""
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import pytest
+
+from prompt_analysis import __version__
+from prompt_analysis.analyzer import PromptAnalyzer
+from prompt_analysis.config import AnalyzerConfig
+from prompt_analysis.delta import report_metrics
+from prompt_analysis.executor import ThreadedExecutor
+from prompt_analysis.report import PromptReport
+from prompt_analysis.validation import validate_record
+
+BASELINE_DIR = "__prompt_baselines__"
+# Metrics stored in baselines and compared by PromptBaseline.check().
+BASELINE_METRICS = ("input_tokens", "wasted_tokens_est", "cost_current")
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("prompt_analysis")
+    group.addoption(
+        "--prompt-config",
+        default=None,
+        help="Analyzer config file (default: ini prompt_analysis_config).",
+    )
+    group.addoption(
+        "--prompt-update-baselines",
+        action="store_true",
+        help="Write token/cost baselines instead of comparing against them.",
+    )
+    parser.addini(
+        "prompt_analysis_config", "Analyzer config file.", default="promptanalysis.yml"
+    )
+    parser.addini(
+        "prompt_analysis_patterns",
+        "Glob patterns of prompt files collected as tests (none by default).",
+        type="linelist",
+        default=[],
+    )
+    parser.addini(
+        "prompt_analysis_min_overall",
+        "Minimum overall score for collected prompt files.",
+        default="0",
+    )
+    parser.addini(
+        "prompt_analysis_tolerance",
+        "Relative change allowed against a baseline (0.05 = 5%).",
+        default="0",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        "markers",
+        "prompt_analysis(prompt=None, **input): analyze this input (keys of "
+        "docs/prompt-input.schema.json, or file=PATH relative to the test) and pass "
+        "the report to the prompt_report fixture.",
+    )
+    config.stash[_SESSION] = PromptSession(config)
+
+
+class PromptAnalysisError(Exception):
+    pass
+
+
+class PromptSession:
+    """
+    Every input registered during collection. analyze_pending() analyzes them as one
+    batch; report() analyzes an input on first use if the batch did not.
+    """
+
+    def __init__(self, config: pytest.Config):
+        self.config = config
+        self.update_baselines = bool(config.getoption("prompt_update_baselines"))
+        self.tolerance = float(config.getini("prompt_analysis_tolerance"))
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.reports: Dict[str, PromptReport] = {}
+        self.errors: Dict[str, str] = {}
+        self.cache_hits = 0
+        self.analyzed = 0
+        self._analyzer: Optional[PromptAnalyzer] = None
+        self._salt: Optional[str] = None
+
+    @property
+    def analyzer(self) -> PromptAnalyzer:
+        if self._analyzer is None:
+            path = self.config.getoption("prompt_config") or self.config.getini(
+                "prompt_analysis_config"
+            )
+            path = Path(self.config.rootpath, path)
+            cfg = AnalyzerConfig.load(path) if path.exists() else AnalyzerConfig()
+            self._analyzer = PromptAnalyzer(cfg)
+        return self._analyzer
+
+    def register(self, record: Dict[str, Any]) -> str:
+        # Same validation and normalization as bulk ingest; raises on a bad input.
+        validate_record(record)
+        blob = json.dumps(record, sort_keys=True, ensure_ascii=False)
+        key = hashlib.sha1(blob.encode("utf-8")).hexdigest()
+        self.records.setdefault(key, record)
+        return key
+
+    def report(self, key: str) -> PromptReport:
+        """
+        The report for a registered input, analyzed on first use; raises
+        PromptAnalysisError if the input could not be analyzed.
+        """
+        if key not in self.reports and key not in self.errors and not self._from_cache(key):
+            try:
+                self._store(key, self.analyzer.analyze_input(self.records[key]))
+            except (ValueError, TypeError, KeyError, AttributeError) as e:
+                self.errors[key] = f"{type(e).__name__}: {e}"
+        if key in self.errors:
+            raise PromptAnalysisError(self.errors[key])
+        return self.reports[key]
+
+    def analyze_pending(self) -> None:
+        """Analyze every registered input not yet analyzed or cached, as one batch."""
+        pending = [
+            key
+            for key in self.records
+            if key not in self.reports and key not in self.errors and not self._from_cache(key)
+        ]
+        if not pending:
+            return
+        try:
+            with ThreadedExecutor(self.analyzer) as executor:
+                results = executor.run([self.records[key] for key in pending])
+        except KeyError:
+            # Not isolated per record by the executor; report() retries input by input.
+            return
+        for key, result in zip(pending, results):
+            if isinstance(result, dict):
+                self.errors[key] = result["error"]
+            else:
+                self._store(key, result)
+
+    def _cache_key(self, key: str) -> str:
+        if self._salt is None:
+            self._salt = f"{self.analyzer.cfg.fingerprint()}:{__version__}"
+        return "prompt_analysis/" + hashlib.sha1(f"{key}:{self._salt}".encode()).hexdigest()
+
+    def _from_cache(self, key: str) -> bool:
+        # Absent under -p no:cacheprovider.
+        cache = getattr(self.config, "cache", None)
+        cached = cache.get(self._cache_key(key), None) if cache is not None else None
+        if cached is None:
+            return False
+        self.reports[key] = PromptReport.from_dict(cached)
+        self.cache_hits += 1
+        return True
+
+    def _store(self, key: str, report: PromptReport) -> None:
+        self.reports[key] = report
+        self.analyzed += 1
+        cache = getattr(self.config, "cache", None)
+        if cache is not None:
+            cache.set(self._cache_key(key), report.to_dict())
+
+
+_SESSION = pytest.StashKey[PromptSession]()
+_INPUT_KEY = pytest.StashKey[str]()
+_INPUT_ERROR = pytest.StashKey[str]()
+
+
+def _marker_record(item: pytest.Item, marker: pytest.Mark) -> Dict[str, Any]:
+    record = dict(marker.kwargs)
+    if marker.args:
+        record["prompt"] = marker.args[0]
+    path = record.pop("file", None)
+    if path is not None:
+        record["prompt"] = (Path(item.path).parent / path).read_text(encoding="utf-8")
+    return record
+
+
+def pytest_collection_finish(session: pytest.Session) -> None:
+    # session.items is final here: -k / -m deselection has already run.
+    prompts = session.config.stash[_SESSION]
+    for item in session.items:
+        is_file = isinstance(item, PromptFileItem)
+        marker = None if is_file else item.get_closest_marker("prompt_analysis")
+        if marker is None and not is_file:
+            continue
+        try:
+            record = item.record if is_file else _marker_record(item, marker)
+            item.stash[_INPUT_KEY] = prompts.register(record)
+        except (ValueError, OSError) as e:
+            item.stash[_INPUT_ERROR] = f"Invalid prompt_analysis input: {e}"
+    # xdist workers collect every test but run only their share.
+    if not hasattr(session.config, "workerinput"):
+        prompts.analyze_pending()
+
+
+class BaselineMismatch(AssertionError):
+    pass
+
+
+class PromptBaseline:
+    """
+    Stored token and cost numbers for one test, compared with a relative tolerance.
+    """
+
+    def __init__(self, path: Path, report: PromptReport, session: PromptSession):
+        self.path = path
+        self.report = report
+        self.session = session
+
+    def load(self) -> Optional[Dict[str, float]]:
+        if not self.path.exists():
+            return None
+        return json.loads(self.path.read_text(encoding="utf-8"))
+
+    def write(self) -> None:
+        metrics = report_metrics(self.report)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        payload = {m: metrics[m] for m in BASELINE_METRICS}
+        tmp.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        tmp.replace(self.path)
+
+    def check(self, tolerance: Optional[float] = None, required: bool = True) -> None:
+        if self.session.update_baselines:
+            self.write()
+            return
+        stored = self.load()
+        if stored is None:
+            if required:
+                raise BaselineMismatch(
+                    f"No baseline at {self.path}; run pytest --prompt-update-baselines"
+                )
+            return
+        tol = self.session.tolerance if tolerance is None else tolerance
+        current = report_metrics(self.report)
+        failures = []
+        for metric in BASELINE_METRICS:
+            old, new = stored.get(metric, 0), current[metric]
+            if abs(new - old) > tol * abs(old) + 1e-12:
+                failures.append(f"{metric} {old} -> {new}")
+        if failures:
+            raise BaselineMismatch(
+                f"Baseline changed ({', '.join(failures)}); "
+                "run pytest --prompt-update-baselines to accept"
+            )
+
+
+def _baseline_path(path: Path, name: str) -> Path:
+    """`name` is the node id below the module ("TestA::test_x[1]"), or "prompt"."""
+    safe = re.sub(r"[^\w.-]+", "_", name.replace("::", ".")).strip("_")
+    return path.parent / BASELINE_DIR / f"{path.stem}.{safe}.json"
+
+
+@pytest.fixture
+def prompt_report(request: pytest.FixtureRequest) -> PromptReport:
+    key = request.node.stash.get(_INPUT_KEY, None)
+    if key is None:
+        error = request.node.stash.get(_INPUT_ERROR, None)
+        pytest.fail(error or "prompt_report requires a @pytest.mark.prompt_analysis(...) marker")
+    try:
+        return request.config.stash[_SESSION].report(key)
+    except PromptAnalysisError as e:
+        pytest.fail(f"prompt_analysis could not analyze this input: {e}")
+
+
+@pytest.fixture
+def prompt_baseline(request: pytest.FixtureRequest, prompt_report: PromptReport) -> PromptBaseline:
+    # The node id keeps the class, so TestA::test_x and TestB::test_x do not collide.
+    name = request.node.nodeid.split("::", 1)[-1]
+    path = _baseline_path(Path(request.node.path), name)
+    return PromptBaseline(path, prompt_report, request.config.stash[_SESSION])
+
+
+def pytest_collect_file(file_path: Path, parent: pytest.Collector) -> Optional[pytest.File]:
+    patterns = parent.config.getini("prompt_analysis_patterns")
+    if patterns and any(fnmatch.fnmatch(file_path.name, p) for p in patterns):
+        return PromptFile.from_parent(parent, path=file_path)
+    return None
+
+
+class PromptFile(pytest.File):
+    def collect(self) -> Iterator[pytest.Item]:
+        record = {"prompt": self.path.read_text(encoding="utf-8")}
+        yield PromptFileItem.from_parent(self, name=self.path.name, record=record)
+
+
+class PromptFileItem(pytest.Item):
+    def __init__(self, *, record: Dict[str, Any], **kwargs: Any):
+        super().__init__(**kwargs)
+        self.record = record
+
+    def runtest(self) -> None:
+        prompts = self.config.stash[_SESSION]
+        error = self.stash.get(_INPUT_ERROR, None)
+        if error is not None:
+            raise PromptAnalysisError(error)
+        # Set by pytest_collection_finish for selected items.
+        key = self.stash.get(_INPUT_KEY, None)
+        if key is None:
+            key = self.stash[_INPUT_KEY] = prompts.register(self.record)
+        report = prompts.report(key)
+        problems = []
+        if not report.budgets.get("within_budget", True):
+            problems.append(f"over input budget ({report.budgets['max_input_tokens']} tokens)")
+        if not report.budgets.get("fits_context_window", True):
+            problems.append("does not fit the context window")
+        min_overall = int(self.config.getini("prompt_analysis_min_overall"))
+        if report.scores is not None and report.scores.overall < min_overall:
+            problems.append(f"overall score {report.scores.overall} < {min_overall}")
+        if problems:
+            raise AssertionError("; ".join(problems))
+        PromptBaseline(_baseline_path(self.path, "prompt"), report, prompts).check(
+            required=False
+        )
+
+    def repr_failure(self, excinfo: pytest.ExceptionInfo[BaseException]) -> str:
+        if isinstance(excinfo.value, (AssertionError, PromptAnalysisError)):
+            return f"{self.path.name}: {excinfo.value}"
+        return super().repr_failure(excinfo)
+
+    def reportinfo(self):
+        return self.path, None, f"prompt: {self.path.name}"
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: pytest.Config) -> None:
+    prompts = config.stash.get(_SESSION, None)
+    if prompts is None or not prompts.records:
+        return
+    line = (
+        f"prompt_analysis: {len(prompts.records)} unique inputs, "
+        f"{prompts.analyzed} analyzed, {prompts.cache_hits} from cache"
+    )
+    if prompts.errors:
+        line += f", {len(prompts.errors)} failed"
+    terminalreporter.write_line(line)
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from prompt_analysis.config import AnalyzerConfig
+from prompt_analysis.tokenizers import TOKENIZERS
+
+ConfigListener = Callable[[AnalyzerConfig], None]
+
+
+class ReloadableConfig:
+    """
+    Holds the current AnalyzerConfig for a YAML file and swaps in new versions when the
+    file changes (polled by mtime/size; no inotify dependency).
+
+    New versions are parsed and validated on the polling thread and handed to the
+    listeners before they are published. The swap is a single reference assignment, so
+    readers of `current` always see a complete config. An invalid file, or a listener
+    that raises, is reported via `last_error` and the previous config stays active
+    (listeners that already took the new config are given the previous one back).
+    """
+
+    def __init__(self, path: str | Path, poll_interval: float = 1.0):
+        self.path = Path(path)
+        self.poll_interval = float(poll_interval)
+        self.last_error: Optional[Exception] = None
+        self._stamp = self._stat()
+        self._current = self._load()
+        self._listeners: List[ConfigListener] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def current(self) -> AnalyzerConfig:
+        return self._current
+
+    def subscribe(self, listener: ConfigListener) -> None:
+        """Call `listener(new_config)` before each swap (e.g. analyzer.update_config)."""
+        self._listeners.append(listener)
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _load(self) -> AnalyzerConfig:
+        cfg = AnalyzerConfig.load(self.path)
+        cfg.validate(TOKENIZERS)
+        return cfg
+
+    def check(self) -> bool:
+        """Reload if the file changed. Returns True when a new config was swapped in."""
+        with self._lock:
+            stamp = self._stat()
+            if stamp is None or stamp == self._stamp:
+                return False
+            self._stamp = stamp
+            try:
+                new = self._load()
+            except Exception as e:  # keep serving the last good config
+                self.last_error = e
+                return False
+            if new.fingerprint() == self._current.fingerprint():
+                return False
+
+            applied: List[ConfigListener] = []
+            for listener in self._listeners:
+                try:
+                    listener(new)
+                except Exception as e:
+                    self.last_error = e
+                    for done in reversed(applied):
+                        try:
+                            done(self._current)
+                        except Exception:
+                            pass
+                    return False
+                applied.append(listener)
+
+            self.last_error = None
+            self._current = new
+            return True
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="promptlint-config-reload", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            self.check()
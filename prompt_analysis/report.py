@@ -2,7 +2,43 @@ from __future__ import annotations
 
 from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Union
+
+# Top-level report sections an analysis can be projected onto.
+REPORT_FIELDS: FrozenSet[str] = frozenset(
+    {"scores", "token_estimates", "cost_estimate", "issues", "suggestions", "created_at"}
+)
+
+FIELD_PROFILES: Dict[str, FrozenSet[str]] = {
+    "full": REPORT_FIELDS,
+    # Pre-flight gating: token counts, budget verdict and issue codes only.
+    "gate": frozenset({"token_estimates", "issues"}),
+    # CI checks: everything that can fail a build, no rewrite suggestion.
+    "ci": frozenset({"scores", "token_estimates", "cost_estimate", "issues"}),
+}
+
+
+def resolve_fields(fields: Union[str, Iterable[str], None]) -> FrozenSet[str]:
+    """
+    Normalize a projection: None means "full", a string names a profile,
+    anything else is an explicit set of REPORT_FIELDS.
+    """
+    if fields is None:
+        return REPORT_FIELDS
+    if isinstance(fields, str):
+        try:
+            return FIELD_PROFILES[fields]
+        except KeyError:
+            raise ValueError(
+                f"Unknown field profile '{fields}'. Available: {sorted(FIELD_PROFILES)}"
+            ) from None
+    selected = frozenset(fields)
+    unknown = selected - REPORT_FIELDS
+    if unknown:
+        raise ValueError(
+            f"Unknown report fields {sorted(unknown)}. Available: {sorted(REPORT_FIELDS)}"
+        )
+    return selected
 
 
 class Severity:
@@ -38,6 +74,9 @@ class TokenEstimates:
     redundant_tokens_est: int = 0
     boilerplate_tokens_est: int = 0
     output_risk_tokens_est: int = 0
+    context_tokens: int = 0
+    cached_input_tokens: int = 0
+    context_chunk_tokens: List[Dict[str, Any]] = field(default_factory=list)
 
 
 @dataclass
@@ -49,6 +88,7 @@ class CostEstimate:
     savings_pct: float = 0.0
     input_per_1k: Optional[float] = None
     output_per_1k: Optional[float] = None
+    cached_input_per_1k: Optional[float] = None
 
 
 @dataclass
@@ -63,13 +103,17 @@ class PromptReport:
     schema_version: str = "1.0"
     sdk_version: str = "0.1.0"
     model: str = "default"
-    created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
-
-    scores: Scores = field(default_factory=lambda: Scores(0, 0, 0, 0, 0))
-    token_estimates: TokenEstimates = field(default_factory=lambda: TokenEstimates(0, 0, 0))
+    created_at: Optional[str] = field(
+        default_factory=lambda: datetime.now(timezone.utc).isoformat()
+    )
+
+    scores: Optional[Scores] = field(default_factory=lambda: Scores(0, 0, 0, 0, 0))
+    token_estimates: Optional[TokenEstimates] = field(
+        default_factory=lambda: TokenEstimates(0, 0, 0)
+    )
     cost_estimate: Optional[CostEstimate] = None
-    issues: List[Issue] = field(default_factory=list)
-    suggestions: Suggestions = field(default_factory=Suggestions)
+    issues: Optional[List[Issue]] = field(default_factory=list)
+    suggestions: Optional[Suggestions] = field(default_factory=Suggestions)
     budgets: Optional[Dict[str, Any]] = None
     flags: Optional[Dict[str, Any]] = None
 
@@ -78,4 +122,28 @@ class PromptReport:
 
     def to_json(self, indent: int = 2) -> str:
         import json
-        return json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
\ No newline at end of file
+        return json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PromptReport":
+        """
+        Inverse of to_dict(); sections that are null stay None.
+        """
+        def section(key: str, type_):
+            value = data.get(key)
+            return type_(**value) if value is not None else None
+
+        issues = data.get("issues")
+        return cls(
+            schema_version=data.get("schema_version", "1.0"),
+            sdk_version=data.get("sdk_version", "0.1.0"),
+            model=data.get("model", "default"),
+            created_at=data.get("created_at"),
+            scores=section("scores", Scores),
+            token_estimates=section("token_estimates", TokenEstimates),
+            cost_estimate=section("cost_estimate", CostEstimate),
+            issues=[Issue(**i) for i in issues] if issues is not None else None,
+            suggestions=section("suggestions", Suggestions),
+            budgets=data.get("budgets"),
+            flags=data.get("flags"),
+        )
\ No newline at end of file
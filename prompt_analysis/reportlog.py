@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import json
+import math
+import mmap
+import os
+import struct
+from dataclasses import replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from prompt_analysis.encoding import (
+    FIELD_INDEX,
+    FIELD_SECTION,
+    HEADER,
+    StringTable,
+    decode_report,
+    encode_report,
+)
+from prompt_analysis.report import PromptReport
+
+# Sidecar index entry per record: (created_at, model_id, offset, length).
+INDEX = struct.Struct("<dIQI")
+
+_STRINGS = "strings.jsonl"
+
+
+class ReportLog:
+    """
+    Append-only, segmented store of binary-encoded PromptReports.
+
+    Layout of the log directory:
+      strings.jsonl      shared string dictionary, one JSON string per line
+      seg-NNNNNN.bin     concatenated encoded records
+      seg-NNNNNN.idx     fixed-width index entries (created_at, model id, offset, length)
+      seg-NNNNNN.sum     segment summary: record count, created_at range, model ids
+
+    Queries skip segments whose summary rules them out, scan the small index files of
+    the rest and read header fields straight out of memory-mapped segments; full
+    reports are only decoded by `iter_reports`. Reports without created_at (e.g.
+    gate-projected ones) are stamped with the time they are appended.
+    """
+
+    def __init__(self, directory: str | Path, segment_bytes: int = 64 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = int(segment_bytes)
+
+        self.strings = StringTable()
+        strings_path = self.directory / _STRINGS
+        if strings_path.exists():
+            with open(strings_path, encoding="utf-8") as fh:
+                for line in fh:
+                    if line.strip():
+                        self.strings.intern(json.loads(line))
+        self._strings_fh = open(strings_path, "a", encoding="utf-8")
+        self._persisted_strings = len(self.strings)
+
+        segments = self.segments()
+        self._seg_no = int(segments[-1].stem.split("-")[1]) if segments else 0
+        self._seg_fh = None
+        self._idx_fh = None
+        self._seg_size = 0
+        # [records, min created_at, max created_at, model ids] of the open segment.
+        self._summary: List[Any] = [0, None, None, set()]
+        self._summary_dirty = False
+
+    def segments(self) -> List[Path]:
+        return sorted(self.directory.glob("seg-*.bin"))
+
+    def _open_segment(self) -> None:
+        if self._seg_fh is not None:
+            self._write_summary()
+            self._seg_fh.close()
+            self._idx_fh.close()
+        if self._seg_no == 0 or self._seg_size >= self.segment_bytes:
+            self._seg_no += 1
+        base = self.directory / f"seg-{self._seg_no:06d}"
+        self._seg_fh = open(base.with_suffix(".bin"), "ab")
+        self._idx_fh = open(base.with_suffix(".idx"), "ab")
+        self._seg_size = self._seg_fh.tell()
+        self._summary = [0, None, None, set()]
+        if self._idx_fh.tell():
+            # Reopened after a restart: rebuild the summary of what is already there.
+            for ts, mid, _offset, _length in INDEX.iter_unpack(
+                base.with_suffix(".idx").read_bytes()
+            ):
+                self._note(ts, mid)
+
+    def _note(self, ts: float, model_id: int) -> None:
+        summary = self._summary
+        summary[0] += 1
+        if ts == ts:  # NaN timestamps never match a time range
+            summary[1] = ts if summary[1] is None else min(summary[1], ts)
+            summary[2] = ts if summary[2] is None else max(summary[2], ts)
+        summary[3].add(model_id)
+        self._summary_dirty = True
+
+    def _write_summary(self) -> None:
+        if not self._summary_dirty:
+            return
+        records, min_ts, max_ts, models = self._summary
+        path = self.directory / f"seg-{self._seg_no:06d}.sum"
+        tmp = path.with_suffix(".sum.tmp")
+        tmp.write_text(
+            json.dumps(
+                {
+                    "records": records,
+                    "min_created_at": min_ts,
+                    "max_created_at": max_ts,
+                    "models": sorted(models),
+                }
+            ),
+            encoding="utf-8",
+        )
+        os.replace(tmp, path)
+        self._summary_dirty = False
+
+    @staticmethod
+    def _read_summary(seg: Path, records: int) -> Optional[Dict[str, Any]]:
+        """The segment's summary, or None if it is missing or older than the index."""
+        try:
+            summary = json.loads(seg.with_suffix(".sum").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return summary if summary.get("records") == records else None
+
+    def append(self, report: PromptReport) -> None:
+        if self._seg_fh is None or self._seg_size >= self.segment_bytes:
+            self._open_segment()
+        if not report.created_at:
+            report = replace(report, created_at=datetime.now(timezone.utc).isoformat())
+
+        record = encode_report(report, self.strings)
+        # New dictionary entries must be durable before records that reference them.
+        if len(self.strings) > self._persisted_strings:
+            for s in self.strings.strings[self._persisted_strings :]:
+                self._strings_fh.write(json.dumps(s, ensure_ascii=False) + "\n")
+            self._strings_fh.flush()
+            self._persisted_strings = len(self.strings)
+
+        offset = self._seg_size
+        self._seg_fh.write(record)
+        h = HEADER.unpack_from(record)
+        self._idx_fh.write(INDEX.pack(h[1], h[2], offset, len(record)))
+        self._seg_size += len(record)
+        self._note(h[1], h[2])
+
+    def flush(self) -> None:
+        self._strings_fh.flush()
+        if self._seg_fh is not None:
+            self._seg_fh.flush()
+            self._idx_fh.flush()
+            self._write_summary()
+
+    def close(self) -> None:
+        self.flush()
+        self._strings_fh.close()
+        if self._seg_fh is not None:
+            self._seg_fh.close()
+            self._idx_fh.close()
+            self._seg_fh = self._idx_fh = None
+
+    def __enter__(self) -> "ReportLog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _scan(
+        self, model: Optional[str], since: Optional[float], until: Optional[float]
+    ) -> Iterator[Tuple[mmap.mmap, int]]:
+        self.flush()
+        model_id = None
+        if model is not None:
+            model_id = self.strings.id_of(model)
+            if model_id is None:
+                return
+
+        for seg in self.segments():
+            idx_path = seg.with_suffix(".idx")
+            idx_size = os.path.getsize(idx_path)
+            if os.path.getsize(seg) == 0 or idx_size == 0:
+                continue
+            summary = self._read_summary(seg, idx_size // INDEX.size)
+            if summary is not None:
+                if model_id is not None and model_id not in summary["models"]:
+                    continue
+                lo, hi = summary["min_created_at"], summary["max_created_at"]
+                if since is not None and (hi is None or hi < since):
+                    continue
+                if until is not None and (lo is None or lo >= until):
+                    continue
+            with open(seg, "rb") as sfh, open(idx_path, "rb") as ifh:
+                with mmap.mmap(sfh.fileno(), 0, access=mmap.ACCESS_READ) as smm, mmap.mmap(
+                    ifh.fileno(), 0, access=mmap.ACCESS_READ
+                ) as imm:
+                    for ts, mid, offset, _length in INDEX.iter_unpack(imm):
+                        if model_id is not None and mid != model_id:
+                            continue
+                        if since is not None and not (ts >= since):
+                            continue
+                        if until is not None and not (ts < until):
+                            continue
+                        yield smm, offset
+
+    def values(
+        self,
+        field: str,
+        *,
+        model: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> List[float]:
+        """
+        One header field (see encoding.HEADER_FIELDS) for every matching record that
+        has it: records without the field's section (e.g. gate-projected reports with
+        no scores or cost) and unset optional values (NaN) are skipped.
+        `since` / `until` are epoch seconds.
+        """
+        try:
+            i = FIELD_INDEX[field]
+        except KeyError:
+            raise ValueError(f"Unknown field '{field}'. Available: {sorted(FIELD_INDEX)}") from None
+        bit = FIELD_SECTION.get(field, 0)
+        s = FIELD_INDEX["sections"]
+        unpack = HEADER.unpack_from
+        out: List[float] = []
+        for smm, offset in self._scan(model, since, until):
+            h = unpack(smm, offset)
+            v = h[i]
+            if (h[s] & bit) == bit and v == v:  # v != v only for NaN
+                out.append(v)
+        return out
+
+    def percentile(
+        self,
+        field: str,
+        q: float,
+        *,
+        model: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> Optional[float]:
+        vals = sorted(self.values(field, model=model, since=since, until=until))
+        if not vals:
+            return None
+        return vals[min(len(vals) - 1, max(0, math.ceil(q * len(vals)) - 1))]
+
+    def iter_reports(
+        self,
+        *,
+        model: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> Iterator[PromptReport]:
+        for smm, offset in self._scan(model, since, until):
+            yield decode_report(smm, self.strings, offset)
@@ -1,3 +1,45 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Tuple
+
+from prompt_analysis.cache import LRUCache
+
+from .base import PromptRule
 from .core import CORE_RULES
 
-DEFAULT_RULES = CORE_RULES
\ No newline at end of file
+if TYPE_CHECKING:
+    from prompt_analysis.config import AnalyzerConfig
+
+DEFAULT_RULES = CORE_RULES
+
+_CONFIGURED: LRUCache[str, Tuple[PromptRule, ...]] = LRUCache(64)
+
+
+def configured_rules(cfg: "AnalyzerConfig") -> Tuple[PromptRule, ...]:
+    """
+    DEFAULT_RULES with the vocabularies from the config's `rules:` section compiled
+    in. Cached by config fingerprint.
+    """
+    if not cfg.rules:
+        return tuple(DEFAULT_RULES)
+    key = cfg.fingerprint()
+    rules = _CONFIGURED.get(key)
+    if rules is None:
+        known = {r.code for r in DEFAULT_RULES}
+        unknown = sorted(set(cfg.rules) - known)
+        if unknown:
+            raise ValueError(f"Config defines patterns for unknown rules: {unknown}")
+        out = []
+        for rule in DEFAULT_RULES:
+            spec = cfg.rules.get(rule.code)
+            if spec is None:
+                out.append(rule)
+                continue
+            patterns = rule.patterns + spec.patterns if spec.extend else spec.patterns
+            try:
+                out.append(type(rule)(patterns))
+            except ValueError as e:
+                raise ValueError(f"rules.{rule.code}: {e}") from None
+        rules = tuple(out)
+        _CONFIGURED.put(key, rules)
+    return rules
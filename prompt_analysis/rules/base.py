@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, List, Protocol
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Protocol, runtime_checkable
 
 from prompt_analysis.report import Issue
 
@@ -18,10 +18,23 @@ class PromptRule(Protocol):
     def evaluate(self, normalized: "NormalizedPrompt", ctx: RuleContext) -> List[Issue]: ...
 
 
+@runtime_checkable
+class KeywordRule(Protocol):
+    """
+    Rule that fires when no message matches. Matching is per message, so callers can
+    evaluate it incrementally (see ConversationSession).
+    """
+    code: str
+    def evaluate(self, normalized: "NormalizedPrompt", ctx: RuleContext) -> List[Issue]: ...
+    def matches(self, text: str) -> bool: ...
+    def issue(self) -> Issue: ...
+
+
 @dataclass(frozen=True)
 class NormalizedPrompt:
     messages: List[Dict[str, str]]
     joined_text: str
     user_text: str
     system_text: str
-    context_text: str
\ No newline at end of file
+    context_text: str
+    context_chunks: List[Dict[str, Optional[str]]] = field(default_factory=list)
\ No newline at end of file
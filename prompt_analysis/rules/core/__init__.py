@@ -1,7 +1,8 @@
 from .missing_output_format import MissingOutputFormatRule
 from .no_output_limit import NoOutputLimitRule
 
-CORE_RULES = [
+# A tuple: rule instances are immutable and shared by every analyzer and thread.
+CORE_RULES = (
     MissingOutputFormatRule(),
     NoOutputLimitRule(),
-]
\ No newline at end of file
+)
\ No newline at end of file
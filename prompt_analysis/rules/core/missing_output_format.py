@@ -1,27 +1,37 @@
 from __future__ import annotations
 
+from typing import Optional
+
 from prompt_analysis.report import Issue, Severity
 from prompt_analysis.rules.base import NormalizedPrompt, RuleContext
+from prompt_analysis.rules.matcher import PatternSet, compile_matcher
 
 
 class MissingOutputFormatRule:
     code = "MISSING_OUTPUT_FORMAT"
+    patterns = PatternSet(keywords=("json", "yaml", "table", "bullet", "schema", "format:"))
+
+    def __init__(self, patterns: Optional[PatternSet] = None):
+        if patterns is not None:
+            self.patterns = patterns
+        self.matcher = compile_matcher(self.patterns)
+
+    def matches(self, text: str) -> bool:
+        return self.matcher.search(text)
 
     def evaluate(self, normalized: NormalizedPrompt, ctx: RuleContext):
-        text = (normalized.joined_text or "").lower()
-        keywords = ["json", "yaml", "table", "bullet", "schema", "format:"]
-        has_format = any(k in text for k in keywords)
-        if has_format:
+        if self.matches(normalized.joined_text):
             return []
-        return [
-            Issue(
-                code=self.code,
-                severity=Severity.high,
-                message="No output format specified; responses may be verbose and inconsistent.",
-                fix=(
-                    "Add an explicit output format (e.g., JSON fields, bullet structure, "
-                    "or table columns)."
-                ),
-                savings_tokens_est=30,
-            )
-        ]
\ No newline at end of file
+        return [self.issue()]
+
+    def issue(self) -> Issue:
+        return Issue(
+            code=self.code,
+            severity=Severity.high,
+            message="No output format specified; responses may be verbose and inconsistent.",
+            fix=(
+                "Add an explicit output format (e.g., JSON fields, bullet structure, "
+                "or table columns)."
+            ),
+            savings_tokens_est=30,
+        )
\ No newline at end of file
@@ -1,26 +1,36 @@
 from __future__ import annotations
 
+from typing import Optional
+
 from prompt_analysis.report import Issue, Severity
 from prompt_analysis.rules.base import NormalizedPrompt, RuleContext
+from prompt_analysis.rules.matcher import PatternSet, compile_matcher
 
 
 class NoOutputLimitRule:
     code = "NO_OUTPUT_LIMIT"
+    patterns = PatternSet(keywords=("max ", "no more than", "limit", "words", "tokens", "bullets"))
+
+    def __init__(self, patterns: Optional[PatternSet] = None):
+        if patterns is not None:
+            self.patterns = patterns
+        self.matcher = compile_matcher(self.patterns)
+
+    def matches(self, text: str) -> bool:
+        return self.matcher.search(text)
 
     def evaluate(self, normalized: NormalizedPrompt, ctx: RuleContext):
-        text = (normalized.joined_text or "").lower()
-        keywords = ["max ", "no more than", "limit", "words", "tokens", "bullets"]
-        has_limit = any(k in text for k in keywords)
-        if has_limit:
+        if self.matches(normalized.joined_text):
             return []
-        return [
-            Issue(
-                code=self.code,
-                severity=Severity.high,
-                message=(
-                    "No output length limit specified; responses may consume unnecessary tokens."
-                ),
-                fix="Add a max length (e.g., 'max 6 bullets' or '≤150 words').",
-                savings_tokens_est=40,
-            )
-        ]
\ No newline at end of file
+        return [self.issue()]
+
+    def issue(self) -> Issue:
+        return Issue(
+            code=self.code,
+            severity=Severity.high,
+            message=(
+                "No output length limit specified; responses may consume unnecessary tokens."
+            ),
+            fix="Add a max length (e.g., 'max 6 bullets' or '≤150 words').",
+            savings_tokens_est=40,
+        )
\ No newline at end of file
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Pattern, Tuple
+
+from prompt_analysis.cache import LRUCache
+
+
+@dataclass(frozen=True)
+class PatternSet:
+    """
+    Vocabulary of a keyword rule. `keywords` match as case-insensitive substrings,
+    `words` only between word boundaries, and `regexes` as written (case-insensitive).
+    """
+    keywords: Tuple[str, ...] = ()
+    words: Tuple[str, ...] = ()
+    regexes: Tuple[str, ...] = ()
+
+    def __add__(self, other: "PatternSet") -> "PatternSet":
+        def merge(a: Tuple[str, ...], b: Tuple[str, ...]) -> Tuple[str, ...]:
+            return tuple(dict.fromkeys(a + b))
+
+        return PatternSet(
+            keywords=merge(self.keywords, other.keywords),
+            words=merge(self.words, other.words),
+            regexes=merge(self.regexes, other.regexes),
+        )
+
+
+def _trie_regex(terms: Iterable[str], prune: bool) -> str:
+    """
+    Regex alternation factored over a character trie, so the engine tests each
+    shared prefix once instead of once per term. With `prune`, terms that extend
+    another term are dropped (for "is there any match" they can never matter).
+    """
+    root: Dict[str, dict] = {}
+    for term in terms:
+        if not term:
+            continue
+        node = root
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, dict]) -> str:
+        if prune and "" in node:
+            return ""
+        singles = []
+        alts = []
+        for ch in sorted(k for k in node if k):
+            child = node[ch]
+            if list(child) == [""]:
+                singles.append(ch)
+            else:
+                alts.append(re.escape(ch) + emit(child))
+        if len(singles) == 1:
+            alts.append(re.escape(singles[0]))
+        elif singles:
+            alts.append("[" + "".join(re.escape(c) for c in singles) + "]")
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        if "" in node:
+            body = f"(?:{body})?"
+        return body
+
+    return emit(root)
+
+
+# Up to this many literal keywords, per-keyword `in` checks (C substring search) beat
+# one trie regex; past it the regex's single pass wins.
+LITERAL_SCAN_MAX = 64
+
+
+class KeywordMatcher:
+    """
+    All patterns of a PatternSet compiled into one regex, searched over the
+    lowercased text: one pass per prompt however large the vocabulary is.
+    Small keyword-only vocabularies use plain substring checks instead.
+    """
+
+    def __init__(self, patterns: PatternSet):
+        self.patterns = patterns
+        keywords = tuple(dict.fromkeys(k.lower() for k in patterns.keywords if k))
+        self.literals: Tuple[str, ...] = ()
+        parts = []
+        if len(keywords) <= LITERAL_SCAN_MAX:
+            self.literals = keywords
+        else:
+            parts.append(_trie_regex(keywords, prune=True))
+        if patterns.words:
+            words = _trie_regex((w.lower() for w in patterns.words), prune=False)
+            parts.append(rf"\b(?:{words})\b")
+        for rx in patterns.regexes:
+            try:
+                re.compile(f"(?i:{rx})")
+            except re.error as e:
+                raise ValueError(f"Invalid regex {rx!r}: {e}") from None
+            parts.append(f"(?i:{rx})")
+        self.regex: Optional[Pattern[str]] = re.compile("|".join(parts)) if parts else None
+
+    def search(self, text: str) -> bool:
+        text = (text or "").lower()
+        for k in self.literals:
+            if k in text:
+                return True
+        return self.regex is not None and self.regex.search(text) is not None
+
+
+_MATCHERS: LRUCache[PatternSet, KeywordMatcher] = LRUCache(256)
+
+
+def compile_matcher(patterns: PatternSet) -> KeywordMatcher:
+    matcher = _MATCHERS.get(patterns)
+    if matcher is None:
+        matcher = KeywordMatcher(patterns)
+        _MATCHERS.put(patterns, matcher)
+    return matcher
+
+
+def may_span(rule: Any, separator: str) -> bool:
+    """
+    Whether a match of `rule` could cross `separator`, so that matching the pieces
+    between separators one at a time cannot rule it out.
+    """
+    patterns = getattr(rule, "patterns", None)
+    if patterns is None or patterns.regexes:
+        return True
+    return any(separator in t for t in patterns.keywords + patterns.words)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import List
+import time
+from typing import Dict, List, Optional
 
 from prompt_analysis.report import Issue
 from prompt_analysis.rules.base import NormalizedPrompt, PromptRule, RuleContext
@@ -10,8 +11,18 @@ def run_rules(
     rules: List[PromptRule],
     normalized: NormalizedPrompt,
     ctx: RuleContext,
+    timings: Optional[Dict[str, float]] = None,
 ) -> List[Issue]:
+    """With `timings`, adds each rule's seconds under "rule:<code>"."""
     issues: List[Issue] = []
+    if timings is None:
+        for rule in rules:
+            issues.extend(rule.evaluate(normalized, ctx))
+        return issues
+    clock = time.perf_counter
     for rule in rules:
+        started = clock()
         issues.extend(rule.evaluate(normalized, ctx))
+        key = "rule:" + rule.code
+        timings[key] = timings.get(key, 0.0) + clock() - started
     return issues
\ No newline at end of file
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Collection, Dict, FrozenSet, Iterable, List
+
+from prompt_analysis.report import Scores
+
+
+@dataclass(frozen=True)
+class ScoringModel:
+    """
+    Constants behind the heuristic scores and the waste / output-risk estimates.
+    """
+    missing_items: Dict[str, str] = field(
+        default_factory=lambda: {
+            "MISSING_OUTPUT_FORMAT": "Output format (e.g., JSON schema / bullets / table)",
+            "NO_OUTPUT_LIMIT": "Output length limit (max words/tokens/bullets)",
+        }
+    )
+    output_risk_tokens: Dict[str, int] = field(
+        default_factory=lambda: {"MISSING_OUTPUT_FORMAT": 40, "NO_OUTPUT_LIMIT": 30}
+    )
+    output_control_codes: FrozenSet[str] = frozenset({"MISSING_OUTPUT_FORMAT", "NO_OUTPUT_LIMIT"})
+    output_reduction_factor: float = 0.8
+    waste_ratio: float = 0.20
+    waste_cap_ratio: float = 0.6
+    efficiency_penalty: int = 120
+    completeness_penalty: int = 20
+    structure: int = 85
+    structure_missing_format: int = 70
+    clarity: int = 80
+
+    def missing(self, codes: Iterable[str]) -> List[str]:
+        out: List[str] = []
+        for code in codes:
+            item = self.missing_items.get(code)
+            if item and item not in out:
+                out.append(item)
+        return out
+
+    def output_risk(self, codes: Collection[str]) -> int:
+        return sum(n for code, n in self.output_risk_tokens.items() if code in codes)
+
+    def wasted_tokens(self, input_tokens: int, output_risk: int) -> int:
+        wasted = min(
+            int(input_tokens * self.waste_ratio) + output_risk,
+            int(input_tokens * self.waste_cap_ratio),
+        )
+        return max(wasted, 0)
+
+    def needs_output_controls(self, codes: Collection[str]) -> bool:
+        return any(code in codes for code in self.output_control_codes)
+
+    def scores(
+        self, input_tokens: int, wasted_tokens: int, missing: List[str], codes: Collection[str]
+    ) -> Scores:
+        efficiency = max(
+            0, 100 - int((wasted_tokens / max(input_tokens, 1)) * self.efficiency_penalty)
+        )
+        completeness = 100 - (self.completeness_penalty if missing else 0)
+        structure = (
+            self.structure_missing_format if "MISSING_OUTPUT_FORMAT" in codes else self.structure
+        )
+        clarity = self.clarity
+        overall = int(round((clarity + completeness + structure + efficiency) / 4))
+        return Scores(
+            overall=overall,
+            clarity=clarity,
+            completeness=completeness,
+            structure=structure,
+            efficiency=efficiency,
+        )
+
+
+DEFAULT_SCORING = ScoringModel()
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from prompt_analysis import __version__
+from prompt_analysis.analyzer import PromptAnalyzer
+from prompt_analysis.ledger import CostLedger, _escape
+from prompt_analysis.report import PromptReport
+from prompt_analysis.validation import RecordError, validate_record
+
+# Request header carrying cost-ledger tags: "team=search, feature=autocomplete".
+TAGS_HEADER = "X-Promptlint-Tags"
+# Upper bounds (seconds) of the latency histogram exposed on /metrics.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+# Metric label for request paths; anything else is counted as "other" so clients cannot
+# create series at will.
+ROUTES = ("/analyze", "/analyze/batch")
+
+
+class ServerMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: Dict[Tuple[str, int], int] = {}
+        self.analyzed = 0
+        self.in_flight = 0
+        self.latency_sum = 0.0
+        self.latency_count = 0
+        self.latency_buckets = [0] * len(LATENCY_BUCKETS)
+
+    def begin(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def end(self, path: str, status: int, elapsed: float, analyzed: int) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.requests[(path, status)] = self.requests.get((path, status), 0) + 1
+            self.analyzed += analyzed
+            self.latency_sum += elapsed
+            self.latency_count += 1
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if elapsed <= bound:
+                    self.latency_buckets[i] += 1
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [
+                "# TYPE promptlint_requests_total counter",
+                *(
+                    f'promptlint_requests_total{{path="{_escape(path)}",status="{status}"}} {n}'
+                    for (path, status), n in sorted(self.requests.items())
+                ),
+                "# TYPE promptlint_prompts_analyzed_total counter",
+                f"promptlint_prompts_analyzed_total {self.analyzed}",
+                "# TYPE promptlint_requests_in_flight gauge",
+                f"promptlint_requests_in_flight {self.in_flight}",
+                "# TYPE promptlint_request_seconds histogram",
+                *(
+                    f'promptlint_request_seconds_bucket{{le="{bound}"}} {n}'
+                    for bound, n in zip(LATENCY_BUCKETS, self.latency_buckets)
+                ),
+                f'promptlint_request_seconds_bucket{{le="+Inf"}} {self.latency_count}',
+                f"promptlint_request_seconds_sum {self.latency_sum:.6f}",
+                f"promptlint_request_seconds_count {self.latency_count}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+_BUSY = (
+    b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+)
+
+
+class _RequestError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True
+    server_version = f"promptlint/{__version__}"
+    # Seconds a connection may sit idle (or stall mid-request) before it is closed, so
+    # idle keep-alive clients cannot hold every worker.
+    timeout = 30
+    server: "AnalysisServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self._send(status, body, "application/json")
+
+    def _read_json(self) -> Any:
+        length = self.headers.get("Content-Length")
+        if length is None:
+            raise _RequestError(HTTPStatus.LENGTH_REQUIRED, "Content-Length required")
+        try:
+            size = int(length)
+        except ValueError:
+            raise _RequestError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length") from None
+        if size < 0:
+            self.close_connection = True
+            raise _RequestError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if size > self.server.max_body_bytes:
+            # Body is left unread, so the connection cannot be reused.
+            self.close_connection = True
+            raise _RequestError(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"Body exceeds {self.server.max_body_bytes} bytes",
+            )
+        raw = self.rfile.read(size)
+        try:
+            return json.loads(raw)
+        except (ValueError, RecursionError) as e:
+            raise _RequestError(HTTPStatus.BAD_REQUEST, f"Invalid JSON: {e}") from None
+
+    def do_GET(self) -> None:
+        ledger = self.server.ledger
+        if self.path == "/metrics":
+            text = self.server.metrics.render()
+            if ledger is not None:
+                text += ledger.render_prometheus()
+            self._send(HTTPStatus.OK, text.encode("utf-8"), "text/plain; version=0.0.4")
+        elif self.path == "/ledger" and ledger is not None:
+            self._send_json(HTTPStatus.OK, ledger.to_dict())
+        elif self.path == "/healthz":
+            self._send_json(HTTPStatus.OK, {"status": "ok", "sdk_version": __version__})
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self) -> None:
+        metrics = self.server.metrics
+        metrics.begin()
+        started = time.perf_counter()
+        status, analyzed = HTTPStatus.OK, 0
+        try:
+            try:
+                if self.path == "/analyze":
+                    payload = self._read_json()
+                    report = self.server.analyzer.analyze_input(validate_record(payload))
+                    response: Any = report.to_dict()
+                    analyzed = 1
+                    self._record_cost(report)
+                elif self.path == "/analyze/batch":
+                    payload = self._read_json()
+                    items = payload.get("items") if isinstance(payload, dict) else payload
+                    if not isinstance(items, list):
+                        raise _RequestError(HTTPStatus.BAD_REQUEST, "Expected a list of inputs")
+                    results, analyzed = self._analyze_batch(items)
+                    response = {"results": results}
+                else:
+                    raise _RequestError(HTTPStatus.NOT_FOUND, f"Unknown path {self.path}")
+            except _RequestError as e:
+                status, response = e.status, {"error": str(e)}
+            except ValidationError as e:
+                error = RecordError.from_exception(0, e)
+                status = HTTPStatus.BAD_REQUEST
+                response = {"error": error.message, "errors": error.errors}
+            except (ValueError, TypeError, AttributeError) as e:
+                status, response = HTTPStatus.BAD_REQUEST, {"error": str(e)}
+            except OSError:
+                # Client timed out or went away mid-body: nobody to answer.
+                status = HTTPStatus.REQUEST_TIMEOUT
+                self.close_connection = True
+                raise
+            except Exception as e:
+                self.log_error("Internal error on %s: %r", self.path, e)
+                status, response = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal error"}
+            self._send_json(status, response)
+        finally:
+            route = self.path if self.path in ROUTES else "other"
+            metrics.end(route, int(status), time.perf_counter() - started, analyzed)
+
+    def _record_cost(self, report: PromptReport) -> None:
+        ledger = self.server.ledger
+        if ledger is None:
+            return
+        tags: Dict[str, str] = {}
+        for pair in (self.headers.get(TAGS_HEADER) or "").split(","):
+            key, sep, value = pair.partition("=")
+            if sep:
+                tags[key.strip()] = value.strip()
+        ledger.record(report, tags)
+
+    def _analyze_batch(self, items: List[Any]) -> Tuple[List[Dict[str, Any]], int]:
+        analyzer = self.server.analyzer
+        results: List[Dict[str, Any]] = []
+        ok = 0
+        for index, item in enumerate(items):
+            try:
+                report = analyzer.analyze_input(validate_record(item))
+                results.append({"report": report.to_dict()})
+                ok += 1
+                self._record_cost(report)
+            except ValidationError as e:
+                error = RecordError.from_exception(index, e)
+                results.append({"error": error.message, "errors": error.errors})
+            except (ValueError, TypeError, AttributeError) as e:
+                results.append({"error": str(e)})
+        return results, ok
+
+
+class AnalysisServer(HTTPServer):
+    """
+    HTTP front end for a single warm PromptAnalyzer.
+
+    Connections are handled on a fixed-size worker pool; with keep-alive each worker
+    serves one connection at a time, so `workers` bounds concurrent connections.
+    Connections idle for AnalysisRequestHandler.timeout seconds are closed, and at most
+    `max_pending` accepted connections wait for a worker; beyond that new connections
+    get an immediate 503.
+    With a `ledger`, every analyzed report is recorded under the request's
+    X-Promptlint-Tags, and the rollups are served on /metrics and GET /ledger.
+    """
+
+    request_queue_size = 128
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        analyzer: PromptAnalyzer,
+        workers: int = 8,
+        max_body_bytes: int = 1_000_000,
+        quiet: bool = True,
+        ledger: Optional[CostLedger] = None,
+        max_pending: Optional[int] = None,
+    ):
+        super().__init__(address, AnalysisRequestHandler)
+        self.analyzer = analyzer
+        self.ledger = ledger
+        self.max_body_bytes = int(max_body_bytes)
+        self.quiet = quiet
+        self.metrics = ServerMetrics()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="promptlint")
+        pending = self.request_queue_size if max_pending is None else max_pending
+        self._slots = threading.BoundedSemaphore(workers + max(int(pending), 0))
+
+    def warm_up(self) -> None:
+        cfg = self.analyzer.cfg
+        for name in {m.tokenizer for m in cfg.models.values()} | {cfg.defaults.tokenizer}:
+            self.analyzer.get_tokenizer(name)
+
+    def process_request(self, request, client_address) -> None:
+        if not self._slots.acquire(blocking=False):
+            try:
+                request.sendall(_BUSY)
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._pool.shutdown(wait=False)
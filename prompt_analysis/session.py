@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+from typing import AbstractSet, Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from prompt_analysis.analyzer import PromptAnalyzer
+from prompt_analysis.normalized import cap_input, normalize_message, normalize_messages
+from prompt_analysis.report import Issue, PromptReport, resolve_fields
+from prompt_analysis.rules.base import KeywordRule
+from prompt_analysis.rules.matcher import may_span
+from prompt_analysis.rules.runner import run_rules
+from prompt_analysis.tokenizers import TieredTokenizer
+
+# normalize_messages joins message contents with this, and rules match the joined text.
+MESSAGE_SEPARATOR = "\n"
+
+
+class ConversationSession:
+    """
+    Incremental analysis of a growing conversation.
+
+    Each appended message is normalized, tokenized and scanned by the keyword rules
+    once; `report()` combines the running totals, so the cost of a turn tracks the new
+    message rather than the whole history. Keyword rules whose patterns could match
+    across a message boundary are checked on the joined text until they match; other
+    rules fall back to a full pass when the report is built. The joined user text is
+    only built when the report includes suggestions. Over the plan's input caps the
+    report is built like PromptAnalyzer's (the kept part extrapolated to the whole).
+    """
+
+    def __init__(
+        self,
+        analyzer: PromptAnalyzer,
+        *,
+        model: Optional[str] = None,
+        expected_output_tokens: Optional[int] = None,
+        max_input_tokens: Optional[int] = None,
+        tokenizer: Optional[str] = None,
+        context_chunks: Optional[List[Dict[str, Any]]] = None,
+    ):
+        self.analyzer = analyzer
+        self.plan = analyzer.plan(
+            model=model,
+            tokenizer=tokenizer,
+            expected_output_tokens=expected_output_tokens,
+            max_input_tokens=max_input_tokens,
+        )
+
+        self._tok = self.plan.tokenizer
+        self._counting = self._tok.fast if isinstance(self._tok, TieredTokenizer) else self._tok
+        self._context = normalize_messages([], context_chunks=context_chunks)
+        self._context_chunks = context_chunks
+
+        self.messages: List[Dict[str, str]] = []
+        self.role_tokens: Dict[str, int] = {}
+        self._message_tokens = 0
+        self._precise_counts: List[int] = []
+        # Same measure as cap_input: content characters of messages and context chunks.
+        self._chars = sum(len(c.get("text") or "") for c in context_chunks or [])
+
+        self._matched: Dict[str, bool] = {
+            r.code: False for r in self.plan.rules if isinstance(r, KeywordRule)
+        }
+        self._spanning = {
+            r.code
+            for r in self.plan.rules
+            if r.code in self._matched and may_span(r, MESSAGE_SEPARATOR)
+        }
+        self._user_parts: List[str] = []
+        self._all_parts: List[str] = []
+        # (message count, text) of the last base text built for suggestions.
+        self._base_text = (0, "")
+        # (stable, kept size, counts, tier flags, issues, base text) of the kept part of a
+        # capped conversation; stable once appends can no longer change the kept part.
+        self._capped: Optional[Tuple[Any, ...]] = None
+
+    def append(self, role: str, content: str) -> None:
+        msg = normalize_message({"role": role, "content": content})
+        self.messages.append(msg)
+        self._chars += len(msg["content"])
+
+        n = self._counting.count_messages([msg])
+        self._message_tokens += n
+        self.role_tokens[msg["role"]] = self.role_tokens.get(msg["role"], 0) + n
+
+        for rule in self.plan.rules:
+            if rule.code in self._matched and not self._matched[rule.code]:
+                self._matched[rule.code] = rule.matches(msg["content"])
+
+        self._all_parts.append(msg["content"])
+        if msg["role"] == "user":
+            self._user_parts.append(msg["content"])
+
+    def extend(self, messages: List[Dict[str, str]]) -> None:
+        for m in messages or []:
+            self.append(m.get("role") or "user", m.get("content") or "")
+
+    def _precise_message_tokens(self, precise) -> int:
+        counts = self._precise_counts
+        for msg in self.messages[len(counts) :]:
+            counts.append(precise.count_messages([msg]))
+        return sum(counts)
+
+    def _over_caps(self) -> bool:
+        plan = self.plan
+        return bool(
+            (plan.max_messages and len(self.messages) > plan.max_messages)
+            or (plan.max_input_chars and self._chars > plan.max_input_chars)
+        )
+
+    def _joined_base_text(self) -> str:
+        count, text = self._base_text
+        if count != len(self.messages):
+            text = (
+                MESSAGE_SEPARATOR.join(self._user_parts).strip()
+                or MESSAGE_SEPARATOR.join(self._all_parts).strip()
+            )
+            self._base_text = (len(self.messages), text)
+        return text
+
+    def _capped_report(self, fields: AbstractSet[str]) -> PromptReport:
+        """
+        Report of a conversation over the caps, equal to run_plan()'s. cap_input keeps
+        a prefix of the history (messages, then context chunks); once a whole message
+        has been dropped, later ones are dropped too, so the kept part is counted and
+        scanned once and only the extrapolation is redone per report.
+        """
+        analyzer = self.analyzer
+        plan = self.plan
+        cached = self._capped
+        if cached is not None and cached[0]:
+            kept_messages, kept_chars = cached[1]
+            capped = {
+                "messages": len(self.messages),
+                "kept_messages": kept_messages,
+                "chars": self._chars,
+                "kept_chars": kept_chars,
+            }
+        else:
+            messages, chunks, capped = cap_input(
+                self.messages, self._context_chunks, plan.max_input_chars, plan.max_messages
+            )
+            key = (capped["kept_messages"], capped["kept_chars"])
+            if cached is None or cached[1] != key:
+                normalized = normalize_messages(messages, context_chunks=chunks)
+                tier: Dict[str, Any] = {}
+                counts = analyzer._count_input(plan, normalized, None, tier)
+                issues = run_rules(plan.rules, normalized, plan.rule_ctx)
+                base_text = normalized.user_text or normalized.joined_text
+                stable = capped["kept_messages"] < capped["messages"]
+                cached = self._capped = (stable, key, counts, tier, issues, base_text)
+        _, _, (counting, input_tokens, context_tokens, chunk_tokens), tier, issues, base_text = (
+            cached
+        )
+        flags: Dict[str, Any] = {"mvp": True, **tier}
+        input_tokens, context_tokens = analyzer._extrapolate(
+            counting, input_tokens, context_tokens, capped, flags
+        )
+        return analyzer._build_report(
+            plan,
+            base_text=base_text,
+            issues=list(issues),
+            input_tokens=input_tokens,
+            context_tokens=context_tokens,
+            chunk_tokens=chunk_tokens,
+            flags=flags,
+            fields=fields,
+        )
+
+    def report(self, fields: Union[str, Iterable[str], None] = None) -> PromptReport:
+        analyzer = self.analyzer
+        plan = self.plan
+        fields = resolve_fields(fields)
+        if self._over_caps():
+            return self._capped_report(fields)
+
+        flags: Dict[str, Any] = {"mvp": True}
+        context_tokens, chunk_tokens = analyzer._count_context(self._counting, self._context)
+        input_tokens = self._message_tokens + context_tokens
+        if isinstance(self._tok, TieredTokenizer):
+            if self._tok.is_ambiguous(input_tokens, plan.thresholds):
+                precise = self._tok.precise
+                context_tokens, chunk_tokens = analyzer._count_context(precise, self._context)
+                input_tokens = self._precise_message_tokens(precise) + context_tokens
+                flags["tokenizer_tier"] = "precise"
+            else:
+                flags["tokenizer_tier"] = "fast"
+
+        issues: List[Issue] = []
+        full = None
+        for rule in plan.rules:
+            if rule.code in self._matched:
+                if not self._matched[rule.code] and rule.code in self._spanning:
+                    # A match across messages stays a match as the conversation grows.
+                    self._matched[rule.code] = rule.matches(
+                        MESSAGE_SEPARATOR.join(self._all_parts)
+                    )
+                if not self._matched[rule.code]:
+                    issues.append(rule.issue())
+                continue
+            if full is None:
+                full = normalize_messages(self.messages, context_chunks=self._context_chunks)
+            issues.extend(rule.evaluate(full, plan.rule_ctx))
+
+        return analyzer._build_report(
+            plan,
+            base_text=self._joined_base_text() if "suggestions" in fields else "",
+            issues=issues,
+            input_tokens=input_tokens,
+            context_tokens=context_tokens,
+            chunk_tokens=chunk_tokens,
+            flags=flags,
+            fields=fields,
+        )
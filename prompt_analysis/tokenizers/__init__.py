@@ -1,5 +1,52 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from prompt_analysis.config import TokenizerSpec
+
 from .approx import ApproxTokenizer
+from .base import Tokenizer
+from .bpe import BPETokenizer, load_ranks
+from .sampling import SampledCount, SamplingEstimator
+from .tiered import TieredTokenizer, calibrate_error_bound
 
 TOKENIZERS = {
     "approx": ApproxTokenizer(),
-}
\ No newline at end of file
+}
+
+
+def build_tokenizer(spec: TokenizerSpec, resolve: Callable[[str], Tokenizer]) -> Tokenizer:
+    """
+    Instantiate a tokenizer declared in the `tokenizers:` config section.
+    `resolve` looks up other tokenizers by name (for composite types like `tiered`).
+    """
+    opts = spec.options
+    if spec.type == "tiered":
+        if "precise" not in opts:
+            raise ValueError(f"Tokenizer '{spec.name}': tiered tokenizers require 'precise'")
+        return TieredTokenizer(
+            fast=resolve(str(opts.get("fast", "approx"))),
+            precise=resolve(str(opts["precise"])),
+            error_bound=float(opts.get("error_bound", 0.25)),
+            name=spec.name,
+        )
+    if spec.type == "bpe":
+        if "ranks_file" not in opts:
+            raise ValueError(f"Tokenizer '{spec.name}': bpe tokenizers require 'ranks_file'")
+        names = ("pattern", "cache_size", "message_overhead", "max_piece_bytes")
+        kwargs = {k: opts[k] for k in names if k in opts}
+        return BPETokenizer.from_file(opts["ranks_file"], name=spec.name, **kwargs)
+    raise ValueError(f"Unknown tokenizer type '{spec.type}' for tokenizer '{spec.name}'")
+
+
+__all__ = [
+    "TOKENIZERS",
+    "ApproxTokenizer",
+    "BPETokenizer",
+    "SampledCount",
+    "SamplingEstimator",
+    "TieredTokenizer",
+    "build_tokenizer",
+    "calibrate_error_bound",
+    "load_ranks",
+]
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-import re
-from typing import Dict, List
+from typing import Any, Dict, Iterable, List, Sequence, Tuple, Union
+
+from prompt_analysis.tokenizers.sampling import SampledCount, SamplingEstimator, Source
 
 
 class ApproxTokenizer:
@@ -12,27 +13,99 @@ class ApproxTokenizer:
     """
     name = "approx"
 
-    _ws_re = re.compile(r"\s+")
+    # Counted in slices so memory stays flat on multi-megabyte inputs.
+    _chunk_chars = 1 << 20
+    # Batches below this many characters are faster on the scalar path than in NumPy,
+    # whose per-call setup dominates small inputs.
+    _vector_min_chars = 8192
+    _punctuation = "{}[]():,;\"'"
 
-    def count_text(self, text: str) -> int:
+    def count_words(self, text: str) -> int:
+        """
+        Number of whitespace-separated words, i.e. len(text.split()) without
+        materializing the list.
+        """
+        step = self._chunk_chars
+        if len(text) <= step:
+            return len(text.split())
+        words = 0
+        for start in range(0, len(text), step):
+            words += len(text[start : start + step].split())
+            # A word straddling the slice boundary was counted on both sides.
+            if start and not text[start - 1].isspace() and not text[start].isspace():
+                words -= 1
+        return words
+
+    def text_stats(self, text: str) -> Tuple[int, int]:
+        """
+        (words, punctuation) of a text. Both are additive over pieces split at
+        whitespace, which lets callers cache them per paragraph.
+        """
         if not text:
-            return 0
-        # Normalize whitespace
-        cleaned = self._ws_re.sub(" ", text.strip())
-        if not cleaned:
+            return 0, 0
+        return self.count_words(text), sum(map(text.count, self._punctuation))
+
+    def estimate(self, words: int, punctuation: int) -> int:
+        if not words:
             return 0
 
-        words = cleaned.split(" ")
         # ~1.3 tokens per word is a common rough heuristic for English.
-        est = int(round(len(words) * 1.3))
+        est = int(round(words * 1.3))
 
         # Small penalty for lots of punctuation / JSON-like structures.
         # These often tokenize worse than plain words.
-        punctuation = sum(1 for ch in cleaned if ch in "{}[]():,;\"'")
         est += int(punctuation / 40)
 
         return max(est, 1)
 
+    def count_text(self, text: str) -> int:
+        return self.estimate(*self.text_stats(text))
+
+    def count_many(self, texts: Iterable[str]) -> List[int]:
+        """
+        count_text for every text in a batch. NumPy string/object arrays, and batches
+        of at least _vector_min_chars characters, are counted with array operations
+        when NumPy is installed.
+        """
+        if not hasattr(texts, "dtype"):
+            if not isinstance(texts, Sequence):
+                texts = list(texts)
+            if sum(len(t or "") for t in texts) < self._vector_min_chars:
+                count = self.count_text
+                return [count(t or "") for t in texts]
+        from prompt_analysis.tokenizers import vectorized
+
+        if vectorized.available():
+            return vectorized.count_column(texts, self._punctuation)
+        count = self.count_text
+        return [count(t or "") for t in texts]
+
+    def count_buffer(self, data: Union[str, bytes], offsets: Sequence[int]) -> List[int]:
+        """
+        count_many for rows stored back to back: row i is data[offsets[i]:offsets[i+1]].
+        Takes an Arrow string column's value buffer (UTF-8 bytes, byte offsets) as is.
+        """
+        if len(data) >= self._vector_min_chars:
+            from prompt_analysis.tokenizers import vectorized
+
+            if vectorized.available():
+                return vectorized.count_buffer(data, offsets, self._punctuation)
+        bounds = list(offsets)
+        rows = [data[a:b] for a, b in zip(bounds, bounds[1:])]
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            rows = [bytes(r).decode("utf-8", "surrogatepass") for r in rows]
+        return [self.count_text(r) for r in rows]
+
+    def count_sampled(
+        self, source: Source, thresholds: Iterable[int] = (), **options: Any
+    ) -> SampledCount:
+        """
+        Estimate from stratified samples of a huge file, buffer or text, with a
+        confidence interval; counts in full when a threshold falls inside it.
+        `options` go to SamplingEstimator (strata, window, confidence, seed, ...).
+        """
+        return SamplingEstimator(self, **options).estimate(source, thresholds)
+
     def count_messages(self, messages: List[Dict[str, str]]) -> int:
         total = 0
         for m in messages or []:
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List, Protocol
+from typing import Dict, Iterable, List, Protocol
 
 
 @dataclass(frozen=True)
@@ -17,4 +17,5 @@ class Tokenizer(Protocol):
     name: str
 
     def count_text(self, text: str) -> int: ...
+    def count_many(self, texts: Iterable[str]) -> List[int]: ...
     def count_messages(self, messages: List[Dict[str, str]]) -> int: ...
\ No newline at end of file
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import base64
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from prompt_analysis.cache import LRUCache
+
+# Close approximation of the cl100k pre-tokenizer using only stdlib `re` classes
+# (no \p{L}/\p{N}): contractions, letter runs with one leading non-letter, 1-3 digit
+# groups, punctuation runs, newlines and trailing whitespace.
+DEFAULT_PATTERN = (
+    r"'(?i:[sdmt]|ll|ve|re)"
+    r"|[^\r\n\w]?[^\W\d_]+"
+    r"|\d{1,3}"
+    r"| ?[^\s\w]+[\r\n]*"
+    r"|\s*[\r\n]+"
+    r"|\s+(?!\S)"
+    r"|\s+"
+)
+
+
+def load_ranks(path: str | Path) -> Dict[bytes, int]:
+    """
+    Read a mergeable-ranks file (`<base64 token> <rank>` per line, tiktoken format).
+    The whole table is decoded into a dict, so the file is read line by line rather
+    than mapped: a mapping would not save memory here. An empty file gives an empty
+    dict, which BPETokenizer rejects.
+    """
+    ranks: Dict[bytes, int] = {}
+    with open(path, "rb") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            token, rank = line.split()
+            ranks[base64.b64decode(token)] = int(rank)
+    return ranks
+
+
+class BPETokenizer:
+    """
+    Pure-Python byte-level BPE tokenizer over a local ranks file.
+    Token ids per pre-tokenized piece are memoized in a bounded LRU, so repeated
+    words (the common case in natural text) skip the merge loop entirely.
+    """
+
+    def __init__(
+        self,
+        ranks: Dict[bytes, int],
+        name: str = "bpe",
+        pattern: str = DEFAULT_PATTERN,
+        cache_size: int = 65536,
+        message_overhead: int = 4,
+        max_piece_bytes: int = 256,
+    ):
+        if not ranks:
+            raise ValueError(f"Tokenizer '{name}': empty ranks table")
+        self.name = name
+        self.message_overhead = int(message_overhead)
+        # The merge loop is quadratic in piece length; longer pieces (10 MB "words",
+        # punctuation runs) are merged in slices of this size. Real pieces are short.
+        self.max_piece_bytes = max(int(max_piece_bytes), 2)
+        self._ranks = ranks
+        self._pattern = re.compile(pattern)
+        self._cache: LRUCache[bytes, Tuple[int, ...]] = LRUCache(cache_size)
+
+    @classmethod
+    def from_file(cls, ranks_file: str | Path, **kwargs) -> "BPETokenizer":
+        return cls(load_ranks(ranks_file), **kwargs)
+
+    def _merge(self, piece: bytes) -> Tuple[int, ...]:
+        ranks = self._ranks
+        rank = ranks.get(piece)
+        if rank is not None:
+            return (rank,)
+
+        parts = [piece[i : i + 1] for i in range(len(piece))]
+        while len(parts) > 1:
+            best_rank = None
+            best_i = -1
+            for i in range(len(parts) - 1):
+                r = ranks.get(parts[i] + parts[i + 1])
+                if r is not None and (best_rank is None or r < best_rank):
+                    best_rank = r
+                    best_i = i
+            if best_rank is None:
+                break
+            parts[best_i : best_i + 2] = [parts[best_i] + parts[best_i + 1]]
+        # Bytes missing from the table still cost one token each.
+        return tuple(ranks.get(p, -1) for p in parts)
+
+    def _piece_ids(self, piece: bytes) -> Tuple[int, ...]:
+        step = self.max_piece_bytes
+        if len(piece) > step:
+            out: List[int] = []
+            for i in range(0, len(piece), step):
+                out.extend(self._piece_ids(piece[i : i + step]))
+            return tuple(out)
+        cache = self._cache
+        ids = cache.get(piece)
+        if ids is None:
+            ids = self._merge(piece)
+            cache.put(piece, ids)
+        return ids
+
+    def encode(self, text: str) -> List[int]:
+        out: List[int] = []
+        for piece in self._pattern.findall(text or ""):
+            out.extend(self._piece_ids(piece.encode("utf-8")))
+        return out
+
+    def count_text(self, text: str) -> int:
+        if not text:
+            return 0
+        piece_ids = self._piece_ids
+        return sum(len(piece_ids(p.encode("utf-8"))) for p in self._pattern.findall(text))
+
+    def count_many(self, texts: Iterable[str]) -> List[int]:
+        # Identical texts in a batch (templates, repeated system prompts) are counted once.
+        seen: Dict[str, int] = {}
+        out: List[int] = []
+        count = self.count_text
+        for text in texts:
+            n = seen.get(text)
+            if n is None:
+                n = seen[text] = count(text)
+            out.append(n)
+        return out
+
+    def count_messages(self, messages: List[Dict[str, str]]) -> int:
+        total = 0
+        for m in messages or []:
+            total += self.count_text(m.get("content", ""))
+            total += self.message_overhead
+        return total
@@ -0,0 +1,234 @@
+"""
+Token estimates for inputs too large to count in full (transcripts, document dumps).
+
+The input is cut into equal strata and a few fixed-size windows are read from each, so
+the work is the same for a 10 MB and a 10 GB file. Words and punctuation per byte in
+the windows are extrapolated to the whole input with ApproxTokenizer's arithmetic and a
+normal-approximation confidence interval. When the interval contains a threshold the
+verdict could flip, so the input is counted in full instead (streamed, flat memory).
+
+    estimator = SamplingEstimator(ApproxTokenizer())
+    result = estimator.estimate(Path("dump.txt"), thresholds=[128_000 - 4_096])
+    result.tokens, result.low, result.high, result.exact
+"""
+from __future__ import annotations
+
+import codecs
+import math
+import mmap
+import os
+import random
+from dataclasses import asdict, dataclass
+from statistics import NormalDist
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+Source = Union[str, os.PathLike, bytes, bytearray, memoryview, mmap.mmap]
+
+
+@dataclass(frozen=True)
+class SampledCount:
+    tokens: int
+    # Confidence interval; equal to `tokens` when the input was counted in full.
+    low: int
+    high: int
+    exact: bool
+    confidence: float
+    # Units are characters for str input and bytes otherwise.
+    sampled: int
+    total: int
+
+    def fits(self, limit: int) -> bool | None:
+        """True / False when the interval lies on one side of `limit`, else None."""
+        if self.high <= limit:
+            return True
+        if self.low > limit:
+            return False
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class _Input:
+    """Random access to a path, a bytes-like buffer or a str, by byte or char offset."""
+
+    def __init__(self, source: Source):
+        self._file = None
+        if isinstance(source, os.PathLike):
+            self._file = open(source, "rb")
+            self.size = os.fstat(self._file.fileno()).st_size
+            self.is_text = False
+        elif isinstance(source, str):
+            self._data: Any = source
+            self.size = len(source)
+            self.is_text = True
+        else:
+            self._data = memoryview(source).cast("B")
+            self.size = len(self._data)
+            self.is_text = False
+
+    def read(self, start: int, end: int) -> Union[str, bytes]:
+        if self._file is not None:
+            self._file.seek(start)
+            return self._file.read(end - start)
+        if self.is_text:
+            return self._data[start:end]
+        return bytes(self._data[start:end])
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+class SamplingEstimator:
+    """
+    `tokenizer` must expose ApproxTokenizer's text_stats()/estimate() pair, since the
+    estimate extrapolates words and punctuation rather than token counts. Each of the
+    `strata` strata contributes `per_stratum` windows of `window` bytes (characters for
+    str input); inputs no larger than `min_sample_ratio` times the sample are counted
+    in full. Sampling is seeded, so repeated estimates of the same input agree.
+    """
+
+    def __init__(
+        self,
+        tokenizer: Any,
+        *,
+        strata: int = 32,
+        per_stratum: int = 2,
+        window: int = 4096,
+        confidence: float = 0.95,
+        min_sample_ratio: float = 4.0,
+        chunk: int = 1 << 20,
+        seed: int = 0,
+    ):
+        if not (hasattr(tokenizer, "text_stats") and hasattr(tokenizer, "estimate")):
+            raise TypeError(
+                f"Tokenizer '{getattr(tokenizer, 'name', tokenizer)}' does not support "
+                "sampled estimates (needs text_stats and estimate)"
+            )
+        if strata < 1 or per_stratum < 2 or window < 1:
+            raise ValueError("Sampling needs strata >= 1, per_stratum >= 2 and window >= 1")
+        if not 0.0 < confidence < 1.0:
+            raise ValueError("confidence must be between 0 and 1")
+        self.tokenizer = tokenizer
+        self.strata = strata
+        self.per_stratum = per_stratum
+        self.window = window
+        self.confidence = confidence
+        self.min_sample_ratio = min_sample_ratio
+        self.chunk = chunk
+        self.seed = seed
+        self._z = NormalDist().inv_cdf(0.5 + confidence / 2.0)
+
+    def estimate(self, source: Source, thresholds: Iterable[int] = ()) -> SampledCount:
+        """
+        Estimate the token count of a file (a Path), a bytes-like buffer such as an
+        mmap (UTF-8), or a str (the text itself, not a file name).
+        Falls back to a full count if any positive threshold lies within the interval.
+        """
+        data = _Input(source)
+        try:
+            sample = self.strata * self.per_stratum * self.window
+            if data.size <= sample * self.min_sample_ratio:
+                return self._exact(data)
+            tokens, half_width = self._sample(data)
+            low = max(int(math.floor(tokens - half_width)), 0)
+            high = int(math.ceil(tokens + half_width))
+            if any(t > 0 and low <= t <= high for t in thresholds):
+                return self._exact(data)
+            return SampledCount(
+                tokens=tokens,
+                low=low,
+                high=high,
+                exact=False,
+                confidence=self.confidence,
+                sampled=sample,
+                total=data.size,
+            )
+        finally:
+            data.close()
+
+    def _window_stats(self, data: _Input, start: int) -> Tuple[float, float, int]:
+        """
+        (words, punctuation, length) of the window at `start`. Words are counted by
+        their first character, so a word cut by the window's left edge is left to the
+        bytes before it and window counts add up over adjacent windows.
+        """
+        end = min(start + self.window, data.size)
+        if data.is_text:
+            text = data.read(start, end)
+            prev = data.read(start - 1, start) if start else " "
+        else:
+            lead = max(start - 4, 0)
+            raw = data.read(lead, end)
+            cut = start - lead
+            # Move the cut off UTF-8 continuation bytes onto the next character start.
+            while cut < len(raw) and raw[cut] & 0xC0 == 0x80:
+                cut += 1
+            prev = raw[:cut].decode("utf-8", "ignore")[-1:] if start else " "
+            text = raw[cut:].decode("utf-8", "ignore")
+        words, punctuation = self.tokenizer.text_stats(text)
+        if text and not text[0].isspace() and prev and not prev.isspace():
+            words -= 1
+        return words, punctuation, end - start
+
+    def _sample(self, data: _Input) -> Tuple[int, float]:
+        rng = random.Random(self.seed)
+        bounds = [data.size * i // self.strata for i in range(self.strata + 1)]
+        words_total = punct_total = 0.0
+        variance = 0.0
+        for lo, hi in zip(bounds, bounds[1:]):
+            size = hi - lo
+            densities: List[Tuple[float, float]] = []
+            for _ in range(self.per_stratum):
+                start = lo + rng.randrange(max(size - self.window, 0) + 1)
+                words, punctuation, length = self._window_stats(data, start)
+                densities.append((words / length, punctuation / length))
+            n = len(densities)
+            mean_w = sum(d[0] for d in densities) / n
+            mean_p = sum(d[1] for d in densities) / n
+            words_total += size * mean_w
+            punct_total += size * mean_p
+            # Variance of the stratum total of 1.3 * words + punctuation / 40, the
+            # linear part of ApproxTokenizer.estimate.
+            ys = [1.3 * w + p / 40.0 for w, p in densities]
+            mean_y = sum(ys) / n
+            s2 = sum((y - mean_y) ** 2 for y in ys) / (n - 1)
+            fpc = max(1.0 - n * self.window / size, 0.0)
+            variance += size * size * fpc * s2 / n
+        tokens = self.tokenizer.estimate(int(round(words_total)), int(round(punct_total)))
+        return tokens, self._z * math.sqrt(variance)
+
+    def _chunks(self, data: _Input) -> Iterator[str]:
+        if data.is_text:
+            for start in range(0, data.size, self.chunk):
+                yield data.read(start, start + self.chunk)
+            return
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        for start in range(0, data.size, self.chunk):
+            yield decoder.decode(data.read(start, start + self.chunk))
+        yield decoder.decode(b"", final=True)
+
+    def _exact(self, data: _Input) -> SampledCount:
+        words = punctuation = 0
+        last = " "
+        for text in self._chunks(data):
+            if not text:
+                continue
+            w, p = self.tokenizer.text_stats(text)
+            # A word straddling the chunk boundary was counted on both sides.
+            if not last.isspace() and not text[0].isspace():
+                w -= 1
+            words += w
+            punctuation += p
+            last = text[-1]
+        tokens = self.tokenizer.estimate(words, punctuation)
+        return SampledCount(
+            tokens=tokens,
+            low=tokens,
+            high=tokens,
+            exact=True,
+            confidence=1.0,
+            sampled=data.size,
+            total=data.size,
+        )
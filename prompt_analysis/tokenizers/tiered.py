@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable, List, Sequence
+
+from .base import Tokenizer
+
+
+class TieredTokenizer:
+    """
+    Two-tier tokenizer: the fast estimate is used unless it lands close enough to a
+    decision threshold (input budget, context window) that the estimator's error could
+    flip the verdict. Only then is the precise tokenizer run.
+
+    `error_bound` is the relative error of the fast tokenizer against the precise one
+    (|fast - precise| / precise). Use `calibrate_error_bound` to derive it from samples.
+    """
+
+    def __init__(
+        self,
+        fast: Tokenizer,
+        precise: Tokenizer,
+        error_bound: float = 0.25,
+        name: str | None = None,
+    ):
+        if error_bound < 0:
+            raise ValueError("error_bound must be >= 0")
+        self.fast = fast
+        self.precise = precise
+        self.error_bound = float(error_bound)
+        self.name = name or f"tiered:{precise.name}"
+
+    def count_text(self, text: str) -> int:
+        return self.fast.count_text(text)
+
+    def count_many(self, texts: Iterable[str]) -> List[int]:
+        # Custom tokenizers written before count_many joined the contract may lack it.
+        count_many = getattr(self.fast, "count_many", None)
+        if count_many is None:
+            return [self.fast.count_text(t) for t in texts]
+        return count_many(texts)
+
+    def count_messages(self, messages: List[Dict[str, str]]) -> int:
+        return self.fast.count_messages(messages)
+
+    def bounds(self, estimate: int) -> tuple[float, float]:
+        """Range of precise counts consistent with `estimate` under `error_bound`."""
+        low = estimate / (1.0 + self.error_bound)
+        high = estimate / (1.0 - self.error_bound) if self.error_bound < 1.0 else math.inf
+        return low, high
+
+    def is_ambiguous(self, estimate: int, thresholds: Iterable[int]) -> bool:
+        low, high = self.bounds(estimate)
+        return any(t > 0 and low <= t <= high for t in thresholds)
+
+
+def calibrate_error_bound(
+    fast: Tokenizer,
+    precise: Tokenizer,
+    samples: Sequence[str],
+    quantile: float = 0.99,
+) -> float:
+    """
+    Relative error of `fast` vs `precise` at the given quantile over sample texts.
+    Feed it a representative slice of production prompts.
+    """
+    errors = []
+    for text in samples:
+        exact = precise.count_text(text)
+        if exact <= 0:
+            continue
+        errors.append(abs(fast.count_text(text) - exact) / exact)
+    if not errors:
+        return 0.0
+    errors.sort()
+    idx = min(len(errors) - 1, max(0, math.ceil(quantile * len(errors)) - 1))
+    return round(errors[idx], 4)
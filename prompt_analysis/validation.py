@@ -0,0 +1,165 @@
+"""
+Input validation for bulk ingest, mirroring docs/prompt-input.schema.json.
+
+The validator is compiled once at import. Schema types are strict (nothing is coerced).
+Valid records come back in canonical form: each message goes through normalize_message()
+and a bare `prompt` becomes a one-message `messages` list. The output is a plain dict
+that PromptAnalyzer.analyze_input() accepts; the analyzer normalizes its input itself,
+so this only saves work when records are stored or compared, not when analyzed. JSON
+lines are parsed and validated together by pydantic-core, with no separate json.loads
+pass.
+
+    result = validate_lines(open("prompts.jsonl", "rb"))
+    for index, record in result.valid():
+        analyzer.analyze_input(record)
+    for error in result.errors:
+        print(error.index, error.message)
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Annotated, Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from pydantic import (
+    AfterValidator,
+    ConfigDict,
+    Field,
+    StrictInt,
+    StrictStr,
+    TypeAdapter,
+    ValidationError,
+)
+from typing_extensions import Required, TypedDict  # pydantic needs this one before 3.12
+
+from prompt_analysis.normalized import normalize_message
+
+
+class MessageInput(TypedDict, total=False):
+    __pydantic_config__ = ConfigDict(extra="ignore")
+
+    role: StrictStr
+    content: Required[StrictStr]
+
+
+class ContextChunkInput(TypedDict, total=False):
+    __pydantic_config__ = ConfigDict(extra="ignore")
+
+    id: StrictStr
+    text: Required[StrictStr]
+
+
+def _chunk(chunk: Dict[str, str]) -> Dict[str, Any]:
+    return {"id": chunk.get("id"), "text": chunk["text"].strip()}
+
+
+TokenCount = Annotated[StrictInt, Field(ge=0)]
+
+
+class PromptInput(TypedDict, total=False):
+    __pydantic_config__ = ConfigDict(extra="forbid")
+
+    prompt: StrictStr
+    messages: List[Annotated[MessageInput, AfterValidator(normalize_message)]]
+    context_chunks: List[Annotated[ContextChunkInput, AfterValidator(_chunk)]]
+    model: StrictStr
+    tokenizer: StrictStr
+    expected_output_tokens: TokenCount
+    max_input_tokens: TokenCount
+
+
+def _prompt_or_messages(record: Dict[str, Any]) -> Dict[str, Any]:
+    if "messages" not in record:
+        if "prompt" not in record:
+            raise ValueError("Input requires 'prompt' or 'messages'")
+        record["messages"] = [normalize_message({"role": "user", "content": record["prompt"]})]
+    return record
+
+
+PROMPT_INPUT: TypeAdapter[Dict[str, Any]] = TypeAdapter(
+    Annotated[PromptInput, AfterValidator(_prompt_or_messages)]
+)
+
+
+@dataclass
+class RecordError:
+    index: int
+    # pydantic error dicts reduced to {"loc": "messages.0.content", "type", "msg"}
+    errors: List[Dict[str, str]]
+
+    @property
+    def message(self) -> str:
+        return "; ".join(f"{e['loc']}: {e['msg']}" if e["loc"] else e["msg"] for e in self.errors)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"index": self.index, "error": self.message, "errors": self.errors}
+
+    @classmethod
+    def from_exception(cls, index: int, exc: ValidationError) -> "RecordError":
+        return cls(
+            index=index,
+            errors=[
+                {
+                    "loc": ".".join(str(part) for part in e["loc"]),
+                    "type": e["type"],
+                    "msg": e["msg"],
+                }
+                for e in exc.errors(include_url=False, include_input=False)
+            ],
+        )
+
+
+@dataclass
+class BatchValidation:
+    # Aligned with the input: None where the record failed validation.
+    inputs: List[Optional[Dict[str, Any]]] = field(default_factory=list)
+    errors: List[RecordError] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def valid(self) -> List[Tuple[int, Dict[str, Any]]]:
+        return [(i, item) for i, item in enumerate(self.inputs) if item is not None]
+
+
+def validate_record(record: Any) -> Dict[str, Any]:
+    """Validate and normalize one decoded record; raises pydantic.ValidationError."""
+    return PROMPT_INPUT.validate_python(record)
+
+
+def validate_line(line: Union[str, bytes]) -> Dict[str, Any]:
+    """Parse, validate and normalize one JSON document; raises pydantic.ValidationError."""
+    return PROMPT_INPUT.validate_json(line)
+
+
+def validate_batch(records: Iterable[Any]) -> BatchValidation:
+    """Validate decoded records, collecting per-record errors instead of raising."""
+    result = BatchValidation()
+    validate = PROMPT_INPUT.validate_python
+    for index, record in enumerate(records):
+        try:
+            result.inputs.append(validate(record))
+        except ValidationError as e:
+            result.inputs.append(None)
+            result.errors.append(RecordError.from_exception(index, e))
+    return result
+
+
+def validate_lines(lines: Iterable[Union[str, bytes]]) -> BatchValidation:
+    """
+    validate_batch() for JSON lines. Blank lines are skipped (and not counted); a line
+    that is not valid JSON is reported like any other invalid record.
+    """
+    result = BatchValidation()
+    validate = PROMPT_INPUT.validate_json
+    index = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            result.inputs.append(validate(line))
+        except ValidationError as e:
+            result.inputs.append(None)
+            result.errors.append(RecordError.from_exception(index, e))
+        index += 1
+    return result